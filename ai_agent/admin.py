@@ -1,3 +1,16 @@
 from django.contrib import admin
+from .models import AIJob, OpeningQuestion
 
-# Register your models here.
+
+@admin.register(OpeningQuestion)
+class OpeningQuestionAdmin(admin.ModelAdmin):
+    list_display = ("position_key", "interview_type", "level", "language", "created_at", "used_at")
+    list_filter = ("interview_type", "level", "language")
+    search_fields = ("position_key",)
+
+
+@admin.register(AIJob)
+class AIJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "interview", "status", "attempts", "created_at", "finished_at")
+    list_filter = ("kind", "status")
+    readonly_fields = ("payload", "result", "error")
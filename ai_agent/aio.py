@@ -0,0 +1,37 @@
+# ai_agent/aio.py
+"""
+Event loop compartido para el código asíncrono de los proveedores (edge-tts, etc.).
+
+Las vistas async servidas por ``evalent/asgi.py`` hacen ``await`` directamente
+sobre el loop del servidor. El código síncrono (vistas WSGI, comandos, hilos de
+fondo) no debe crear un loop por petición con ``run_until_complete``: usa
+``run_coroutine`` que envía la corrutina a un único loop de larga vida que corre
+en un hilo daemon del proceso.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Devuelve (y arranca la primera vez) el loop compartido del proceso."""
+    global _loop
+    if _loop is not None and not _loop.is_closed():
+        return _loop
+
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="ai-agent-loop", daemon=True)
+            thread.start()
+            _loop = loop
+    return _loop
+
+
+def run_coroutine(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """Ejecuta una corrutina en el loop compartido y espera su resultado desde código síncrono."""
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    return future.result(timeout)
@@ -0,0 +1,161 @@
+# ai_agent/audio_upload.py
+"""
+Recepción de audio para transcripción sin pasar por base64.
+
+El cliente sube la grabación como cuerpo binario (``Content-Type: audio/webm``)
+o como multipart (campo ``audio``). El cuerpo se copia por bloques a un archivo
+temporal "spooled" (memoria hasta ``AI_AUDIO_SPOOL_BYTES``, luego disco) y ese
+mismo archivo va al proveedor de STT: la memoria por petición queda acotada y
+no hay copias intermedias.
+
+Límites: ``AI_AUDIO_MAX_BYTES`` (se rechaza por Content-Length antes de leer) y
+``AI_AUDIO_MAX_SECONDS`` (duración declarada por el cliente en
+``X-Audio-Duration`` o medida en el servidor cuando el formato lo permite).
+"""
+import tempfile
+import wave
+from typing import BinaryIO, Optional
+
+from django.conf import settings
+
+
+CHUNK_BYTES = 64 * 1024
+
+EXTENSIONS = {
+    "audio/webm": "webm",
+    "video/webm": "webm",
+    "audio/ogg": "ogg",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/wave": "wav",
+    "audio/mpeg": "mp3",
+    "audio/mp4": "m4a",
+    "audio/x-m4a": "m4a",
+    "application/octet-stream": "webm",
+}
+
+
+class AudioRejected(Exception):
+    """La subida no cumple los límites; ``status`` es el código HTTP a responder."""
+
+    def __init__(self, message: str, status: int = 400):
+        self.status = status
+        super().__init__(message)
+
+
+class SpooledAudio(tempfile.SpooledTemporaryFile):
+    """Archivo temporal con ``name`` (los SDK de STT deducen el formato de la extensión)."""
+
+    def __init__(self, name: str, max_size: int):
+        super().__init__(max_size=max_size)
+        self._audio_name = name
+
+    @property
+    def name(self):
+        return self._audio_name
+
+
+def max_bytes() -> int:
+    return getattr(settings, "AI_AUDIO_MAX_BYTES", 10 * 1024 * 1024)
+
+
+def max_seconds() -> float:
+    return getattr(settings, "AI_AUDIO_MAX_SECONDS", 180)
+
+
+def _size_label(n: int) -> str:
+    return f"{n / (1024 * 1024):.0f} MB" if n >= 1024 * 1024 else f"{n // 1024} KB"
+
+
+def _media_type(request) -> str:
+    return (request.content_type or "").split(";")[0].strip().lower()
+
+
+def is_binary_upload(request) -> bool:
+    """True si el cuerpo es el audio en crudo o un multipart (no el JSON con base64)."""
+    media_type = _media_type(request)
+    return media_type in EXTENSIONS or media_type.startswith("audio/") or media_type == "multipart/form-data"
+
+
+def _check_declared(declared_bytes: Optional[int] = None, declared_seconds=None):
+    if declared_bytes is not None and declared_bytes > max_bytes():
+        raise AudioRejected(f"Audio demasiado grande (máximo {_size_label(max_bytes())})", status=413)
+
+    if declared_seconds:
+        try:
+            seconds = float(declared_seconds)
+        except (TypeError, ValueError):
+            raise AudioRejected("X-Audio-Duration inválido")
+        if seconds > max_seconds():
+            raise AudioRejected(f"Audio demasiado largo (máximo {max_seconds():.0f} s)", status=413)
+
+
+def probe_duration(audio_file: BinaryIO) -> Optional[float]:
+    """Duración en segundos si el formato se puede medir sin decodificar (WAV); si no, None."""
+    position = audio_file.tell()
+    try:
+        with wave.open(audio_file, "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return None
+    finally:
+        audio_file.seek(position)
+
+
+def spool_stream(stream, name: str, limit: Optional[int] = None) -> SpooledAudio:
+    """Copia ``stream`` por bloques a un ``SpooledAudio``; corta si supera ``limit`` bytes."""
+    limit = limit or max_bytes()
+    spooled = SpooledAudio(name, max_size=getattr(settings, "AI_AUDIO_SPOOL_BYTES", 1024 * 1024))
+    total = 0
+    try:
+        while True:
+            chunk = stream.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > limit:
+                raise AudioRejected(f"Audio demasiado grande (máximo {_size_label(limit)})", status=413)
+            spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+
+    if not total:
+        spooled.close()
+        raise AudioRejected("No se recibió audio")
+
+    spooled.seek(0)
+    return spooled
+
+
+def receive_audio(request) -> BinaryIO:
+    """
+    Archivo de audio de una subida binaria o multipart, listo para el proveedor de STT.
+    Lanza ``AudioRejected`` si falta o supera los límites. El llamador lo cierra.
+    """
+    media_type = _media_type(request)
+
+    try:
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0) or None
+    except ValueError:
+        content_length = None
+    declared_seconds = request.headers.get("X-Audio-Duration")
+
+    if media_type == "multipart/form-data":
+        _check_declared(content_length)
+        upload = request.FILES.get("audio")
+        if upload is None:
+            raise AudioRejected("No se recibió audio")
+        _check_declared(upload.size, declared_seconds or request.POST.get("duration"))
+        # Django ya lo volcó a memoria o a un temporal según FILE_UPLOAD_MAX_MEMORY_SIZE
+        audio_file = upload
+    else:
+        _check_declared(content_length, declared_seconds)
+        audio_file = spool_stream(request, f"audio.{EXTENSIONS.get(media_type, media_type.split('/')[-1])}")
+
+    seconds = probe_duration(audio_file)
+    if seconds is not None and seconds > max_seconds():
+        audio_file.close()
+        raise AudioRejected(f"Audio demasiado largo (máximo {max_seconds():.0f} s)", status=413)
+
+    return audio_file
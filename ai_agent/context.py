@@ -0,0 +1,158 @@
+# ai_agent/context.py
+"""
+Contexto conversacional acotado para el entrevistador IA.
+
+En vez de reenviar todos los mensajes de la entrevista en cada turno, el prompt
+se arma con:
+
+- los datos de la entrevista (tipo, nivel, cargo, idioma, progreso),
+- un resumen incremental guardado en la propia entrevista
+  (``Interview.context_summary``), y
+- una ventana de los turnos más recientes limitada por un presupuesto de tokens.
+
+Los turnos que salen de la ventana se "pliegan" al resumen una sola vez y se
+marca hasta qué mensaje se resumió (``Interview.context_summary_upto``). Así el
+tamaño del prompt y las consultas por turno se mantienen constantes sin importar
+cuánto dure la entrevista.
+"""
+from typing import List
+
+from django.conf import settings
+
+
+# Aproximación barata: ~4 caracteres por token (suficiente para presupuestar)
+CHARS_PER_TOKEN = 4
+
+# Longitud máxima de cada turno al plegarlo en el resumen
+SUMMARY_LINE_CHARS = 160
+
+ROLE_LABELS = {
+    "ai": "Entrevistador",
+    "user": "Candidato",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación aproximada de tokens de un texto."""
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _window_tokens() -> int:
+    return getattr(settings, "AI_CONTEXT_WINDOW_TOKENS", 1200)
+
+
+def _summary_tokens() -> int:
+    return getattr(settings, "AI_CONTEXT_SUMMARY_TOKENS", 400)
+
+
+def _summary_line(msg) -> str:
+    """Versión compacta de un turno para el resumen."""
+    content = " ".join((msg.content or "").split())
+    if len(content) > SUMMARY_LINE_CHARS:
+        content = content[: SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+    return f"- {ROLE_LABELS.get(msg.role, msg.role)}: {content}"
+
+
+def _trim_summary(lines: List[str]) -> List[str]:
+    """Descarta las líneas más antiguas hasta respetar el presupuesto del resumen."""
+    budget = _summary_tokens()
+    total = sum(estimate_tokens(line) + 1 for line in lines)
+    start = 0
+    while total > budget and start < len(lines):
+        total -= estimate_tokens(lines[start]) + 1
+        start += 1
+    return lines[start:]
+
+
+def _interview_header(interview, progress: bool = True) -> str:
+    lines = [
+        "Contexto de la entrevista:",
+        f"- Tipo: {interview.get_interview_type_display()}",
+        f"- Nivel: {interview.get_level_display()}",
+        f"- Cargo: {interview.position}",
+        f"- Idioma de la entrevista: {interview.get_language_display()}",
+    ]
+    if progress:
+        if interview.mode == "questions" and interview.max_questions:
+            lines.append(f"- Pregunta número {interview.asked_questions + 1} de {interview.max_questions}")
+        elif interview.mode == "time" and interview.time_limit:
+            lines.append(f"- Entrevista por tiempo: {interview.time_limit} minutos")
+    return "\n".join(lines)
+
+
+def update_context_window(interview, user_message: str = "") -> List:
+    """
+    Devuelve los mensajes recientes que caben en la ventana y pliega al resumen
+    los que quedaron fuera.
+
+    Solo se consultan los mensajes posteriores a ``context_summary_upto``, que por
+    construcción son pocos (los de la ventana más el último turno).
+    """
+    if interview.pk is None:
+        return []
+
+    pending = list(
+        interview.messages.filter(role__in=ROLE_LABELS, id__gt=interview.context_summary_upto)
+        .only("id", "role", "content")
+        .order_by("id")
+    )
+
+    # El mensaje actual del candidato ya se guardó; va aparte al final del prompt
+    if pending and pending[-1].role == "user" and pending[-1].content == user_message:
+        pending.pop()
+
+    budget = _window_tokens()
+    used = 0
+    split = len(pending)
+    while split > 0:
+        cost = estimate_tokens(pending[split - 1].content) + 4
+        if used + cost > budget:
+            break
+        used += cost
+        split -= 1
+
+    to_fold, window = pending[:split], pending[split:]
+
+    if to_fold:
+        lines = interview.context_summary.splitlines() if interview.context_summary else []
+        lines.extend(_summary_line(m) for m in to_fold)
+        new_summary = "\n".join(_trim_summary(lines))
+        new_upto = to_fold[-1].id
+
+        # Actualización optimista: si otro turno ya plegó estos mensajes, no pisamos su resumen
+        updated = type(interview).objects.filter(
+            pk=interview.pk, context_summary_upto=interview.context_summary_upto
+        ).update(context_summary=new_summary, context_summary_upto=new_upto)
+
+        if updated:
+            interview.context_summary = new_summary
+            interview.context_summary_upto = new_upto
+        else:
+            interview.refresh_from_db(fields=["context_summary", "context_summary_upto"])
+
+    return window
+
+
+def build_prompt(interview, user_message: str) -> str:
+    """Arma el prompt completo del turno: cabecera + resumen + ventana + mensaje actual."""
+    window = update_context_window(interview, user_message)
+
+    parts = [_interview_header(interview)]
+
+    if interview.context_summary:
+        parts.append("Resumen de turnos anteriores:\n" + interview.context_summary)
+
+    if window:
+        parts.append(
+            "Conversación reciente:\n"
+            + "\n".join(f"{ROLE_LABELS[m.role]}: {m.content}" for m in window)
+        )
+
+    if user_message:
+        parts.append(f"Mensaje del candidato: {user_message}")
+    elif window or interview.context_summary:
+        parts.append("El candidato no respondió: formula la siguiente pregunta.")
+    else:
+        parts.append("La entrevista acaba de comenzar: formula la primera pregunta.")
+
+    return "\n\n".join(parts)
@@ -0,0 +1,177 @@
+# ai_agent/disk_cache.py
+"""
+Caché en disco direccionada por contenido, compartida entre procesos.
+
+- Clave: sha256 de las partes que definen el contenido (``DiskCache.make_key``).
+- Escritura atómica: archivo temporal en el mismo directorio + ``os.replace``;
+  un lector nunca ve un archivo a medias.
+- LRU: cada lectura actualiza el mtime del archivo; al superar ``max_bytes`` se
+  borran los menos usados hasta bajar al 90 % del tope.
+- Contadores (hits, misses, writes, evictions) y tamaño aproximado en un
+  ``stats.json`` protegido con ``flock``, así todos los workers suman en el mismo.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: contadores y desalojo sin lock entre procesos
+    fcntl = None
+
+
+TMP_PREFIX = ".tmp-"
+STATS_FILE = "stats.json"
+
+
+class DiskCache:
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ".bin"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        raw = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + self.suffix)
+
+    # ---------- lectura / escritura ----------
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            self._update_stats(misses=1)
+            return None
+
+        try:
+            os.utime(path)  # LRU: el mtime marca el último acceso
+        except FileNotFoundError:
+            pass  # desalojado justo ahora; ya tenemos los datos
+        self._update_stats(hits=1)
+        return data
+
+    def set(self, key: str, data: bytes):
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=TMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+        stats = self._update_stats(writes=1, bytes=len(data))
+        if stats.get("bytes", 0) > self.max_bytes:
+            self.evict()
+
+    # ---------- contadores ----------
+
+    def _locked_stats(self, update):
+        """Aplica ``update(stats)`` sobre stats.json bajo flock y devuelve el resultado."""
+        with open(os.path.join(self.directory, STATS_FILE), "a+", encoding="utf-8") as fh:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                fh.seek(0)
+                raw = fh.read()
+                try:
+                    stats = json.loads(raw) if raw else {}
+                except ValueError:
+                    stats = {}
+                update(stats)
+                fh.seek(0)
+                fh.truncate()
+                fh.write(json.dumps(stats))
+                fh.flush()
+                return stats
+            finally:
+                if fcntl:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _update_stats(self, **deltas) -> dict:
+        def update(stats):
+            for name, delta in deltas.items():
+                stats[name] = stats.get(name, 0) + delta
+        return self._locked_stats(update)
+
+    def stats(self) -> dict:
+        stats = self._locked_stats(lambda stats: None)
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        return {
+            "hits": stats.get("hits", 0),
+            "misses": stats.get("misses", 0),
+            "hit_rate": stats.get("hits", 0) / lookups if lookups else 0.0,
+            "writes": stats.get("writes", 0),
+            "evictions": stats.get("evictions", 0),
+            "bytes": stats.get("bytes", 0),
+            "max_bytes": self.max_bytes,
+        }
+
+    # ---------- desalojo ----------
+
+    def _entries(self):
+        now = time.time()
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.startswith(TMP_PREFIX):
+                    # Temporales huérfanos de un proceso caído
+                    if now - st.st_mtime > 3600:
+                        _unlink(entry.path)
+                    continue
+                yield entry.path, st.st_size, st.st_mtime
+
+    def evict(self):
+        """Borra las entradas menos usadas hasta quedar bajo el 90 % del tope."""
+        def update(stats):
+            entries = sorted(self._entries(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            evicted = 0
+            for path, size, _ in entries:
+                if total <= target:
+                    break
+                if _unlink(path):
+                    total -= size
+                    evicted += 1
+            # El tamaño se recalcula aquí; entre desalojos es una estimación
+            stats["bytes"] = total
+            stats["evictions"] = stats.get("evictions", 0) + evicted
+
+        # Bajo el mismo lock que los contadores: un solo proceso desaloja a la vez
+        self._locked_stats(update)
+
+    def clear(self):
+        for path, _, _ in list(self._entries()):
+            _unlink(path)
+        self._locked_stats(lambda stats: stats.clear())
+
+
+def _unlink(path: str) -> bool:
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
@@ -0,0 +1,191 @@
+# ai_agent/jobs.py
+"""
+Cola de trabajos de IA respaldada por la BD (sin broker externo).
+
+Las vistas encolan el trabajo con ``enqueue`` y responden de inmediato con el id;
+los workers de ``manage.py run_ai_workers`` lo reclaman, lo ejecutan y guardan el
+resultado, que el cliente consulta por polling.
+
+- Reclamo atómico: UPDATE condicional, así dos workers nunca toman el mismo trabajo.
+- Visibility timeout: un trabajo "running" cuyo ``locked_until`` venció (worker
+  caído) vuelve a entregarse.
+- Un trabajo puede entregarse más de una vez (visibility timeout vencido, worker
+  caído, error después de persistir): los handlers con efectos en la BD guardan
+  su avance en la misma transacción y verifican con ``lock_owned`` que el
+  trabajo sigue siendo suyo antes de escribir (si no, ``JobLost``).
+- Si el proveedor está al límite de cuota (``ProviderBusy``) el trabajo vuelve a
+  la cola tras ``retry_after`` sin gastar un intento.
+- Reintentos con espera exponencial hasta ``max_attempts``; después queda en
+  estado ``dead`` (dead-letter) con el último error. Lo mismo si el worker se
+  cae durante el último intento.
+
+Los tipos de trabajo se registran con ``@job_handler("tipo")``; los de la
+entrevista viven en interviews/jobs.py.
+"""
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import AIJob
+from .providers.limiter import ProviderBusy
+
+
+_handlers: Dict[str, Callable[[AIJob], dict]] = {}
+
+
+class JobLost(Exception):
+    """El visibility timeout venció y otro worker reclamó el trabajo: este ya no debe escribir."""
+
+
+def job_handler(kind: str):
+    """Registra la función que procesa los trabajos de tipo ``kind``. Debe devolver un dict JSON."""
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def _visibility_timeout() -> timedelta:
+    return timedelta(seconds=getattr(settings, "AI_JOBS_VISIBILITY_TIMEOUT", 120))
+
+
+def _max_attempts() -> int:
+    return getattr(settings, "AI_JOBS_MAX_ATTEMPTS", 3)
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    base = getattr(settings, "AI_JOBS_RETRY_BASE_SECONDS", 2)
+    return timedelta(seconds=base * (2 ** max(0, attempts - 1)))
+
+
+def worker_id(index: int = 0) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+# =========================
+# PRODUCTOR
+# =========================
+def enqueue(kind: str, payload: dict, interview=None, max_attempts: Optional[int] = None) -> AIJob:
+    """Encola un trabajo y lo devuelve (no espera a que se ejecute)."""
+    return AIJob.objects.create(
+        kind=kind,
+        interview=interview,
+        payload=payload,
+        max_attempts=max_attempts or _max_attempts(),
+        available_at=timezone.now(),
+    )
+
+
+# =========================
+# CONSUMIDOR
+# =========================
+def claim_next(worker: str) -> Optional[AIJob]:
+    """Reclama el siguiente trabajo disponible (o uno cuyo visibility timeout venció)."""
+    now = timezone.now()
+
+    # Trabajos abandonados (worker caído) que ya agotaron sus intentos -> dead-letter
+    AIJob.objects.filter(status="running", locked_until__lt=now, attempts__gte=F("max_attempts")).update(
+        status="dead", error="Visibility timeout vencido en el último intento.", locked_until=None, finished_at=now
+    )
+
+    ready = Q(status="queued", available_at__lte=now) | Q(status="running", locked_until__lt=now)
+
+    candidates = AIJob.objects.filter(ready).order_by("available_at").values_list("pk", "status", "locked_until")[:5]
+
+    for pk, status, locked_until in candidates:
+        claimed = AIJob.objects.filter(pk=pk, status=status, locked_until=locked_until).update(
+            status="running",
+            locked_until=now + _visibility_timeout(),
+            locked_by=worker,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return AIJob.objects.get(pk=pk)
+
+    return None
+
+
+def lock_owned(job: AIJob) -> AIJob:
+    """
+    Bloquea la fila del trabajo (dentro de una transacción) y la devuelve fresca;
+    ``JobLost`` si ya no es de este worker.
+    """
+    current = AIJob.objects.select_for_update().get(pk=job.pk)
+    if current.status != "running" or current.locked_by != job.locked_by:
+        raise JobLost(f"{job} fue reclamado por {current.locked_by or 'otro worker'}")
+    return current
+
+
+def run_job(job: AIJob, worker: str) -> str:
+    """Ejecuta un trabajo reclamado y registra su resultado. Devuelve el estado final."""
+    owned = AIJob.objects.filter(pk=job.pk, locked_by=worker, status="running")
+
+    handler = _handlers.get(job.kind)
+    if handler is None:
+        owned.update(status="dead", error=f"Tipo de trabajo desconocido: {job.kind}", finished_at=timezone.now())
+        return "dead"
+
+    try:
+        result = handler(job)
+    except JobLost:
+        print(f"[JOBS] {job} lo tomó otro worker; se descarta este intento")
+        return "lost"
+    except ProviderBusy as e:
+        owned.update(
+            status="queued",
+            attempts=F("attempts") - 1,
+            locked_until=None,
+            available_at=timezone.now() + timedelta(seconds=e.retry_after),
+        )
+        return "queued"
+    except Exception:
+        error = traceback.format_exc(limit=5)
+        print(f"[JOBS] {job} falló (intento {job.attempts}/{job.max_attempts})")
+
+        if job.attempts >= job.max_attempts:
+            owned.update(status="dead", error=error, locked_until=None, finished_at=timezone.now())
+            return "dead"
+
+        owned.update(
+            status="queued",
+            error=error,
+            locked_until=None,
+            available_at=timezone.now() + _retry_delay(job.attempts),
+        )
+        return "queued"
+
+    # Si el visibility timeout venció y otro worker lo tomó, su resultado manda
+    if not owned.update(status="done", result=result, error="", locked_until=None, finished_at=timezone.now()):
+        return "lost"
+    return "done"
+
+
+def work(worker: str, should_stop: Callable[[], bool], poll_interval: float = 0.5):
+    """Bucle de un worker: reclama y ejecuta trabajos hasta que ``should_stop()`` sea True."""
+    while not should_stop():
+        close_old_connections()
+        job = claim_next(worker)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(job, worker)
+
+
+def job_status(job: AIJob) -> dict:
+    """Representación JSON del estado de un trabajo para el cliente."""
+    return {
+        "job_id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": job.result if job.status == "done" else None,
+        "error": job.error.strip().splitlines()[-1] if job.status == "dead" and job.error else None,
+    }
@@ -0,0 +1,142 @@
+# ai_agent/json_stream.py
+"""
+Parser incremental para extraer un campo de texto de un JSON que llega por partes.
+
+Gemini en modo ``stream=True`` entrega el JSON en fragmentos arbitrarios, así que
+``_safe_parse_json`` no sirve hasta el final. Este parser recorre los caracteres a
+medida que llegan y devuelve el texto nuevo del campo buscado (por defecto
+``question``) apenas se recibe, resolviendo los escapes de JSON.
+"""
+import json
+
+
+class JSONFieldStreamParser:
+    """
+    Extrae incrementalmente el valor string de una clave de primer nivel.
+
+    Uso::
+
+        parser = JSONFieldStreamParser("question")
+        for chunk in chunks:
+            delta = parser.feed(chunk)   # texto nuevo de "question" (puede ser "")
+    """
+
+    def __init__(self, field: str = "question"):
+        self.field = field
+        self.value = ""
+        self.done = False
+
+        self._depth = 0
+        self._in_string = False
+        self._is_key = False
+        self._after_colon = False
+        self._capturing = False
+        self._expect_value = False
+        self._escape = ""
+        self._key_chars = []
+        self._last_key = None
+
+    def feed(self, chunk: str) -> str:
+        """Procesa un fragmento y devuelve el texto nuevo del campo (o "")."""
+        if self.done or not chunk:
+            return ""
+
+        out = []
+        for ch in chunk:
+            if self._in_string:
+                self._string_char(ch, out)
+                if self.done:
+                    break
+            else:
+                self._structural_char(ch)
+
+        delta = "".join(out)
+        self.value += delta
+        return delta
+
+    # ---------- estados ----------
+
+    def _structural_char(self, ch: str):
+        if ch == "{" or ch == "[":
+            self._depth += 1
+            self._after_colon = False
+        elif ch == "}" or ch == "]":
+            self._depth = max(0, self._depth - 1)
+        elif ch == ":" and self._depth == 1:
+            self._after_colon = True
+            self._expect_value = self._last_key == self.field
+        elif ch == "," and self._depth == 1:
+            self._after_colon = False
+            self._expect_value = False
+        elif ch == '"' and self._depth >= 1:
+            self._in_string = True
+            self._is_key = self._depth == 1 and not self._after_colon
+            self._capturing = self._depth == 1 and self._after_colon and self._expect_value
+            self._key_chars = []
+
+    def _string_char(self, ch: str, out: list):
+        if self._escape:
+            self._escape += ch
+            decoded = self._decode_escape()
+            if decoded is None:
+                return
+            text, rest = decoded
+            self._escape = ""
+            self._emit(text, out)
+            for pending in rest:
+                self._string_char(pending, out)
+            return
+
+        if ch == "\\":
+            self._escape = ch
+        elif ch == '"':
+            self._in_string = False
+            if self._is_key:
+                self._last_key = "".join(self._key_chars)
+            elif self._capturing:
+                self._capturing = False
+                self.done = True
+            self._expect_value = False
+        else:
+            self._emit(ch, out)
+
+    def _emit(self, text: str, out: list):
+        if self._is_key:
+            self._key_chars.append(text)
+        elif self._capturing:
+            out.append(text)
+
+    def _decode_escape(self):
+        """
+        Devuelve ``(texto, resto)`` si el escape ya está completo, o None si faltan
+        caracteres. ``resto`` son caracteres leídos de más que hay que reprocesar.
+        """
+        esc = self._escape
+        if len(esc) < 2:
+            return None
+        if esc[1] != "u":
+            return self._loads(esc), ""
+        if len(esc) < 6:
+            return None
+
+        # Par sustituto (emojis, etc.): esperar la segunda mitad "\uXXXX"
+        try:
+            code = int(esc[2:6], 16)
+        except ValueError:
+            return "", ""
+        if 0xD800 <= code <= 0xDBFF:
+            if len(esc) == 6:
+                return None
+            if esc[6] != "\\" or (len(esc) >= 8 and esc[7] != "u"):
+                return self._loads(esc[:6]), esc[6:]
+            if len(esc) < 12:
+                return None
+
+        return self._loads(esc), ""
+
+    @staticmethod
+    def _loads(esc: str) -> str:
+        try:
+            return json.loads(f'"{esc}"')
+        except ValueError:
+            return ""
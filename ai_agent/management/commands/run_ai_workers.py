@@ -0,0 +1,61 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ai_agent.jobs import work, worker_id
+
+
+def _worker_main(index, poll_interval, stop_event):
+    import django
+    django.setup()
+
+    # El proceso padre maneja Ctrl+C; los hijos terminan cuando se activa stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    work(worker_id(index), stop_event.is_set, poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Procesa la cola de trabajos de IA (AIJob) con N procesos worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Número de procesos worker.")
+        parser.add_argument("--poll", type=float, default=0.5, help="Segundos entre consultas si la cola está vacía.")
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        stop_event = multiprocessing.Event()
+
+        # No compartir conexiones de BD con los procesos hijos
+        connections.close_all()
+
+        processes = [
+            multiprocessing.Process(
+                target=_worker_main,
+                args=(i, options["poll"], stop_event),
+                name=f"ai-worker-{i}",
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        self.stdout.write(self.style.SUCCESS(f"{workers} workers de IA en ejecución. Ctrl+C para detener."))
+
+        def _stop(*_):
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, _stop)
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            _stop()
+            for process in processes:
+                process.join()
+
+        self.stdout.write("Workers detenidos.")
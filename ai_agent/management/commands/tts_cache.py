@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_agent.providers.cache import get_tts_cache
+
+
+class Command(BaseCommand):
+    help = "Muestra los contadores de la caché de audio TTS (aciertos, fallos, tamaño) o la vacía."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clear", action="store_true", help="Borra todo el audio cacheado y los contadores.")
+
+    def handle(self, *args, **options):
+        cache = get_tts_cache()
+        if cache is None:
+            raise CommandError("La caché de audio TTS está desactivada (AI_TTS_CACHE).")
+
+        if options["clear"]:
+            cache.clear()
+            self.stdout.write(self.style.SUCCESS(f"Caché vaciada: {cache.directory}"))
+            return
+
+        stats = cache.stats()
+        self.stdout.write(f"Directorio: {cache.directory}")
+        self.stdout.write(f"Aciertos: {stats['hits']}  Fallos: {stats['misses']}  Tasa: {stats['hit_rate']:.1%}")
+        self.stdout.write(f"Escrituras: {stats['writes']}  Desalojos: {stats['evictions']}")
+        self.stdout.write(f"Tamaño: {stats['bytes'] / 1024 / 1024:.1f} MB de {stats['max_bytes'] / 1024 / 1024:.0f} MB")
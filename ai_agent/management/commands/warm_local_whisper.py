@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_agent.providers.whisper_local import _load_model, local_whisper_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Descarga y carga una vez el modelo Whisper local (AI_LOCAL_WHISPER), para que "
+        "el primer turno del servidor no espere la descarga."
+    )
+
+    def handle(self, *args, **options):
+        config = local_whisper_config()
+        started = time.monotonic()
+        try:
+            _load_model(config)
+        except ImportError:
+            raise CommandError("Falta faster-whisper: pip install faster-whisper")
+        self.stdout.write(self.style.SUCCESS(
+            f"Modelo {config['model']} listo en {time.monotonic() - started:.1f} s"
+        ))
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from ai_agent.opening_pool import evict_stale, normalize_position, refill_pool
+from ai_agent.providers import ProviderBusy
+from interviews.models import Interview
+
+
+class Command(BaseCommand):
+    help = (
+        "Precalienta el pool de preguntas de apertura. Sin --position usa los cargos "
+        "más frecuentes de las entrevistas existentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--position", action="append", default=[], help="Cargo a precalentar (repetible).")
+        parser.add_argument("--type", action="append", default=[], dest="types", help="Tipo de entrevista (repetible).")
+        parser.add_argument("--level", action="append", default=[], dest="levels", help="Nivel (repetible).")
+        parser.add_argument("--language", action="append", default=[], dest="languages", help="Idioma (repetible).")
+        parser.add_argument("--top", type=int, default=20, help="Cuántas combinaciones frecuentes tomar del historial.")
+        parser.add_argument("--size", type=int, default=None, help="Preguntas frescas por clave (por defecto OPENING_POOL_SIZE).")
+
+    def handle(self, *args, **options):
+        evicted = evict_stale()
+        self.stdout.write(f"Entradas vencidas eliminadas: {evicted}")
+
+        total = 0
+        busy = 0
+        for interview_type, level, language, position in self._targets(options):
+            key = (interview_type, level, language, normalize_position(position))
+            try:
+                created = refill_pool(key, position, size=options["size"])
+            except ProviderBusy as e:
+                # Cuota llena: lo creado hasta ahí queda; se sigue con la próxima clave
+                busy += 1
+                self.stdout.write(self.style.WARNING(f"  {key}: IA ocupada, reintenta en {e.retry_after} s"))
+                continue
+            total += created
+            self.stdout.write(f"  {key}: +{created}")
+
+        self.stdout.write(self.style.SUCCESS(f"Pool precalentado: {total} preguntas nuevas."))
+        if busy:
+            self.stdout.write(self.style.WARNING(
+                f"{busy} claves quedaron incompletas por cuota; vuelve a correr el comando más tarde."
+            ))
+
+    def _targets(self, options):
+        types = options["types"] or [code for code, _ in Interview.INTERVIEW_TYPES]
+        levels = options["levels"] or [code for code, _ in Interview.LEVELS]
+        languages = options["languages"] or [code for code, _ in Interview.LANGUAGES]
+
+        if options["position"]:
+            for position in options["position"]:
+                for interview_type in types:
+                    for level in levels:
+                        for language in languages:
+                            yield interview_type, level, language, position
+            return
+
+        # Combinaciones más usadas en el historial
+        seen = set()
+        frequent = (
+            Interview.objects.filter(
+                interview_type__in=types, level__in=levels, language__in=languages
+            )
+            .values("interview_type", "level", "language", "position")
+            .annotate(n=Count("id"))
+            .order_by("-n")
+        )
+        for row in frequent:
+            key = (row["interview_type"], row["level"], row["language"], normalize_position(row["position"]))
+            if key in seen:
+                continue
+            seen.add(key)
+            yield row["interview_type"], row["level"], row["language"], row["position"]
+            if len(seen) >= options["top"]:
+                break
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpeningQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interview_type', models.CharField(max_length=20)),
+                ('level', models.CharField(max_length=20)),
+                ('language', models.CharField(max_length=10)),
+                ('position_key', models.CharField(max_length=100)),
+                ('position', models.CharField(max_length=100)),
+                ('payload', models.JSONField()),
+                ('audio', models.BinaryField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('used_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['interview_type', 'level', 'language', 'position_key', 'used_at'], name='opening_pool_key_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,74 @@
 from django.db import models
 
-# Create your models here.
+
+class OpeningQuestion(models.Model):
+    """
+    Pregunta de apertura pregenerada (con su audio TTS) para arrancar entrevistas
+    sin esperar a Gemini. Se agrupan por (tipo, nivel, idioma, cargo normalizado).
+    Ver ai_agent/opening_pool.py.
+    """
+
+    interview_type = models.CharField(max_length=20)
+    level = models.CharField(max_length=20)
+    language = models.CharField(max_length=10)
+    position_key = models.CharField(max_length=100)
+    position = models.CharField(max_length=100)  # texto original usado en el prompt
+
+    payload = models.JSONField()  # question, feedback, scores (como generate_ai_response)
+    audio = models.BinaryField(null=True, blank=True)  # MP3 de la pregunta
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    used_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["interview_type", "level", "language", "position_key", "used_at"],
+                name="opening_pool_key_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"[{self.interview_type}/{self.level}/{self.language}] {self.position_key}: {self.payload.get('question', '')[:30]}"
+
+
+class AIJob(models.Model):
+    """
+    Trabajo de IA encolado en la BD (sin broker externo). Lo procesan los workers de
+    ``manage.py run_ai_workers``; ver ai_agent/jobs.py.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "En cola"),
+        ("running", "En proceso"),
+        ("done", "Terminado"),
+        ("dead", "Fallido (dead-letter)"),
+    ]
+
+    kind = models.CharField(max_length=30)
+    interview = models.ForeignKey(
+        "interviews.Interview", null=True, blank=True, on_delete=models.CASCADE, related_name="ai_jobs"
+    )
+    payload = models.JSONField(default=dict)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+
+    available_at = models.DateTimeField()  # no se entrega antes (reintentos con espera)
+    locked_until = models.DateTimeField(null=True, blank=True)  # visibility timeout
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="ai_job_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}#{self.pk} ({self.status})"
@@ -0,0 +1,175 @@
+# ai_agent/opening_pool.py
+"""
+Pool de preguntas de apertura pregeneradas.
+
+``interview_create`` toma una pregunta del pool (una lectura en BD) en lugar de
+esperar una llamada completa a Gemini. Cada vez que se consume una entrada se
+programa una recarga en segundo plano para esa clave, y el comando
+``manage.py warm_opening_questions`` permite precalentar el pool.
+
+Política de frescura:
+- Las entradas sin usar más antiguas que ``OPENING_POOL_MAX_AGE_HOURS`` no se
+  sirven y se eliminan en la siguiente limpieza.
+- Las entradas usadas se conservan ``OPENING_POOL_USED_RETENTION_HOURS`` (para
+  poder servir su audio) y luego se eliminan.
+"""
+import re
+import threading
+import unicodedata
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .models import OpeningQuestion
+
+
+PoolKey = Tuple[str, str, str, str]
+
+_refilling = set()
+_refilling_lock = threading.Lock()
+
+
+def _pool_size() -> int:
+    return getattr(settings, "OPENING_POOL_SIZE", 3)
+
+
+def _max_age() -> timedelta:
+    return timedelta(hours=getattr(settings, "OPENING_POOL_MAX_AGE_HOURS", 72))
+
+
+def _used_retention() -> timedelta:
+    return timedelta(hours=getattr(settings, "OPENING_POOL_USED_RETENTION_HOURS", 24))
+
+
+def normalize_position(position: str) -> str:
+    """'  Desarrollador  Backend (Python)' -> 'desarrollador backend python'"""
+    text = unicodedata.normalize("NFKD", position or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"[^a-z0-9+#]+", " ", text)
+    return " ".join(text.split())[:100]
+
+
+def pool_key(interview) -> PoolKey:
+    return (
+        interview.interview_type,
+        interview.level,
+        interview.language,
+        normalize_position(interview.position),
+    )
+
+
+def _fresh_entries(key: PoolKey):
+    interview_type, level, language, position_key = key
+    return OpeningQuestion.objects.filter(
+        interview_type=interview_type,
+        level=level,
+        language=language,
+        position_key=position_key,
+        used_at__isnull=True,
+        created_at__gte=timezone.now() - _max_age(),
+    )
+
+
+# =========================
+# CONSUMO
+# =========================
+def claim_opening_question(interview, refill: bool = True) -> Optional[OpeningQuestion]:
+    """
+    Reserva una pregunta fresca del pool para la entrevista, o devuelve None si no hay.
+    La reserva es atómica (UPDATE condicional), así dos entrevistas simultáneas nunca
+    reciben la misma entrada. Si se consumió una entrada, la clave se recarga en segundo
+    plano; las claves nuevas se siembran con ``warm_opening_questions``.
+    """
+    key = pool_key(interview)
+    claimed = None
+
+    for candidate in _fresh_entries(key).order_by("created_at").only("pk")[:3]:
+        now = timezone.now()
+        if OpeningQuestion.objects.filter(pk=candidate.pk, used_at__isnull=True).update(used_at=now):
+            claimed = OpeningQuestion.objects.get(pk=candidate.pk)
+            break
+
+    if claimed and refill:
+        schedule_refill(key, interview.position)
+
+    return claimed
+
+
+# =========================
+# RECARGA
+# =========================
+def _generate_entry(key: PoolKey, position: str) -> Optional[OpeningQuestion]:
+    from interviews.models import Interview
+
+    from .service import _fallback_payload, generate_ai_response
+    from .voice_utils import text_to_speech_edge_tts
+
+    interview_type, level, language, position_key = key
+
+    # Entrevista "en memoria" solo para armar el prompt (no se guarda)
+    draft = Interview(interview_type=interview_type, level=level, language=language, position=position)
+    payload = generate_ai_response(draft, "")
+
+    # No guardamos respuestas de respaldo: mejor una llamada en vivo que una pregunta genérica
+    if payload.get("question") == _fallback_payload()["question"]:
+        return None
+
+    audio = text_to_speech_edge_tts(payload["question"], language)
+
+    return OpeningQuestion.objects.create(
+        interview_type=interview_type,
+        level=level,
+        language=language,
+        position_key=position_key,
+        position=position,
+        payload=payload,
+        audio=audio,
+    )
+
+
+def refill_pool(key: PoolKey, position: str, size: Optional[int] = None) -> int:
+    """Genera entradas hasta tener ``size`` preguntas frescas para la clave. Devuelve cuántas creó."""
+    size = _pool_size() if size is None else size
+    missing = size - _fresh_entries(key).count()
+    created = 0
+
+    for _ in range(max(0, missing)):
+        if _generate_entry(key, position) is None:
+            break
+        created += 1
+
+    return created
+
+
+def schedule_refill(key: PoolKey, position: str):
+    """Recarga la clave en un hilo de fondo (como mucho una recarga por clave y proceso)."""
+    with _refilling_lock:
+        if key in _refilling:
+            return
+        _refilling.add(key)
+
+    def _run():
+        try:
+            evict_stale()
+            refill_pool(key, position)
+        except Exception as e:
+            print(f"[POOL] Error recargando {key}: {e}")
+        finally:
+            with _refilling_lock:
+                _refilling.discard(key)
+            connections.close_all()  # conexiones propias de este hilo
+
+    threading.Thread(target=_run, name=f"opening-pool-{key[3][:20]}", daemon=True).start()
+
+
+def evict_stale() -> int:
+    """Elimina entradas vencidas (sin usar y viejas, o usadas fuera de retención)."""
+    now = timezone.now()
+    deleted, _ = OpeningQuestion.objects.filter(
+        used_at__isnull=True, created_at__lt=now - _max_age()
+    ).delete()
+    deleted_used, _ = OpeningQuestion.objects.filter(used_at__lt=now - _used_retention()).delete()
+    return deleted + deleted_used
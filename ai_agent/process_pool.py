@@ -0,0 +1,96 @@
+# ai_agent/process_pool.py
+"""
+Pool de procesos de larga vida para trabajo pesado del proceso web.
+
+Un ``ProcessPoolExecutor`` con ``spawn`` (sin heredar hilos ni conexiones del
+proceso web) que se crea al primer uso. Cada proceso corre ``initializer`` al
+arrancar (cargar el modelo Whisper local, importar matplotlib), así que las
+tareas solo pagan su propio trabajo. Arrancar los procesos tarda segundos:
+``warm_in_background`` lo hace en un hilo y ``ready`` dice si ya terminó.
+
+Si un proceso muere (``BrokenProcessPool``, p.ej. sin memoria), ``reset``
+descarta el executor y el próximo uso crea otro, que se vuelve a precalentar.
+
+Lo usan ai_agent/providers/whisper_local.py y reports/charts.py.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+
+def _ping() -> int:
+    """Tarea vacía para forzar el arranque (y el ``initializer``) de un proceso."""
+    return os.getpid()
+
+
+class WarmProcessPool:
+    """Procesos ``spawn`` creados a demanda que se pueden precalentar sin bloquear."""
+
+    name = "process-pool"  # nombre del hilo de precalentamiento
+    warm_error = "[POOL] No se pudo precalentar el pool de procesos"
+
+    def __init__(self, workers: int, initializer: Callable, initargs: tuple = ()):
+        self.workers = workers
+        self._initializer = initializer
+        self._initargs = initargs
+        self._lock = threading.Lock()
+        self._executor = None
+        self._warming = None
+        self._ready = False
+
+    @property
+    def ready(self) -> bool:
+        """Todos los procesos del executor actual arrancaron y corrieron ``initializer``."""
+        return self._ready
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self._initializer,
+                    initargs=self._initargs,
+                )
+            return self._executor
+
+    def warm(self):
+        """Arranca todos los procesos y espera a que terminen ``initializer``."""
+        if not self.workers:
+            return
+        executor = self._get_executor()
+        for future in [executor.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        with self._lock:
+            self._ready = self._executor is executor
+
+    def warm_in_background(self):
+        """``warm`` en un hilo, una vez por executor."""
+        with self._lock:
+            if self._warming is not None or not self.workers:
+                return
+            self._warming = threading.Thread(target=self._warm_quietly, name=f"{self.name}-warm", daemon=True)
+        self._warming.start()
+
+    def _warm_quietly(self):
+        try:
+            self.warm()
+        except Exception as e:
+            print(f"{self.warm_error}: {e}")
+
+    def reset(self):
+        """Descarta el executor (un proceso murió): el próximo uso crea otro."""
+        with self._lock:
+            self._executor = None
+            self._warming = None
+            self._ready = False
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._warming = None
+            self._ready = False
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,132 @@
+# ai_agent/providers/__init__.py
+"""
+Capa de proveedores de IA seleccionable en settings::
+
+    AI_PROVIDERS = {"llm": "gemini", "stt": "openai", "tts": "edge"}
+
+Con ``"stub"`` se usan los backends locales de ai_agent/providers/stub.py (sin
+red), útiles para pruebas de carga. ``"local"`` en STT transcribe en CPU con
+Whisper abierto (ai_agent/providers/whisper_local.py). También se acepta una ruta completa a una
+clase, p.ej. ``"mi_app.providers.MiLLM"``.
+
+Cada proveedor real pasa por el limitador de cuota compartido entre procesos
+(``settings.AI_RATE_LIMITS``, ver ai_agent/providers/limiter.py), que lanza
+``ProviderBusy`` cuando la cola de espera está llena.
+
+Los clientes de red (pools keep-alive, plazos, salud) se comparten por proceso
+(``settings.AI_PROVIDER_CLIENTS``, ver ai_agent/providers/clients.py).
+
+El audio TTS pasa por una caché en disco (``settings.AI_TTS_CACHE``, ver
+ai_agent/providers/cache.py) salvo en modo replay.
+
+Con ``settings.AI_LLM_ROUTER`` el LLM se reparte entre varias rutas
+(``"gemini:models/..."``) con cobertura por latencia (ai_agent/providers/router.py).
+
+``settings.AI_CASSETTE`` permite grabar el tráfico real o reproducirlo sin
+contactar a los proveedores (ver ai_agent/providers/cassette.py).
+"""
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+PROVIDER_CLASSES = {
+    "llm": {
+        "gemini": "ai_agent.providers.gemini.GeminiProvider",
+        "stub": "ai_agent.providers.stub.StubLLMProvider",
+    },
+    "stt": {
+        "openai": "ai_agent.providers.openai_stt.OpenAITranscriptionProvider",
+        "local": "ai_agent.providers.whisper_local.LocalWhisperProvider",
+        "stub": "ai_agent.providers.stub.StubSTTProvider",
+    },
+    "tts": {
+        "edge": "ai_agent.providers.edge.EdgeTTSProvider",
+        "stub": "ai_agent.providers.stub.StubTTSProvider",
+    },
+}
+
+DEFAULT_PROVIDERS = {"llm": "gemini", "stt": "openai", "tts": "edge"}
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def get_provider(kind: str):
+    """Instancia (única por proceso) del proveedor configurado para ``kind``."""
+    name = getattr(settings, "AI_PROVIDERS", {}).get(kind, DEFAULT_PROVIDERS[kind])
+    key = (kind, name)
+
+    provider = _instances.get(key)
+    if provider is None:
+        with _lock:
+            provider = _instances.get(key)
+            if provider is None:
+                provider = _build_provider(kind, name)
+                _instances[key] = provider
+    return provider
+
+
+def _build_provider(kind: str, name: str):
+    from . import cassette
+
+    mode = cassette.cassette_mode()
+
+    # En replay no se instancia el proveedor real (no hace falta red ni API keys)
+    if mode == "replay":
+        return cassette.REPLAYERS[kind](cassette.get_cassette())
+
+    if kind == "llm":
+        from .router import build_router, router_enabled
+        if router_enabled():
+            return build_router(lambda spec: _build_provider_route(kind, spec, mode))
+
+    return _build_provider_route(kind, name, mode)
+
+
+def _build_provider_route(kind: str, spec: str, mode: str):
+    """Proveedor real desde ``nombre`` o ``nombre:modelo``, con limitador y grabación."""
+    from . import cassette
+    from .limiter import with_rate_limit
+
+    name, _, model = spec.partition(":")
+    cls = import_string(PROVIDER_CLASSES[kind].get(name, name))
+    provider = base = cls(model) if model else cls()
+    provider = with_rate_limit(kind, provider)
+
+    if mode == "record":
+        provider = cassette.RECORDERS[kind](provider, cassette.get_cassette())
+
+    # Los aciertos de la caché no consumen cuota ni se graban
+    if kind == "tts":
+        from .cache import with_tts_cache
+        provider = with_tts_cache(provider, f"{base.name}:{base.codec}")
+
+    return provider
+
+
+def get_llm():
+    return get_provider("llm")
+
+
+def get_stt():
+    return get_provider("stt")
+
+
+def get_tts():
+    return get_provider("tts")
+
+
+def reset_providers():
+    """Descarta las instancias (p.ej. tras cambiar settings en pruebas)."""
+    with _lock:
+        _instances.clear()
+
+
+def __getattr__(name):
+    # Reexporta ProviderBusy sin importar el limitador al cargar el paquete
+    if name == "ProviderBusy":
+        from .limiter import ProviderBusy
+        return ProviderBusy
+    raise AttributeError(name)
@@ -0,0 +1,78 @@
+# ai_agent/providers/base.py
+"""
+Interfaces de los proveedores de IA (LLM, transcripción y voz).
+
+Los proveedores trabajan con texto/bytes crudos y lanzan excepciones ante errores;
+el parseo del JSON, los fallbacks y la persistencia quedan en ai_agent/service.py
+y ai_agent/voice_utils.py.
+"""
+from typing import AsyncIterator, BinaryIO, Iterator
+
+from ..aio import run_coroutine
+
+
+class LLMProvider:
+    """Modelo de lenguaje: recibe instrucciones de sistema + prompt y devuelve texto."""
+
+    name = "llm"
+
+    @property
+    def limit_key(self) -> str:
+        """Clave del limitador de cuota (ai_agent/providers/limiter.py)."""
+        return self.name
+
+    def generate(self, system_instruction: str, prompt: str) -> str:
+        raise NotImplementedError
+
+    def stream(self, system_instruction: str, prompt: str) -> Iterator[str]:
+        """Fragmentos de texto a medida que llegan. Por defecto, un único fragmento."""
+        yield self.generate(system_instruction, prompt)
+
+    async def agenerate(self, system_instruction: str, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def astream(self, system_instruction: str, prompt: str) -> AsyncIterator[str]:
+        yield await self.agenerate(system_instruction, prompt)
+
+
+class STTProvider:
+    """Transcripción: recibe un archivo de audio (con ``.name``) y devuelve el texto."""
+
+    name = "stt"
+
+    @property
+    def limit_key(self) -> str:
+        """Clave del limitador de cuota (ai_agent/providers/limiter.py)."""
+        return self.name
+
+    def transcribe(self, audio_file: BinaryIO) -> str:
+        raise NotImplementedError
+
+    async def atranscribe(self, audio_file: BinaryIO) -> str:
+        raise NotImplementedError
+
+
+class TTSProvider:
+    """Síntesis de voz: produce fragmentos MP3 para un texto y una voz."""
+
+    name = "tts"
+    codec = "mp3"  # formato de salida; forma parte de la clave de la caché de audio
+
+    @property
+    def limit_key(self) -> str:
+        """Clave del limitador de cuota (ai_agent/providers/limiter.py)."""
+        return self.name
+
+    async def astream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        raise NotImplementedError
+        yield b""  # pragma: no cover (hace de esta función un generador async)
+
+    async def asynthesize(self, text: str, voice: str) -> bytes:
+        chunks = []
+        async for chunk in self.astream(text, voice):
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        """Versión síncrona: corre en el event loop compartido (ai_agent/aio.py)."""
+        return run_coroutine(self.asynthesize(text, voice))
@@ -0,0 +1,81 @@
+# ai_agent/providers/cache.py
+"""
+Caché en disco del audio TTS (ai_agent/disk_cache.py).
+
+La clave es ``hash(proveedor, códec, voz, texto)``: la pregunta de respaldo, las
+aperturas repetidas y las reproducciones devuelven el MP3 guardado sin volver a
+sintetizar (ni consumir cuota). Configuración en ``settings.AI_TTS_CACHE``::
+
+    AI_TTS_CACHE = {"enabled": True, "dir": "/var/cache/evalent/tts", "max_mb": 200}
+"""
+import asyncio
+import threading
+from typing import AsyncIterator, Optional
+
+from django.conf import settings
+
+from ..disk_cache import DiskCache
+from .base import TTSProvider
+
+
+# Fragmentos al servir un acierto, como los que entrega edge-tts al transmitir
+HIT_CHUNK_BYTES = 16 * 1024
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> Optional[DiskCache]:
+    """Caché de audio TTS del proceso, o None si está desactivada."""
+    global _cache
+    config = getattr(settings, "AI_TTS_CACHE", {}) or {}
+    if not config.get("enabled"):
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(config["dir"], int(config.get("max_mb", 200)) * 1024 * 1024, suffix=".mp3")
+    return _cache
+
+
+class CachedTTS(TTSProvider):
+    def __init__(self, inner: TTSProvider, cache: DiskCache, namespace: str):
+        self.inner = inner
+        self.cache = cache
+        self.namespace = namespace  # "proveedor:códec" del backend real
+        self.name = inner.name
+
+    @property
+    def limit_key(self) -> str:
+        return self.inner.limit_key
+
+    def cache_key(self, text: str, voice: str) -> str:
+        return self.cache.make_key(self.namespace, voice, text)
+
+    async def astream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        key = self.cache_key(text, voice)
+
+        # Lectura y escritura tocan disco y toman el flock de las estadísticas
+        # (set puede además desalojar): fuera del event loop
+        audio = await asyncio.to_thread(self.cache.get, key)
+        if audio:
+            for i in range(0, len(audio), HIT_CHUNK_BYTES):
+                yield audio[i:i + HIT_CHUNK_BYTES]
+            return
+
+        # Fallo: se transmite mientras se sintetiza y se guarda solo si terminó bien
+        chunks = []
+        async for chunk in self.inner.astream(text, voice):
+            chunks.append(chunk)
+            yield chunk
+
+        audio = b"".join(chunks)
+        if audio:
+            await asyncio.to_thread(self.cache.set, key, audio)
+
+
+def with_tts_cache(provider: TTSProvider, namespace: str) -> TTSProvider:
+    cache = get_tts_cache()
+    if cache is None:
+        return provider
+    return CachedTTS(provider, cache, namespace)
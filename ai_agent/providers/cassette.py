@@ -0,0 +1,402 @@
+# ai_agent/providers/cassette.py
+"""
+Grabación y reproducción ("cassette") del tráfico con los proveedores de IA.
+
+Con ``settings.AI_CASSETTE["mode"] = "record"`` cada llamada a Gemini, Whisper y
+edge-tts (o al proveedor configurado) se agrega a un archivo JSONL con su latencia
+medida. Los audios (entrada de STT y salida de TTS) se guardan aparte, una sola vez,
+en ``<archivo>.blobs/<sha256>``.
+
+Con ``"replay"`` no se contacta a ningún proveedor: se sirven las respuestas
+grabadas con la misma latencia (multiplicada por ``time_scale``). Cada petición se
+busca primero por su clave exacta (hash de la petición) y, si la build nueva
+genera prompts distintos, se toma la siguiente grabación del mismo tipo en orden.
+
+Formato de cada línea::
+
+    {"ts": ..., "kind": "llm|stt|tts", "op": "generate|stream|transcribe|synthesize",
+     "key": "<sha256>", "latency_ms": 812.4, "chunks": [...], "chunk_ms": [...],
+     "text": "...", "audio": "<sha256>", "error": null}
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import AsyncIterator, BinaryIO, Optional
+
+from django.conf import settings
+
+from .base import LLMProvider, STTProvider, TTSProvider
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+
+class CassetteMiss(RuntimeError):
+    """No hay grabación para la petición en modo replay."""
+
+
+class ReplayedProviderError(RuntimeError):
+    """Error que el proveedor devolvió durante la grabación."""
+
+
+def cassette_config() -> dict:
+    return getattr(settings, "AI_CASSETTE", {}) or {}
+
+
+def cassette_mode() -> str:
+    return cassette_config().get("mode", "off")
+
+
+def _sha256(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class Cassette:
+    """Archivo JSONL append-only + almacén de blobs por hash."""
+
+    def __init__(self, path: str, time_scale: float = 1.0):
+        self.path = str(path)
+        self.blob_dir = self.path + ".blobs"
+        self.time_scale = time_scale
+        self._write_lock = threading.Lock()
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    # ---------- grabación ----------
+
+    def put_blob(self, data: bytes) -> str:
+        digest = _sha256(data)
+        target = os.path.join(self.blob_dir, digest)
+        if not os.path.exists(target):
+            os.makedirs(self.blob_dir, exist_ok=True)
+            tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, target)
+        return digest
+
+    def append(self, entry: dict):
+        entry.setdefault("ts", time.time())
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        with self._write_lock, open(self.path, "a", encoding="utf-8") as fh:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                fh.write(line)
+                fh.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    # ---------- reproducción ----------
+
+    def _load(self):
+        by_key = defaultdict(deque)
+        by_kind = defaultdict(deque)
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    entry = json.loads(line)
+                    by_key[(entry["kind"], entry["op"], entry["key"])].append(entry)
+                    by_kind[(entry["kind"], entry["op"])].append(entry)
+        return by_key, by_kind
+
+    def next_entry(self, kind: str, op: str, key: str) -> dict:
+        with self._index_lock:
+            if self._index is None:
+                self._index = self._load()
+            by_key, by_kind = self._index
+
+            # Clave exacta primero; si no, la siguiente grabación del mismo tipo (en ciclo)
+            queue = by_key.get((kind, op, key)) or by_kind.get((kind, op))
+            if not queue:
+                raise CassetteMiss(f"Sin grabaciones para {kind}/{op} en {self.path}")
+            entry = queue.popleft()
+            queue.append(entry)
+            return entry
+
+    def get_blob(self, digest: str) -> bytes:
+        with open(os.path.join(self.blob_dir, digest), "rb") as fh:
+            return fh.read()
+
+    def delay(self, ms: float) -> float:
+        return max(0.0, (ms or 0) * self.time_scale / 1000)
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette:
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            config = cassette_config()
+            path = config.get("path") or os.path.join(settings.BASE_DIR, "cassettes", "provider_traffic.jsonl")
+            _cassette = Cassette(path, float(config.get("time_scale", 1.0)))
+    return _cassette
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.monotonic() - start) * 1000, 1)
+
+
+def _raise_recorded(entry: dict):
+    if entry.get("error"):
+        raise ReplayedProviderError(entry["error"])
+
+
+def _chunk_delays(cassette: Cassette, entry: dict):
+    """Esperas entre fragmentos a partir de los instantes grabados (ms desde el inicio)."""
+    previous = 0.0
+    for ms in entry.get("chunk_ms", []):
+        yield cassette.delay(ms - previous)
+        previous = ms
+
+
+# =========================
+# LLM
+# =========================
+class RecordingLLM(LLMProvider):
+    def __init__(self, inner: LLMProvider, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+        self.name = f"record:{inner.name}"
+
+    def _record(self, op, system_instruction, prompt, start, chunks=None, chunk_ms=None, error=None):
+        self.cassette.append({
+            "kind": "llm",
+            "op": op,
+            "provider": self.inner.name,
+            "key": _sha256(system_instruction + "\0" + prompt),
+            "prompt_chars": len(prompt),
+            "latency_ms": _elapsed_ms(start),
+            "chunks": chunks or [],
+            "chunk_ms": chunk_ms or [],
+            "error": error,
+        })
+
+    def generate(self, system_instruction, prompt):
+        start = time.monotonic()
+        try:
+            text = self.inner.generate(system_instruction, prompt)
+        except Exception as e:
+            self._record("generate", system_instruction, prompt, start, error=repr(e))
+            raise
+        self._record("generate", system_instruction, prompt, start, [text], [_elapsed_ms(start)])
+        return text
+
+    def stream(self, system_instruction, prompt):
+        start = time.monotonic()
+        chunks, chunk_ms = [], []
+        try:
+            for text in self.inner.stream(system_instruction, prompt):
+                chunks.append(text)
+                chunk_ms.append(_elapsed_ms(start))
+                yield text
+        except Exception as e:
+            self._record("stream", system_instruction, prompt, start, chunks, chunk_ms, repr(e))
+            raise
+        self._record("stream", system_instruction, prompt, start, chunks, chunk_ms)
+
+    async def agenerate(self, system_instruction, prompt):
+        start = time.monotonic()
+        try:
+            text = await self.inner.agenerate(system_instruction, prompt)
+        except Exception as e:
+            self._record("generate", system_instruction, prompt, start, error=repr(e))
+            raise
+        self._record("generate", system_instruction, prompt, start, [text], [_elapsed_ms(start)])
+        return text
+
+    async def astream(self, system_instruction, prompt):
+        start = time.monotonic()
+        chunks, chunk_ms = [], []
+        try:
+            async for text in self.inner.astream(system_instruction, prompt):
+                chunks.append(text)
+                chunk_ms.append(_elapsed_ms(start))
+                yield text
+        except Exception as e:
+            self._record("stream", system_instruction, prompt, start, chunks, chunk_ms, repr(e))
+            raise
+        self._record("stream", system_instruction, prompt, start, chunks, chunk_ms)
+
+
+class ReplayLLM(LLMProvider):
+    name = "replay"
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def _entry(self, op, system_instruction, prompt):
+        return self.cassette.next_entry("llm", op, _sha256(system_instruction + "\0" + prompt))
+
+    def generate(self, system_instruction, prompt):
+        entry = self._entry("generate", system_instruction, prompt)
+        time.sleep(self.cassette.delay(entry["latency_ms"]))
+        _raise_recorded(entry)
+        return "".join(entry["chunks"])
+
+    def stream(self, system_instruction, prompt):
+        entry = self._entry("stream", system_instruction, prompt)
+        for chunk, delay in zip(entry["chunks"], _chunk_delays(self.cassette, entry)):
+            time.sleep(delay)
+            yield chunk
+        _raise_recorded(entry)
+
+    async def agenerate(self, system_instruction, prompt):
+        entry = self._entry("generate", system_instruction, prompt)
+        await asyncio.sleep(self.cassette.delay(entry["latency_ms"]))
+        _raise_recorded(entry)
+        return "".join(entry["chunks"])
+
+    async def astream(self, system_instruction, prompt):
+        entry = self._entry("stream", system_instruction, prompt)
+        for chunk, delay in zip(entry["chunks"], _chunk_delays(self.cassette, entry)):
+            await asyncio.sleep(delay)
+            yield chunk
+        _raise_recorded(entry)
+
+
+# =========================
+# STT
+# =========================
+class RecordingSTT(STTProvider):
+    def __init__(self, inner: STTProvider, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+        self.name = f"record:{inner.name}"
+
+    def _prepare(self, audio_file: BinaryIO) -> str:
+        digest = self.cassette.put_blob(audio_file.read())
+        audio_file.seek(0)
+        return digest
+
+    def _record(self, digest, start, text=None, error=None):
+        self.cassette.append({
+            "kind": "stt",
+            "op": "transcribe",
+            "provider": self.inner.name,
+            "key": digest,
+            "audio": digest,
+            "latency_ms": _elapsed_ms(start),
+            "text": text,
+            "error": error,
+        })
+
+    def transcribe(self, audio_file):
+        digest = self._prepare(audio_file)
+        start = time.monotonic()
+        try:
+            text = self.inner.transcribe(audio_file)
+        except Exception as e:
+            self._record(digest, start, error=repr(e))
+            raise
+        self._record(digest, start, text)
+        return text
+
+    async def atranscribe(self, audio_file):
+        digest = self._prepare(audio_file)
+        start = time.monotonic()
+        try:
+            text = await self.inner.atranscribe(audio_file)
+        except Exception as e:
+            self._record(digest, start, error=repr(e))
+            raise
+        self._record(digest, start, text)
+        return text
+
+
+class ReplaySTT(STTProvider):
+    name = "replay"
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def _entry(self, audio_file):
+        return self.cassette.next_entry("stt", "transcribe", _sha256(audio_file.read()))
+
+    def transcribe(self, audio_file):
+        entry = self._entry(audio_file)
+        time.sleep(self.cassette.delay(entry["latency_ms"]))
+        _raise_recorded(entry)
+        return entry["text"]
+
+    async def atranscribe(self, audio_file):
+        entry = self._entry(audio_file)
+        await asyncio.sleep(self.cassette.delay(entry["latency_ms"]))
+        _raise_recorded(entry)
+        return entry["text"]
+
+
+# =========================
+# TTS
+# =========================
+class RecordingTTS(TTSProvider):
+    def __init__(self, inner: TTSProvider, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+        self.name = f"record:{inner.name}"
+
+    async def astream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        start = time.monotonic()
+        chunks, chunk_ms = [], []
+        error = None
+        try:
+            async for chunk in self.inner.astream(text, voice):
+                chunks.append(chunk)
+                chunk_ms.append(_elapsed_ms(start))
+                yield chunk
+        except Exception as e:
+            error = repr(e)
+            raise
+        finally:
+            self.cassette.append({
+                "kind": "tts",
+                "op": "synthesize",
+                "provider": self.inner.name,
+                "key": _sha256(voice + "\0" + text),
+                "voice": voice,
+                "text_chars": len(text),
+                "latency_ms": _elapsed_ms(start),
+                "audio": self.cassette.put_blob(b"".join(chunks)),
+                "chunk_sizes": [len(c) for c in chunks],
+                "chunk_ms": chunk_ms,
+                "error": error,
+            })
+
+
+class ReplayTTS(TTSProvider):
+    name = "replay"
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    async def astream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        entry = self.cassette.next_entry("tts", "synthesize", _sha256(voice + "\0" + text))
+        audio = self.cassette.get_blob(entry["audio"])
+
+        offset = 0
+        for size, delay in zip(entry.get("chunk_sizes", []), _chunk_delays(self.cassette, entry)):
+            await asyncio.sleep(delay)
+            yield audio[offset:offset + size]
+            offset += size
+        _raise_recorded(entry)
+
+
+RECORDERS = {"llm": RecordingLLM, "stt": RecordingSTT, "tts": RecordingTTS}
+REPLAYERS = {"llm": ReplayLLM, "stt": ReplaySTT, "tts": ReplayTTS}
@@ -0,0 +1,156 @@
+# ai_agent/providers/clients.py
+"""
+Clientes de red de los proveedores, compartidos por todo el proceso.
+
+Crear un cliente (``OpenAI(...)``, un ``GenerativeModel``) por llamada abre una
+conexión TLS nueva en cada turno de la entrevista. Aquí cada cliente se crea una
+vez y lo reusan todas las vistas, hilos y workers del proceso, con su pool de
+conexiones keep-alive. Los clientes async se guardan por event loop (el del
+servidor ASGI y el compartido de ai_agent/aio.py), porque sus conexiones quedan
+atadas al loop que las abrió.
+
+Cada llamada pasa por ``track(nombre)``, que registra latencia y errores. Tras
+``recycle_after`` errores seguidos el cliente se descarta y el siguiente uso
+abre conexiones nuevas (p. ej. tras un corte de red que dejó el pool roto).
+
+Configuración (``settings.AI_PROVIDER_CLIENTS``), por proveedor::
+
+    AI_PROVIDER_CLIENTS = {
+        "openai": {"timeout": 30, "connect_timeout": 5, "max_connections": 20,
+                   "max_keepalive": 10, "keepalive_expiry": 60, "max_retries": 1},
+        "gemini": {"timeout": 60},
+        "edge": {"connect_timeout": 10, "receive_timeout": 60},
+    }
+"""
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+
+
+DEFAULTS = {
+    "timeout": 60,
+    "connect_timeout": 10,
+    "receive_timeout": 60,
+    "max_connections": 20,
+    "max_keepalive": 10,
+    "keepalive_expiry": 60,
+    "max_retries": 1,
+    "recycle_after": 3,
+}
+
+_clients = {}
+_async_clients = {}  # nombre -> {loop: cliente}
+_health = {}
+_lock = threading.Lock()
+
+
+def client_config(name: str) -> dict:
+    return {**DEFAULTS, **getattr(settings, "AI_PROVIDER_CLIENTS", {}).get(name, {})}
+
+
+def get_client(name: str, factory: Callable[[dict], Any]) -> Any:
+    """Cliente síncrono único por proceso; ``factory(config)`` lo crea la primera vez."""
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = factory(client_config(name))
+                _clients[name] = client
+    return client
+
+
+def get_async_client(name: str, factory: Callable[[dict], Any]) -> Any:
+    """Cliente async único por event loop (debe llamarse dentro de una corrutina)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _async_clients.setdefault(name, weakref.WeakKeyDictionary())
+        client = per_loop.get(loop)
+        if client is None:
+            client = factory(client_config(name))
+            per_loop[loop] = client
+    return client
+
+
+def discard_clients(name: Optional[str] = None):
+    """Olvida los clientes (de ``name`` o todos): el próximo uso abre conexiones nuevas."""
+    with _lock:
+        for key in [k for k in _clients if name is None or k == name]:
+            close = getattr(_clients.pop(key), "close", None)
+            if close:
+                try:
+                    close()
+                except Exception:
+                    pass
+        # Los async se cierran solos al recolectarse (no hay loop garantizado aquí)
+        for key in [k for k in _async_clients if name is None or k == name]:
+            del _async_clients[key]
+
+
+class ClientHealth:
+    """Latencia y errores recientes de un proveedor en este proceso."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_latency_ms = None
+        self.avg_latency_ms = None  # media móvil exponencial
+        self.last_success_at = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.consecutive_failures == 0
+
+    def as_dict(self) -> dict:
+        return {**vars(self), "healthy": self.healthy}
+
+
+def _health_for(name: str) -> ClientHealth:
+    health = _health.get(name)
+    if health is None:
+        with _lock:
+            health = _health.setdefault(name, ClientHealth())
+    return health
+
+
+@contextmanager
+def track(name: str):
+    """Registra latencia y resultado de una llamada; recicla el cliente tras varios errores seguidos."""
+    health = _health_for(name)
+    started = time.monotonic()
+    try:
+        yield
+    except (GeneratorExit, asyncio.CancelledError):
+        raise  # el consumidor cortó (cliente desconectado): no es un error del proveedor
+    except BaseException as e:
+        with _lock:
+            health.calls += 1
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_error = f"{type(e).__name__}: {e}"[:300]
+            recycle = health.consecutive_failures % client_config(name)["recycle_after"] == 0
+        if recycle:
+            discard_clients(name)
+        raise
+
+    elapsed = (time.monotonic() - started) * 1000
+    with _lock:
+        health.calls += 1
+        health.consecutive_failures = 0
+        health.last_latency_ms = round(elapsed, 1)
+        health.avg_latency_ms = round(
+            elapsed if health.avg_latency_ms is None else 0.8 * health.avg_latency_ms + 0.2 * elapsed, 1
+        )
+        health.last_success_at = time.time()
+
+
+def provider_health() -> dict:
+    """Estado de cada proveedor usado en este proceso."""
+    return {name: health.as_dict() for name, health in _health.items()}
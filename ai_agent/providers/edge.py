@@ -0,0 +1,25 @@
+# ai_agent/providers/edge.py
+"""Síntesis de voz con edge-tts (alternativa gratuita)."""
+from typing import AsyncIterator
+
+from .base import TTSProvider
+from .clients import client_config, track
+
+
+class EdgeTTSProvider(TTSProvider):
+    name = "edge"
+    codec = "audio-24khz-48kbitrate-mono-mp3"  # formato por defecto de edge-tts
+
+    async def astream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        import edge_tts
+
+        # edge-tts abre un websocket por síntesis (cierra su sesión al terminar),
+        # así que no hay pool que compartir: solo los plazos y el registro de salud
+        config = client_config("edge")
+        communicate = edge_tts.Communicate(
+            text, voice, connect_timeout=config["connect_timeout"], receive_timeout=config["receive_timeout"]
+        )
+        with track("edge"):
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    yield chunk["data"]
@@ -0,0 +1,101 @@
+# ai_agent/providers/gemini.py
+"""Gemini vía AI Studio (google-generativeai). NO mezclar con Vertex ni gRPC."""
+from typing import AsyncIterator, Iterator
+
+from django.conf import settings
+
+from .base import LLMProvider
+from .clients import client_config, get_client, track
+
+
+# Modelos válidos en AI Studio:
+# - "models/gemini-2.5-flash" (veloz y barato)
+# - "models/gemini-2.5-pro"   (razonamiento más potente)
+DEFAULT_MODEL_ID = "models/gemini-2.5-flash"
+
+
+def _extract_text(response) -> str:
+    """Extrae el texto de una respuesta (o de un fragmento en streaming) del SDK."""
+    text = ""
+    try:
+        # Formato usual del SDK
+        text = getattr(response, "text", "") or ""
+        if not text and getattr(response, "candidates", None):
+            # Respaldo por si cambia el formato
+            cand = response.candidates[0]
+            if cand and getattr(cand, "content", None) and cand.content.parts:
+                part = cand.content.parts[0]
+                text = getattr(part, "text", "") or ""
+    except Exception:
+        pass
+    return text
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, model_id: str = None):
+        # Requiere: pip install -U google-generativeai
+        import google.generativeai as genai
+
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self._genai = genai
+        self.model_id = model_id or getattr(settings, "GEMINI_MODEL_ID", DEFAULT_MODEL_ID)
+
+    @property
+    def limit_key(self) -> str:
+        return f"gemini:{self.model_id}"
+
+    def _model(self, system_instruction: str):
+        # Un GenerativeModel por instrucción de sistema (son pocas y fijas), compartido
+        # por el proceso en vez de construirlo en cada llamada
+        models = get_client("gemini", lambda config: {})
+        key = (self.model_id, system_instruction)
+        model = models.get(key)
+        if model is None:
+            model = models.setdefault(
+                key, self._genai.GenerativeModel(self.model_id, system_instruction=system_instruction)
+            )
+        return model
+
+    @staticmethod
+    def _request_options():
+        return {"timeout": client_config("gemini")["timeout"]}
+
+    @staticmethod
+    def _contents(prompt: str):
+        return [{"role": "user", "parts": [prompt]}]
+
+    def generate(self, system_instruction: str, prompt: str) -> str:
+        with track("gemini"):
+            response = self._model(system_instruction).generate_content(
+                self._contents(prompt), request_options=self._request_options()
+            )
+        return _extract_text(response)
+
+    def stream(self, system_instruction: str, prompt: str) -> Iterator[str]:
+        with track("gemini"):
+            response = self._model(system_instruction).generate_content(
+                self._contents(prompt), stream=True, request_options=self._request_options()
+            )
+            for chunk in response:
+                text = _extract_text(chunk)
+                if text:
+                    yield text
+
+    async def agenerate(self, system_instruction: str, prompt: str) -> str:
+        with track("gemini"):
+            response = await self._model(system_instruction).generate_content_async(
+                self._contents(prompt), request_options=self._request_options()
+            )
+        return _extract_text(response)
+
+    async def astream(self, system_instruction: str, prompt: str) -> AsyncIterator[str]:
+        with track("gemini"):
+            response = await self._model(system_instruction).generate_content_async(
+                self._contents(prompt), stream=True, request_options=self._request_options()
+            )
+            async for chunk in response:
+                text = _extract_text(chunk)
+                if text:
+                    yield text
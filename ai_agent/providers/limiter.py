@@ -0,0 +1,253 @@
+# ai_agent/providers/limiter.py
+"""
+Limitador de llamadas salientes a los proveedores, compartido entre procesos.
+
+Cada clave (proveedor + modelo) tiene dos token buckets: peticiones por segundo
+(``rps``) y tokens por minuto (``tpm``). El estado vive en un archivo por clave
+protegido con ``flock``, así todos los workers del mismo servidor comparten la
+cuota.
+
+Admisión con reserva: quien llega toma los tokens aunque el saldo quede negativo
+y espera el tiempo necesario para saldar la deuda. Eso reparte las llamadas al
+ritmo de la cuota en vez de dispararlas todas a la vez. La cola de espera está
+acotada:
+
+- si ya hay ``max_queue`` llamadas esperando, o
+- si la espera estimada supera ``max_wait`` segundos (plazo de la petición),
+
+se rechaza de inmediato con ``ProviderBusy(retry_after)`` sin consumir cuota, y
+la vista responde "ocupado, reintenta en N s" (HTTP 429).
+
+Configuración (``settings.AI_RATE_LIMITS``), por clave exacta o por proveedor::
+
+    AI_RATE_LIMITS = {
+        "gemini:models/gemini-2.5-flash": {"rps": 5, "tpm": 250000, "max_queue": 50, "max_wait": 15},
+        "openai": {"rps": 3, "max_queue": 20, "max_wait": 20},
+    }
+"""
+import asyncio
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+
+from ..context import estimate_tokens
+from .base import LLMProvider, STTProvider, TTSProvider
+
+try:
+    import fcntl
+except ImportError:  # Windows: el límite queda por proceso
+    fcntl = None
+
+
+class ProviderBusy(Exception):
+    """El proveedor está al límite de su cuota; reintentar en ``retry_after`` segundos."""
+
+    def __init__(self, key: str, retry_after: float):
+        self.key = key
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"Proveedor {key} ocupado, reintenta en {self.retry_after} s")
+
+
+def _state_dir() -> str:
+    return getattr(settings, "AI_RATE_LIMIT_DIR", None) or os.path.join(tempfile.gettempdir(), "evalent-ratelimits")
+
+
+def limit_config(key: str) -> Optional[dict]:
+    """Configuración para ``proveedor:modelo``; si no existe, la del proveedor."""
+    limits = getattr(settings, "AI_RATE_LIMITS", {}) or {}
+    return limits.get(key) or limits.get(key.split(":", 1)[0])
+
+
+class RateLimiter:
+    def __init__(self, key: str, config: dict):
+        self.key = key
+        self.rps = float(config.get("rps") or 0)
+        self.tpm = float(config.get("tpm") or 0)
+        self.max_queue = int(config.get("max_queue", 50))
+        self.max_wait = float(config.get("max_wait", 15))
+
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", key)
+        os.makedirs(_state_dir(), exist_ok=True)
+        self.path = os.path.join(_state_dir(), f"{safe}.json")
+        self._thread_lock = threading.Lock()
+
+    # ---------- estado compartido ----------
+
+    def _read(self, fh, now: float) -> dict:
+        fh.seek(0)
+        raw = fh.read()
+        try:
+            state = json.loads(raw) if raw else {}
+        except ValueError:
+            state = {}
+        state.setdefault("rps_tokens", self.rps)
+        state.setdefault("tpm_tokens", self.tpm)
+        state.setdefault("updated", now)
+        state.setdefault("pending", [])
+        return state
+
+    def _write(self, fh, state: dict):
+        fh.seek(0)
+        fh.truncate()
+        fh.write(json.dumps(state))
+        fh.flush()
+
+    def _refill(self, state: dict, now: float):
+        elapsed = max(0.0, now - state["updated"])
+        if self.rps:
+            state["rps_tokens"] = min(self.rps, state["rps_tokens"] + elapsed * self.rps)
+        if self.tpm:
+            state["tpm_tokens"] = min(self.tpm, state["tpm_tokens"] + elapsed * self.tpm / 60)
+        state["updated"] = now
+        # Reservas cuya espera ya terminó dejan de contar en la cola
+        state["pending"] = [due for due in state["pending"] if due > now]
+
+    def _wait_for(self, state: dict, tokens: int) -> float:
+        wait = 0.0
+        if self.rps:
+            wait = max(wait, (1 - state["rps_tokens"]) / self.rps)
+        if self.tpm:
+            # Una petición más grande que el bucket entero espera a tenerlo lleno
+            needed = min(tokens, self.tpm)
+            wait = max(wait, (needed - state["tpm_tokens"]) * 60 / self.tpm)
+        return max(0.0, wait)
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserva cuota para una llamada. Devuelve cuántos segundos esperar antes de hacerla."""
+        with self._thread_lock, open(self.path, "a+", encoding="utf-8") as fh:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                state = self._read(fh, now)
+                self._refill(state, now)
+
+                wait = self._wait_for(state, tokens)
+
+                if wait > 0 and len(state["pending"]) >= self.max_queue:
+                    raise ProviderBusy(self.key, wait)
+                if wait > self.max_wait:
+                    raise ProviderBusy(self.key, wait)
+
+                if self.rps:
+                    state["rps_tokens"] -= 1
+                if self.tpm:
+                    state["tpm_tokens"] -= min(tokens, self.tpm)
+                if wait > 0:
+                    state["pending"].append(now + wait)
+
+                self._write(fh, state)
+                return wait
+            finally:
+                if fcntl:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def acquire(self, tokens: int = 0):
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0):
+        # reserve() bloquea (flock sobre el archivo de estado): fuera del event loop
+        wait = await asyncio.to_thread(self.reserve, tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(key: str) -> Optional[RateLimiter]:
+    """Limitador para la clave, o None si no hay límites configurados."""
+    config = limit_config(key)
+    if not config:
+        return None
+
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = RateLimiter(key, config)
+    return limiter
+
+
+# =========================
+# ENVOLTORIOS DE PROVEEDORES
+# =========================
+class _LimitedMixin:
+    @property
+    def limit_key(self) -> str:
+        return self.inner.limit_key
+
+
+class LimitedLLM(_LimitedMixin, LLMProvider):
+    def __init__(self, inner: LLMProvider, limiter: RateLimiter):
+        self.inner = inner
+        self.limiter = limiter
+        self.name = inner.name
+
+    def _tokens(self, system_instruction: str, prompt: str) -> int:
+        output = getattr(settings, "AI_RATE_LIMIT_OUTPUT_TOKENS", 300)
+        return estimate_tokens(system_instruction) + estimate_tokens(prompt) + output
+
+    def generate(self, system_instruction, prompt):
+        self.limiter.acquire(self._tokens(system_instruction, prompt))
+        return self.inner.generate(system_instruction, prompt)
+
+    def stream(self, system_instruction, prompt):
+        self.limiter.acquire(self._tokens(system_instruction, prompt))
+        yield from self.inner.stream(system_instruction, prompt)
+
+    async def agenerate(self, system_instruction, prompt):
+        await self.limiter.aacquire(self._tokens(system_instruction, prompt))
+        return await self.inner.agenerate(system_instruction, prompt)
+
+    async def astream(self, system_instruction, prompt):
+        await self.limiter.aacquire(self._tokens(system_instruction, prompt))
+        async for chunk in self.inner.astream(system_instruction, prompt):
+            yield chunk
+
+
+class LimitedSTT(_LimitedMixin, STTProvider):
+    def __init__(self, inner: STTProvider, limiter: RateLimiter):
+        self.inner = inner
+        self.limiter = limiter
+        self.name = inner.name
+
+    def transcribe(self, audio_file):
+        self.limiter.acquire()
+        return self.inner.transcribe(audio_file)
+
+    async def atranscribe(self, audio_file):
+        await self.limiter.aacquire()
+        return await self.inner.atranscribe(audio_file)
+
+
+class LimitedTTS(_LimitedMixin, TTSProvider):
+    def __init__(self, inner: TTSProvider, limiter: RateLimiter):
+        self.inner = inner
+        self.limiter = limiter
+        self.name = inner.name
+
+    async def astream(self, text, voice):
+        await self.limiter.aacquire()
+        async for chunk in self.inner.astream(text, voice):
+            yield chunk
+
+
+LIMITED = {"llm": LimitedLLM, "stt": LimitedSTT, "tts": LimitedTTS}
+
+
+def with_rate_limit(kind: str, provider):
+    """Envuelve el proveedor con su limitador, si hay límites configurados para él."""
+    limiter = get_limiter(provider.limit_key)
+    if limiter is None:
+        return provider
+    return LIMITED[kind](provider, limiter)
@@ -0,0 +1,75 @@
+# ai_agent/providers/openai_stt.py
+"""Transcripción con la API de OpenAI (Whisper / GPT-4o audio)."""
+from typing import BinaryIO
+
+from django.conf import settings
+
+from .base import STTProvider
+from .clients import get_async_client, get_client, track
+
+
+def _http_options(config: dict) -> dict:
+    import httpx
+
+    return {
+        "timeout": httpx.Timeout(config["timeout"], connect=config["connect_timeout"]),
+        "limits": httpx.Limits(
+            max_connections=config["max_connections"],
+            max_keepalive_connections=config["max_keepalive"],
+            keepalive_expiry=config["keepalive_expiry"],
+        ),
+    }
+
+
+def _sync_client(config: dict):
+    from openai import DefaultHttpxClient, OpenAI
+
+    options = _http_options(config)
+    return OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=options["timeout"],
+        max_retries=config["max_retries"],
+        http_client=DefaultHttpxClient(**options),
+    )
+
+
+def _async_client(config: dict):
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    options = _http_options(config)
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=options["timeout"],
+        max_retries=config["max_retries"],
+        http_client=DefaultAsyncHttpxClient(**options),
+    )
+
+
+class OpenAITranscriptionProvider(STTProvider):
+    name = "openai"
+
+    def __init__(self, model: str = None):
+        if not settings.OPENAI_API_KEY:
+            raise RuntimeError("No hay OPENAI_API_KEY en settings.")
+
+        # Modelo de transcripción:
+        # - "gpt-4o-mini-transcribe" (nuevo audio STT)
+        # - o "whisper-1" (clásico)
+        self.model = model or getattr(settings, "OPENAI_STT_MODEL", "whisper-1")
+
+    @property
+    def limit_key(self) -> str:
+        return f"openai:{self.model}"
+
+    def transcribe(self, audio_file: BinaryIO) -> str:
+        # Cliente y pool de conexiones compartidos por el proceso (ai_agent/providers/clients.py)
+        client = get_client("openai", _sync_client)
+        with track("openai"):
+            transcription = client.audio.transcriptions.create(model=self.model, file=audio_file)
+        return (transcription.text or "").strip()
+
+    async def atranscribe(self, audio_file: BinaryIO) -> str:
+        client = get_async_client("openai", _async_client)
+        with track("openai"):
+            transcription = await client.audio.transcriptions.create(model=self.model, file=audio_file)
+        return (transcription.text or "").strip()
@@ -0,0 +1,328 @@
+# ai_agent/providers/router.py
+"""
+Enrutado del LLM con cobertura ("hedging") según la latencia observada.
+
+Con varias rutas configuradas (modelos o proveedores), cada llamada va a la
+primera ruta sana. Si no respondió cuando ya pasó su percentil de latencia
+(p95 por defecto), se lanza la misma petición a la siguiente ruta y se usa la
+que conteste primero; la otra se cancela. En streaming cuenta el primer
+fragmento, que es lo que el candidato ve; en ``generate`` la respuesta
+completa. Son distribuciones distintas, así que cada ruta guarda una ventana
+de latencias por tipo de llamada. Si una ruta falla (error o
+``ProviderBusy``), se pasa a la siguiente de inmediato en vez de caer en la
+pregunta de respaldo.
+
+Las coberturas por tiempo están acotadas: como máximo ``max_hedge_ratio`` de
+las llamadas (con una pequeña ráfaga), para que un proveedor lento no duplique
+el tráfico. Las rutas con ``unhealthy_after`` errores seguidos se saltan
+durante ``cooldown`` segundos; ``ProviderBusy`` (cuota local llena) pasa a la
+siguiente ruta pero no cuenta como error, la ruta sigue sana.
+
+Configuración (``settings.AI_LLM_ROUTER``)::
+
+    AI_LLM_ROUTER = {
+        "enabled": True,
+        "routes": ["gemini:models/gemini-2.5-flash", "gemini:models/gemini-2.0-flash"],
+        "percentile": 95,
+        "window": 200,            # latencias recientes por ruta y tipo de llamada
+        "min_samples": 20,        # antes de eso se usa default_hedge_ms
+        "default_hedge_ms": 4000,
+        "max_hedge_ratio": 0.1,
+        "unhealthy_after": 3,
+        "cooldown": 30,
+    }
+
+Cada ruta es ``proveedor`` o ``proveedor:modelo`` y pasa por su propio
+limitador de cuota. Las estadísticas son por proceso.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Callable, Iterator, List
+
+from django.conf import settings
+
+from .base import LLMProvider
+from .limiter import ProviderBusy
+
+
+# Tipos de llamada con ventanas de latencia separadas
+CALL_KINDS = ("stream", "generate")
+
+
+DEFAULTS = {
+    "enabled": False,
+    "routes": [],
+    "percentile": 95,
+    "window": 200,
+    "min_samples": 20,
+    "default_hedge_ms": 4000,
+    "max_hedge_ratio": 0.1,
+    "hedge_burst": 3,
+    "unhealthy_after": 3,
+    "cooldown": 30,
+    "threads": 16,
+}
+
+
+def router_config() -> dict:
+    return {**DEFAULTS, **getattr(settings, "AI_LLM_ROUTER", {})}
+
+
+def router_enabled() -> bool:
+    config = router_config()
+    return bool(config["enabled"]) and len(config["routes"]) > 1
+
+
+class Route:
+    """Un proveedor/modelo con sus latencias recientes (por tipo de llamada) y su racha de errores."""
+
+    def __init__(self, spec: str, provider: LLMProvider, config: dict):
+        self.spec = spec
+        self.provider = provider
+        self.config = config
+        self.latencies = {kind: deque(maxlen=config["window"]) for kind in CALL_KINDS}
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.hedged_wins = 0
+        self._lock = threading.Lock()
+
+    def hedge_after(self, kind: str) -> float:
+        """Segundos de espera antes de cubrir esta ruta con la siguiente en llamadas ``kind``."""
+        with self._lock:
+            samples = sorted(self.latencies[kind])
+        if len(samples) < self.config["min_samples"]:
+            return self.config["default_hedge_ms"] / 1000
+        index = min(len(samples) - 1, int(len(samples) * self.config["percentile"] / 100))
+        return samples[index]
+
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def success(self, kind: str, seconds: float):
+        with self._lock:
+            self.latencies[kind].append(seconds)
+            self.consecutive_failures = 0
+
+    def failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.config["unhealthy_after"]:
+                self.down_until = time.monotonic() + self.config["cooldown"]
+                self.consecutive_failures = 0
+
+    def stats(self) -> dict:
+        stats = {"healthy": self.healthy(), "hedged_wins": self.hedged_wins}
+        for kind in CALL_KINDS:
+            with self._lock:
+                samples = sorted(self.latencies[kind])
+            p = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000) if samples else None
+            stats[kind] = {"samples": len(samples), "p50_ms": p(0.5), "p95_ms": p(0.95)}
+        return stats
+
+
+class HedgedLLM(LLMProvider):
+    name = "router"
+
+    def __init__(self, routes: List[Route], config: dict):
+        self.routes = routes
+        self.config = config
+        self._budget = float(config["hedge_burst"])
+        self._budget_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=config["threads"], thread_name_prefix="llm-hedge")
+
+    @property
+    def limit_key(self) -> str:
+        return self.routes[0].provider.limit_key
+
+    # ---------- política ----------
+
+    def _candidates(self) -> List[Route]:
+        """Rutas sanas en orden de preferencia; si ninguna lo está, todas."""
+        healthy = [route for route in self.routes if route.healthy()]
+        return healthy or list(self.routes)
+
+    def _tick(self):
+        with self._budget_lock:
+            self._budget = min(self.config["hedge_burst"], self._budget + self.config["max_hedge_ratio"])
+
+    def _take_hedge(self) -> bool:
+        with self._budget_lock:
+            if self._budget >= 1:
+                self._budget -= 1
+                return True
+            return False
+
+    def stats(self) -> List[dict]:
+        return [{"route": route.spec, **route.stats()} for route in self.routes]
+
+    # ---------- carrera síncrona (hilos) ----------
+
+    def _race(self, kind: str, call: Callable, discard: Callable = None):
+        """
+        Corre ``call(route)`` en la primera ruta y, si hace falta, en las
+        siguientes. Devuelve el primer resultado exitoso; ``discard`` recibe los
+        resultados de las que perdieron. ``kind`` elige la ventana de latencias.
+        """
+        self._tick()
+        pending = self._candidates()
+        running = {}
+        errors = []
+        hedge_at = None
+
+        def start(route):
+            nonlocal hedge_at
+            started = time.monotonic()
+            running[self._executor.submit(call, route)] = (route, started)
+            hedge_at = started + route.hedge_after(kind) if pending else None
+
+        start(pending.pop(0))
+        try:
+            while running:
+                timeout = max(0.0, hedge_at - time.monotonic()) if hedge_at else None
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # Se cumplió el percentil sin respuesta: cobertura (si hay cupo)
+                    if self._take_hedge():
+                        start(pending.pop(0))
+                    else:
+                        hedge_at = None
+                    continue
+
+                for future in done:
+                    route, started = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Sin cupo local no es un fallo de la ruta: se pasa a otra sin marcarla
+                        if not isinstance(e, ProviderBusy):
+                            route.failure()
+                        errors.append(e)
+                        continue
+                    route.success(kind, time.monotonic() - started)
+                    if running:
+                        route.hedged_wins += route is not self.routes[0]
+                    return result
+
+                # Falló lo que estaba corriendo: se pasa a la siguiente ruta ya
+                if not running and pending:
+                    start(pending.pop(0))
+        finally:
+            for future in running:
+                future.cancel()
+                if discard:
+                    future.add_done_callback(lambda f: f.cancelled() or f.exception() or discard(f.result()))
+
+        raise errors[0]
+
+    def generate(self, system_instruction, prompt):
+        return self._race("generate", lambda route: route.provider.generate(system_instruction, prompt))
+
+    def stream(self, system_instruction, prompt) -> Iterator[str]:
+        def first_chunk(route):
+            chunks = iter(route.provider.stream(system_instruction, prompt))
+            return chunks, next(chunks, None)
+
+        chunks, first = self._race("stream", first_chunk, discard=lambda pair: pair[0].close())
+        if first is None:
+            return
+        yield first
+        yield from chunks
+
+    # ---------- carrera async (tareas) ----------
+
+    async def _arace(self, kind: str, call: Callable, discard: Callable = None):
+        """Versión async de ``_race``: las perdedoras se cancelan."""
+        self._tick()
+        pending = self._candidates()
+        running = {}
+        errors = []
+        hedge_at = None
+
+        def start(route):
+            nonlocal hedge_at
+            started = time.monotonic()
+            running[asyncio.ensure_future(call(route))] = (route, started)
+            hedge_at = started + route.hedge_after(kind) if pending else None
+
+        start(pending.pop(0))
+        try:
+            while running:
+                timeout = max(0.0, hedge_at - time.monotonic()) if hedge_at else None
+                done, _ = await asyncio.wait(list(running), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    if self._take_hedge():
+                        start(pending.pop(0))
+                    else:
+                        hedge_at = None
+                    continue
+
+                winner = None
+                for task in done:
+                    route, started = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        # Sin cupo local no es un fallo de la ruta: se pasa a otra sin marcarla
+                        if not isinstance(e, ProviderBusy):
+                            route.failure()
+                        errors.append(e)
+                        continue
+                    if winner is None:
+                        route.success(kind, time.monotonic() - started)
+                        if running or len(done) > 1:
+                            route.hedged_wins += route is not self.routes[0]
+                        winner = result
+                    elif discard:
+                        await discard(result)
+                if winner is not None:
+                    return winner
+
+                if not running and pending:
+                    start(pending.pop(0))
+        finally:
+            for task in running:
+                task.cancel()
+            for task in running:
+                try:
+                    result = await task
+                except BaseException:
+                    continue
+                if discard:
+                    await discard(result)
+
+        raise errors[0]
+
+    async def agenerate(self, system_instruction, prompt):
+        return await self._arace("generate", lambda route: route.provider.agenerate(system_instruction, prompt))
+
+    async def astream(self, system_instruction, prompt) -> AsyncIterator[str]:
+        async def first_chunk(route):
+            chunks = route.provider.astream(system_instruction, prompt).__aiter__()
+            try:
+                return chunks, await chunks.__anext__()
+            except StopAsyncIteration:
+                return chunks, None
+
+        async def discard(pair):
+            await pair[0].aclose()
+
+        chunks, first = await self._arace("stream", first_chunk, discard=discard)
+        if first is None:
+            return
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+
+def build_router(build: Callable[[str], LLMProvider]) -> HedgedLLM:
+    """``build(spec)`` construye cada ruta (con su limitador/grabación) desde ``proveedor[:modelo]``."""
+    config = router_config()
+    return HedgedLLM([Route(spec, build(spec), config) for spec in config["routes"]], config)
@@ -0,0 +1,220 @@
+# ai_agent/providers/stub.py
+"""
+Proveedores locales de prueba (sin red ni cuota) para pruebas de carga.
+
+- LLM: JSON válido según el esquema del entrevistador, determinista según el prompt.
+- STT: transcripción simulada, determinista según los bytes del audio.
+- TTS: MP3 pequeño y válido (frames de silencio) con duración proporcional al texto.
+
+La latencia y la tasa de errores se configuran en ``settings.AI_STUB``::
+
+    AI_STUB = {
+        "seed": None,  # fija la secuencia de latencias/errores
+        "llm": {"latency": {"dist": "lognormal", "median_ms": 1200, "sigma": 0.35}, "error_rate": 0.01},
+        "stt": {"latency": {"dist": "uniform", "min_ms": 300, "max_ms": 900}, "error_rate": 0.0},
+        "tts": {"latency": {"dist": "fixed", "ms": 250}, "error_rate": 0.0},
+    }
+
+Distribuciones: ``fixed`` (ms), ``uniform`` (min_ms, max_ms) y ``lognormal``
+(median_ms, sigma). En streaming, ``first_token_ratio`` (0-1, por defecto 0.3)
+indica qué parte de la latencia pasa antes del primer fragmento.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import AsyncIterator, BinaryIO, Iterator, List
+
+from django.conf import settings
+
+from .base import LLMProvider, STTProvider, TTSProvider
+
+
+class StubProviderError(RuntimeError):
+    """Error simulado (según ``error_rate``)."""
+
+
+_rng = None
+_rng_lock = threading.Lock()
+
+
+def _config(kind: str) -> dict:
+    return getattr(settings, "AI_STUB", {}).get(kind, {})
+
+
+def _random() -> random.Random:
+    global _rng
+    if _rng is None:
+        _rng = random.Random(getattr(settings, "AI_STUB", {}).get("seed"))
+    return _rng
+
+
+def sample_latency(kind: str) -> float:
+    """Latencia simulada en segundos para ``kind`` (llm, stt o tts)."""
+    spec = _config(kind).get("latency", {})
+    dist = spec.get("dist", "fixed")
+
+    with _rng_lock:
+        rng = _random()
+        if dist == "uniform":
+            ms = rng.uniform(spec.get("min_ms", 0), spec.get("max_ms", 0))
+        elif dist == "lognormal":
+            ms = spec.get("median_ms", 0) * rng.lognormvariate(0, spec.get("sigma", 0.3))
+        else:
+            ms = spec.get("ms", 0)
+
+    return max(0.0, ms) / 1000
+
+
+def maybe_fail(kind: str):
+    rate = _config(kind).get("error_rate", 0)
+    with _rng_lock:
+        failed = rate and _random().random() < rate
+    if failed:
+        raise StubProviderError(f"Error simulado del proveedor {kind}")
+
+
+def _digest(data) -> int:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return int.from_bytes(hashlib.sha256(data).digest()[:8], "big")
+
+
+# =========================
+# LLM
+# =========================
+STUB_QUESTIONS = [
+    "¿Puedes contarme sobre un proyecto del que te sientas orgulloso?",
+    "¿Cómo manejas los desacuerdos con tu equipo?",
+    "Describe una situación en la que tuviste que aprender algo rápidamente.",
+    "¿Qué harías si no llegas a cumplir una fecha de entrega?",
+    "¿Cuál ha sido el error más importante de tu carrera y qué aprendiste de él?",
+    "¿Por qué te interesa este cargo?",
+]
+
+STUB_FEEDBACK = [
+    "Estructura tu respuesta con el método STAR y cierra con un resultado medible.",
+    "Buen ejemplo; intenta ser más concreto con las cifras.",
+    "Evita respuestas genéricas: menciona herramientas y decisiones específicas.",
+]
+
+
+def _stub_scores(rng: random.Random) -> dict:
+    return {k: rng.randint(40, 95) for k in ["claridad", "confianza", "contenido", "creatividad", "lenguaje"]}
+
+
+def stub_llm_text(prompt: str, system_instruction: str = "") -> str:
+    seed = _digest(prompt)
+    rng = random.Random(seed)
+
+    # Puntaje en lote (modo diferido): una evaluación por cada [#n] del prompt
+    if '"evaluations"' in system_instruction:
+        return json.dumps({
+            "evaluations": [
+                {"id": int(n), "feedback": STUB_FEEDBACK[(seed + int(n)) % len(STUB_FEEDBACK)], "scores": _stub_scores(rng)}
+                for n in re.findall(r"^\[#(\d+)\]$", prompt, re.MULTILINE)
+            ],
+        }, ensure_ascii=False)
+
+    return json.dumps({
+        "question": STUB_QUESTIONS[seed % len(STUB_QUESTIONS)],
+        "feedback": STUB_FEEDBACK[seed % len(STUB_FEEDBACK)],
+        "scores": _stub_scores(rng),
+    }, ensure_ascii=False)
+
+
+def _split_chunks(text: str, size: int = 12) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _first_token_ratio() -> float:
+    return _config("llm").get("first_token_ratio", 0.3)
+
+
+class StubLLMProvider(LLMProvider):
+    name = "stub"
+
+    def generate(self, system_instruction: str, prompt: str) -> str:
+        time.sleep(sample_latency("llm"))
+        maybe_fail("llm")
+        return stub_llm_text(prompt, system_instruction)
+
+    def stream(self, system_instruction: str, prompt: str) -> Iterator[str]:
+        latency = sample_latency("llm")
+        chunks = _split_chunks(stub_llm_text(prompt, system_instruction))
+        time.sleep(latency * _first_token_ratio())
+        maybe_fail("llm")
+        per_chunk = latency * (1 - _first_token_ratio()) / max(1, len(chunks))
+        for chunk in chunks:
+            yield chunk
+            time.sleep(per_chunk)
+
+    async def agenerate(self, system_instruction: str, prompt: str) -> str:
+        await asyncio.sleep(sample_latency("llm"))
+        maybe_fail("llm")
+        return stub_llm_text(prompt, system_instruction)
+
+    async def astream(self, system_instruction: str, prompt: str) -> AsyncIterator[str]:
+        latency = sample_latency("llm")
+        chunks = _split_chunks(stub_llm_text(prompt, system_instruction))
+        await asyncio.sleep(latency * _first_token_ratio())
+        maybe_fail("llm")
+        per_chunk = latency * (1 - _first_token_ratio()) / max(1, len(chunks))
+        for chunk in chunks:
+            yield chunk
+            await asyncio.sleep(per_chunk)
+
+
+# =========================
+# STT
+# =========================
+def stub_transcript(audio: bytes) -> str:
+    n = _digest(audio) % 1000
+    return f"Esta es una respuesta simulada número {n} para pruebas de carga."
+
+
+class StubSTTProvider(STTProvider):
+    name = "stub"
+
+    def transcribe(self, audio_file: BinaryIO) -> str:
+        audio = audio_file.read()
+        time.sleep(sample_latency("stt"))
+        maybe_fail("stt")
+        return stub_transcript(audio)
+
+    async def atranscribe(self, audio_file: BinaryIO) -> str:
+        audio = audio_file.read()
+        await asyncio.sleep(sample_latency("stt"))
+        maybe_fail("stt")
+        return stub_transcript(audio)
+
+
+# =========================
+# TTS
+# =========================
+# Frame MPEG-1 Layer III, 128 kbps, 44.1 kHz, mono, sin CRC: cabecera + side info
+# en cero = silencio válido. 417 bytes y ~26 ms por frame.
+_MP3_SILENT_FRAME = bytes([0xFF, 0xFB, 0x90, 0xC0]) + bytes(413)
+_FRAME_SECONDS = 1152 / 44100
+
+
+def stub_mp3(text: str) -> bytes:
+    """MP3 de silencio con ~0,3 s por palabra (máximo 30 s)."""
+    seconds = min(30.0, max(0.5, 0.3 * len(text.split())))
+    return _MP3_SILENT_FRAME * int(seconds / _FRAME_SECONDS)
+
+
+class StubTTSProvider(TTSProvider):
+    name = "stub"
+
+    async def astream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        await asyncio.sleep(sample_latency("tts"))
+        maybe_fail("tts")
+        audio = stub_mp3(text)
+        # Fragmentos de ~40 frames, como los que entrega edge-tts
+        step = len(_MP3_SILENT_FRAME) * 40
+        for i in range(0, len(audio), step):
+            yield audio[i:i + step]
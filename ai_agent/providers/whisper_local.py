@@ -0,0 +1,168 @@
+# ai_agent/providers/whisper_local.py
+"""
+Transcripción local en CPU con un modelo Whisper abierto (``faster-whisper``).
+
+El modelo se carga una sola vez por proceso trabajador: un pool de procesos de
+larga vida (``ProcessPoolExecutor`` con ``spawn``) lo mantiene en memoria y
+atiende las transcripciones de todas las vistas y workers del proceso web.
+Cargar el modelo por petición costaría segundos; así cada turno solo paga la
+inferencia (el pool es ai_agent/process_pool.py). El pool se precarga en segundo plano al crear el proveedor; la
+descarga del modelo (lo más lento) se puede hacer antes de servir con
+``manage.py warm_local_whisper``.
+
+La cola es acotada: con todos los procesos ocupados se aceptan hasta
+``max_queue`` audios en espera y luego se responde ``ProviderBusy`` (HTTP 429),
+igual que con la cuota de un proveedor remoto.
+
+Configuración (``settings.AI_LOCAL_WHISPER``)::
+
+    AI_LOCAL_WHISPER = {
+        "model": "small",          # tiny/base/small/medium/large-v3 o ruta local
+        "compute_type": "int8",    # int8 = más rápido en CPU, float32 = más preciso
+        "workers": 2,              # procesos con el modelo cargado
+        "cpu_threads": 2,          # hilos de inferencia por proceso
+        "beam_size": 1,            # 1 = greedy (rápido); 5 = mejor precisión, ~2-3x más lento
+        "language": "es",          # None = detección automática (más lenta)
+        "max_queue": 8,
+        "timeout": 120,
+    }
+
+Se selecciona con ``AI_PROVIDERS["stt"] = "local"`` (``AI_STT_PROVIDER=local``).
+Requiere ``pip install faster-whisper``; el paquete solo se importa en los
+procesos trabajadores.
+"""
+import asyncio
+import io
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO
+
+from django.conf import settings
+
+from ..process_pool import WarmProcessPool
+from .base import STTProvider
+from .limiter import ProviderBusy
+
+
+DEFAULTS = {
+    "model": "small",
+    "compute_type": "int8",
+    "workers": 2,
+    "cpu_threads": 2,
+    "beam_size": 1,
+    "language": "es",
+    "max_queue": 8,
+    "timeout": 120,
+    "download_root": None,
+}
+
+
+def local_whisper_config() -> dict:
+    return {**DEFAULTS, **getattr(settings, "AI_LOCAL_WHISPER", {})}
+
+
+# ---------- PROCESO TRABAJADOR ----------
+# Estas funciones corren en los procesos del pool (sin Django): reciben la
+# configuración ya resuelta y guardan el modelo en una global del proceso.
+
+_model = None
+
+
+def _load_model(config: dict):
+    global _model
+    from faster_whisper import WhisperModel
+
+    _model = WhisperModel(
+        config["model"],
+        device="cpu",
+        compute_type=config["compute_type"],
+        cpu_threads=config["cpu_threads"],
+        download_root=config["download_root"],
+    )
+
+
+def _transcribe_bytes(data: bytes, beam_size: int, language) -> str:
+    segments, _info = _model.transcribe(io.BytesIO(data), beam_size=beam_size, language=language)
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+# ---------- POOL DEL PROCESO WEB ----------
+
+class WhisperPool(WarmProcessPool):
+    """Procesos con el modelo cargado y una cola acotada delante."""
+
+    name = "local-whisper"
+    warm_error = "[STT] No se pudo precargar el modelo Whisper local"
+
+    def __init__(self, config: dict):
+        super().__init__(max(1, int(config["workers"])), _load_model, (config,))
+        self.config = config
+        self.capacity = self.workers + max(0, int(config["max_queue"]))
+        self._pending = 0
+
+    def submit(self, data: bytes):
+        """Encola la transcripción; ``ProviderBusy`` si la cola está llena."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                # Estimación gruesa: una ronda de inferencia por cada proceso ocupado
+                raise ProviderBusy("local-whisper", retry_after=self._pending / self.workers * 5)
+            self._pending += 1
+
+        try:
+            future = self._get_executor().submit(
+                _transcribe_bytes, data, int(self.config["beam_size"]), self.config["language"]
+            )
+        except BaseException as e:
+            self._release()
+            if isinstance(e, BrokenProcessPool):
+                self.reset()
+            raise
+
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _on_done(self, future):
+        self._release()
+        if isinstance(future.exception(), BrokenProcessPool):
+            self.reset()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_whisper_pool() -> WhisperPool:
+    """Pool único por proceso web."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WhisperPool(local_whisper_config())
+    return _pool
+
+
+class LocalWhisperProvider(STTProvider):
+    name = "local"
+
+    def __init__(self):
+        self.pool = get_whisper_pool()
+        self.timeout = self.pool.config["timeout"]
+        # Sin bloquear: se construye bajo el lock de get_provider() y a veces desde el event loop.
+        # Las transcripciones que lleguen antes esperan en la cola del pool.
+        self.pool.warm_in_background()
+
+    @property
+    def limit_key(self) -> str:
+        return f"local:{self.pool.config['model']}"
+
+    def transcribe(self, audio_file: BinaryIO) -> str:
+        return self.pool.submit(audio_file.read()).result(self.timeout)
+
+    async def atranscribe(self, audio_file: BinaryIO) -> str:
+        data = await asyncio.to_thread(audio_file.read)
+        future = asyncio.wrap_future(self.pool.submit(data))
+        return await asyncio.wait_for(future, self.timeout)
@@ -1,21 +1,19 @@
 import json
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
-import google.generativeai as genai
-from django.conf import settings
+from asgiref.sync import sync_to_async
+
+from .context import _interview_header, build_prompt
+from .json_stream import JSONFieldStreamParser
+from .providers import get_llm
+from .providers.limiter import ProviderBusy
 
 
 # =========================
-# CONFIGURACIÓN DEL CLIENTE
+# PROVEEDOR
 # =========================
-# Usamos AI Studio (google-generativeai). NO mezclar con Vertex ni gRPC.
-# Requiere: pip install -U google-generativeai
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
-# Modelos válidos en AI Studio sin prefijo "models/":
-# - "gemini-1.5-pro"   (razonamiento más potente)
-# - "gemini-1.5-flash" (más veloz y barato)
-MODEL_ID = "models/gemini-2.5-flash"
+# El modelo se elige en settings.AI_PROVIDERS["llm"] (Gemini por defecto, "stub"
+# para pruebas de carga sin red). Ver ai_agent/providers/.
 
 
 # =========================
@@ -40,8 +38,46 @@ Reglas:
 - Devuelve SOLO el JSON. Nada de texto adicional.
 - No uses saltos de línea innecesarios fuera del JSON.
 - Llena todos los campos y mantén los puntajes como enteros de 0 a 100.
+- Formula la pregunta en el idioma de la entrevista y adáptala al tipo, nivel y cargo indicados.
+- Usa el resumen y la conversación reciente para no repetir preguntas.
 """.strip()
 
+# Modo "deferred": el turno solo pide la pregunta (prompt y salida más cortos);
+# las respuestas se puntúan en lote al finalizar con SCORING_INSTRUCTIONS.
+QUESTION_INSTRUCTIONS = """
+Eres un entrevistador profesional. Debes responder SIEMPRE en JSON estricto con esta forma:
+
+{"question": "<siguiente pregunta breve y clara>"}
+
+Reglas:
+- Devuelve SOLO el JSON. Nada de texto adicional.
+- Formula la pregunta en el idioma de la entrevista y adáptala al tipo, nivel y cargo indicados.
+- Usa el resumen y la conversación reciente para no repetir preguntas.
+""".strip()
+
+SCORING_INSTRUCTIONS = """
+Eres un evaluador de entrevistas. Recibirás varias respuestas del candidato, cada una
+marcada como [#n] junto a la pregunta que respondía. Evalúa cada una por separado y
+responde SIEMPRE en JSON estricto con esta forma:
+
+{
+  "evaluations": [
+    {
+      "id": <n>,
+      "feedback": "<consejo concreto y accionable sobre esa respuesta>",
+      "scores": {"claridad": <0-100>, "confianza": <0-100>, "contenido": <0-100>, "creatividad": <0-100>, "lenguaje": <0-100>}
+    }
+  ]
+}
+
+Reglas:
+- Devuelve SOLO el JSON, con una evaluación por cada [#n] recibido.
+- Escribe el feedback en el idioma de la entrevista.
+- Mantén los puntajes como enteros de 0 a 100.
+""".strip()
+
+SCORE_KEYS = ["claridad", "confianza", "contenido", "creatividad", "lenguaje"]
+
 
 def _fallback_payload() -> Dict[str, Any]:
     """Respuesta de respaldo si el modelo no devuelve JSON válido."""
@@ -83,58 +119,182 @@ def _safe_parse_json(text: str) -> Dict[str, Any]:
     return _fallback_payload()
 
 
+def _normalize_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalización mínima de claves por si el modelo cambió nombres."""
+    if not isinstance(data, dict):
+        data = _fallback_payload()
+
+    data.setdefault("question", _fallback_payload()["question"])
+    data.setdefault("feedback", _fallback_payload()["feedback"])
+    data.setdefault("scores", _fallback_payload()["scores"])
+
+    # Asegurar que scores tenga todas las subclaves
+    for k in SCORE_KEYS:
+        data["scores"].setdefault(k, 50)
+
+    return data
+
+
+def _deferred(interview) -> bool:
+    return getattr(interview, "scoring_mode", "live") == "deferred"
+
+
+def _instructions(interview) -> str:
+    return QUESTION_INSTRUCTIONS if _deferred(interview) else SYSTEM_INSTRUCTIONS
+
+
+def _finalize(interview, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normaliza la respuesta; en modo diferido solo se conserva la pregunta."""
+    data = _normalize_payload(data)
+    if _deferred(interview):
+        return question_only(data)
+    return data
+
+
+def question_only(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Turno sin feedback ni puntajes (modo de puntaje diferido)."""
+    return {"question": data.get("question"), "feedback": None, "scores": None}
+
+
 # =========================
 # FUNCIÓN PÚBLICA
 # =========================
 def generate_ai_response(interview, user_message: str) -> Dict[str, Any]:
     """
     Genera la siguiente pregunta, feedback y puntuaciones a partir de la interacción del usuario.
-    Devuelve SIEMPRE un dict con las claves: question, feedback, scores.
+    Devuelve SIEMPRE un dict con las claves: question, feedback, scores (en modo de
+    puntaje diferido, feedback y scores son None).
+    Solo lanza ``ProviderBusy`` si el limitador de cuota rechazó la llamada.
     """
-    # Construimos un prompt compacto: instrucciones + contexto + mensaje del usuario.
-    # Con AI Studio, no uses 'models/...', solo el ID simple (p.ej. "gemini-1.5-pro").
-    model = genai.GenerativeModel(
-        MODEL_ID,
-        system_instruction=SYSTEM_INSTRUCTIONS,
-    )
-
-    # Puedes ajustar los parámetros si lo deseas (temperatura, top_p, etc.)
-    # Aquí usamos el call simple; si quieres más control, usa generate_content({'contents': ...}, generation_config=...)
+    # Construimos un prompt compacto: instrucciones + contexto acotado + mensaje del usuario.
+    prompt = build_prompt(interview, user_message)
+
     try:
-        response = model.generate_content(
-            [
-                # Mensaje del usuario (tu app puede incluir más contexto de 'interview' si hace falta)
-                {"role": "user", "parts": [f"Mensaje del candidato: {user_message}"]},
-            ]
-        )
+        text = get_llm().generate(_instructions(interview), prompt)
+    except ProviderBusy:
+        # Cola de cuota llena: la vista responde "ocupado, reintenta en N s"
+        raise
     except Exception as e:
         # Si hay cualquier error de red/credenciales/etc., devolvemos fallback
-        return _fallback_payload()
+        return _finalize(interview, _fallback_payload())
+
+    # Parseo robusto del JSON
+    return _finalize(interview, _safe_parse_json(text))
+
+
+def stream_ai_response(interview, user_message: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Igual que ``generate_ai_response`` pero en streaming.
+
+    Produce eventos ``("question", delta)`` con el texto de la pregunta a medida que
+    llega del modelo y, al final, un único ``("done", data)`` con el dict completo
+    (question, feedback, scores). Si el stream falla o el JSON final no es válido,
+    ``data`` es el fallback y su ``question`` reemplaza lo emitido hasta ese momento.
+    """
+    prompt = build_prompt(interview, user_message)
+    parser = JSONFieldStreamParser("question")
+    chunks = []
 
-    # Extraer el texto
-    text = ""
     try:
-        # Formato usual del SDK
-        text = getattr(response, "text", "") or ""
-        if not text and getattr(response, "candidates", None):
-            # Respaldo por si cambia el formato
-            cand = response.candidates[0]
-            if cand and getattr(cand, "content", None) and cand.content.parts:
-                part = cand.content.parts[0]
-                text = getattr(part, "text", "") or ""
+        for text in get_llm().stream(_instructions(interview), prompt):
+            chunks.append(text)
+            delta = parser.feed(text)
+            if delta:
+                yield "question", delta
+    except ProviderBusy:
+        raise
     except Exception:
-        pass
+        yield "done", _finalize(interview, _fallback_payload())
+        return
+
+    yield "done", _finalize(interview, _safe_parse_json("".join(chunks)))
+
+
+# =========================
+# VERSIONES ASYNC (vistas ASGI)
+# =========================
+async def agenerate_ai_response(interview, user_message: str) -> Dict[str, Any]:
+    """Versión async de ``generate_ai_response``: no ocupa un hilo mientras el modelo responde."""
+    # Armar el contexto toca el ORM -> fuera del event loop
+    prompt = await sync_to_async(build_prompt)(interview, user_message)
+
+    try:
+        text = await get_llm().agenerate(_instructions(interview), prompt)
+    except ProviderBusy:
+        raise
+    except Exception:
+        return _finalize(interview, _fallback_payload())
+
+    return _finalize(interview, _safe_parse_json(text))
+
+
+async def astream_ai_response(interview, user_message: str) -> AsyncIterator[Tuple[str, Any]]:
+    """Versión async de ``stream_ai_response`` (mismos eventos)."""
+    prompt = await sync_to_async(build_prompt)(interview, user_message)
+    parser = JSONFieldStreamParser("question")
+    chunks = []
+
+    try:
+        async for text in get_llm().astream(_instructions(interview), prompt):
+            chunks.append(text)
+            delta = parser.feed(text)
+            if delta:
+                yield "question", delta
+    except ProviderBusy:
+        raise
+    except Exception:
+        yield "done", _finalize(interview, _fallback_payload())
+        return
+
+    yield "done", _finalize(interview, _safe_parse_json("".join(chunks)))
+
+
+# =========================
+# PUNTAJE EN LOTE (modo diferido)
+# =========================
+def _scoring_prompt(interview, items: List[Tuple[str, str]]) -> str:
+    parts = [_interview_header(interview, progress=False), "", "Respuestas a evaluar:"]
+    for n, (question, answer) in enumerate(items, start=1):
+        parts.append(f"\n[#{n}]\nPregunta: {question or '(sin pregunta)'}\nRespuesta: {answer}")
+    return "\n".join(parts)
+
+
+def score_answers(interview, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Puntúa varias respuestas ``(pregunta, respuesta)`` en una sola llamada al LLM.
+
+    Devuelve, en el mismo orden, ``{"feedback", "scores"}`` por respuesta, o None
+    si el modelo no la evaluó (queda pendiente para un próximo intento). Si la
+    llamada falla, todas quedan en None. Lanza ``ProviderBusy`` si no hay cuota.
+    """
+    if not items:
+        return []
+
+    try:
+        text = get_llm().generate(SCORING_INSTRUCTIONS, _scoring_prompt(interview, items))
+    except ProviderBusy:
+        raise
+    except Exception:
+        return [None] * len(items)
 
-    # Parseo robusto del JSON
     data = _safe_parse_json(text)
+    evaluations = data.get("evaluations") if isinstance(data, dict) else None
 
-    # Normalización mínima de claves por si el modelo cambió nombres
-    data.setdefault("question", _fallback_payload()["question"])
-    data.setdefault("feedback", _fallback_payload()["feedback"])
-    data.setdefault("scores", _fallback_payload()["scores"])
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    for evaluation in evaluations or []:
+        try:
+            index = int(evaluation.get("id")) - 1
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if not 0 <= index < len(items) or not isinstance(evaluation.get("scores"), dict):
+            continue
 
-    # Asegurar que scores tenga todas las subclaves
-    for k in ["claridad", "confianza", "contenido", "creatividad", "lenguaje"]:
-        data["scores"].setdefault(k, 50)
+        scores = {}
+        for k in SCORE_KEYS:
+            try:
+                scores[k] = max(0, min(100, int(evaluation["scores"].get(k, 50))))
+            except (TypeError, ValueError):
+                scores[k] = 50
+        results[index] = {"feedback": evaluation.get("feedback") or "", "scores": scores}
 
-    return data
+    return results
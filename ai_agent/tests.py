@@ -0,0 +1,263 @@
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import jobs
+from .json_stream import JSONFieldStreamParser
+from .models import AIJob
+from .providers.base import LLMProvider
+from .providers.limiter import ProviderBusy, RateLimiter
+from .providers.router import DEFAULTS as ROUTER_DEFAULTS, HedgedLLM, Route
+
+
+# =========================
+# COLA DE TRABAJOS
+# =========================
+calls = []
+
+
+@jobs.job_handler("test-echo")
+def _echo(job):
+    calls.append(job.pk)
+    return {"echo": job.payload.get("value")}
+
+
+@jobs.job_handler("test-persist")
+def _persist(job):
+    # Como los handlers con efectos en la BD: escriben solo si el trabajo sigue siendo suyo
+    with transaction.atomic():
+        current = jobs.lock_owned(job)
+        current.payload = {**current.payload, "written_by": job.locked_by}
+        current.save(update_fields=["payload"])
+    return {"ok": True}
+
+
+@jobs.job_handler("test-busy")
+def _busy(job):
+    raise ProviderBusy("test", 30)
+
+
+@jobs.job_handler("test-fail")
+def _fail(job):
+    raise RuntimeError("falla simulada")
+
+
+@override_settings(AI_JOBS_VISIBILITY_TIMEOUT=60, AI_JOBS_RETRY_BASE_SECONDS=0)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def _expire(self, job):
+        AIJob.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+    def test_claim_is_exclusive(self):
+        job = jobs.enqueue("test-echo", {"value": 1})
+
+        claimed = jobs.claim_next("w1")
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(jobs.claim_next("w2"))
+
+        self.assertEqual(jobs.run_job(claimed, "w1"), "done")
+        job.refresh_from_db()
+        self.assertEqual(job.result, {"echo": 1})
+        self.assertIsNone(jobs.claim_next("w2"))
+
+    def test_expired_lock_is_redelivered(self):
+        job = jobs.enqueue("test-echo", {"value": 2})
+        first = jobs.claim_next("w1")
+        self._expire(first)
+
+        second = jobs.claim_next("w2")
+        self.assertEqual(second.pk, job.pk)
+        self.assertEqual(second.attempts, 2)
+        self.assertEqual(second.locked_by, "w2")
+
+        # El primer worker termina tarde: su resultado no pisa al del dueño actual
+        self.assertEqual(jobs.run_job(first, "w1"), "lost")
+        self.assertEqual(jobs.run_job(second, "w2"), "done")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ("done", "w2"))
+
+    def test_lost_lock_blocks_writes(self):
+        job = jobs.enqueue("test-persist", {})
+        first = jobs.claim_next("w1")
+        self._expire(first)
+        second = jobs.claim_next("w2")
+
+        self.assertEqual(jobs.run_job(first, "w1"), "lost")
+        job.refresh_from_db()
+        self.assertNotIn("written_by", job.payload)
+
+        self.assertEqual(jobs.run_job(second, "w2"), "done")
+        job.refresh_from_db()
+        self.assertEqual(job.payload["written_by"], "w2")
+
+    def test_expired_last_attempt_goes_dead(self):
+        job = jobs.enqueue("test-echo", {}, max_attempts=1)
+        self._expire(jobs.claim_next("w1"))
+
+        self.assertIsNone(jobs.claim_next("w2"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "dead")
+
+    def test_provider_busy_requeues_without_spending_an_attempt(self):
+        job = jobs.enqueue("test-busy", {})
+        self.assertEqual(jobs.run_job(jobs.claim_next("w1"), "w1"), "queued")
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("queued", 0))
+        self.assertGreater(job.available_at, timezone.now() + timedelta(seconds=25))
+
+    def test_failures_retry_then_dead_letter(self):
+        job = jobs.enqueue("test-fail", {}, max_attempts=2)
+        self.assertEqual(jobs.run_job(jobs.claim_next("w1"), "w1"), "queued")
+        self.assertEqual(jobs.run_job(jobs.claim_next("w1"), "w1"), "dead")
+
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("falla simulada", job.error)
+        self.assertEqual(jobs.job_status(job)["error"], "RuntimeError: falla simulada")
+
+
+# =========================
+# LIMITADOR
+# =========================
+class RateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.state_dir, ignore_errors=True)
+        settings_override = override_settings(AI_RATE_LIMIT_DIR=self.state_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_reservations_are_spaced_at_the_quota_rate(self):
+        limiter = RateLimiter("test:rps", {"rps": 2, "max_queue": 10, "max_wait": 10})
+        waits = [limiter.reserve() for _ in range(4)]
+
+        self.assertEqual(waits[0], 0)
+        self.assertEqual(waits[1], 0)  # el bucket arranca lleno (2 tokens)
+        self.assertAlmostEqual(waits[2], 0.5, delta=0.05)
+        self.assertAlmostEqual(waits[3], 1.0, delta=0.05)
+
+    def test_full_queue_is_rejected(self):
+        limiter = RateLimiter("test:queue", {"rps": 1, "max_queue": 2, "max_wait": 60})
+        limiter.reserve()
+        limiter.reserve()
+        limiter.reserve()
+
+        with self.assertRaises(ProviderBusy) as ctx:
+            limiter.reserve()
+        self.assertEqual(ctx.exception.key, "test:queue")
+        self.assertGreaterEqual(ctx.exception.retry_after, 3)
+
+    def test_wait_over_max_wait_is_rejected_without_consuming_quota(self):
+        limiter = RateLimiter("test:wait", {"rps": 1, "max_queue": 50, "max_wait": 1.5})
+        self.assertEqual(limiter.reserve(), 0)
+        self.assertAlmostEqual(limiter.reserve(), 1.0, delta=0.05)
+
+        for _ in range(3):
+            with self.assertRaises(ProviderBusy) as ctx:
+                limiter.reserve()
+            self.assertEqual(ctx.exception.retry_after, 2)
+
+    def test_requests_larger_than_the_bucket_wait_for_it_full(self):
+        limiter = RateLimiter("test:tpm", {"tpm": 600, "max_queue": 10, "max_wait": 120})
+        self.assertEqual(limiter.reserve(tokens=600), 0)
+        self.assertAlmostEqual(limiter.reserve(tokens=5000), 60, delta=0.5)
+
+    def test_state_is_shared_through_the_file(self):
+        config = {"rps": 1, "max_queue": 10, "max_wait": 10}
+        RateLimiter("test:shared", config).reserve()
+        # Otro proceso (otra instancia) ve el token ya consumido
+        self.assertAlmostEqual(RateLimiter("test:shared", config).reserve(), 1.0, delta=0.05)
+
+
+# =========================
+# PARSER DE JSON EN STREAMING
+# =========================
+class JSONFieldStreamParserTests(SimpleTestCase):
+    def parse(self, chunks, field="question"):
+        parser = JSONFieldStreamParser(field)
+        deltas = "".join(parser.feed(chunk) for chunk in chunks)
+        self.assertEqual(deltas, parser.value)
+        return parser
+
+    def test_field_is_extracted_chunk_by_chunk(self):
+        payload = {
+            "feedback": 'dijo "question": no',
+            "question": 'Hola "mundo"\nqué 😀 \\ fin\t/',
+            "scores": {"question": "anidada"},
+        }
+        for ensure_ascii in (True, False):
+            raw = json.dumps(payload, ensure_ascii=ensure_ascii)
+            parser = self.parse(list(raw))
+            self.assertEqual(parser.value, payload["question"])
+            self.assertTrue(parser.done)
+
+    def test_escape_sequences_split_across_chunks(self):
+        parser = self.parse(['{"question": "a\\', "u00", "e9 \\ud83d", "\\ude00 b\\", 'n"}'])
+        self.assertEqual(parser.value, "aé 😀 b\n")
+
+    def test_every_split_point(self):
+        value = 'a"b\\c\né😀z'
+        raw = json.dumps({"question": value})
+        for i in range(len(raw)):
+            for j in range(i, len(raw)):
+                self.assertEqual(self.parse([raw[:i], raw[i:j], raw[j:]]).value, value, (i, j))
+
+    def test_nested_keys_are_ignored(self):
+        parser = self.parse(['{"scores": {"question": "no"}, "question": "si"}'])
+        self.assertEqual(parser.value, "si")
+
+    def test_nothing_after_the_value(self):
+        parser = JSONFieldStreamParser()
+        self.assertEqual(parser.feed('{"question": "uno", '), "uno")
+        self.assertEqual(parser.feed('"feedback": "dos"}'), "")
+
+
+# =========================
+# ROUTER CON COBERTURA
+# =========================
+class _FakeLLM(LLMProvider):
+    def __init__(self, name, error=None):
+        self.name = name
+        self.error = error
+
+    @property
+    def limit_key(self):
+        return self.name
+
+    def generate(self, system_instruction, prompt):
+        if self.error:
+            raise self.error
+        return self.name
+
+
+class HedgedLLMTests(SimpleTestCase):
+    def router(self, *providers):
+        config = {**ROUTER_DEFAULTS, "unhealthy_after": 2, "default_hedge_ms": 1000}
+        return HedgedLLM([Route(p.name, p, config) for p in providers], config)
+
+    def test_provider_busy_fails_over_without_marking_the_route_down(self):
+        router = self.router(_FakeLLM("a", ProviderBusy("a", 1)), _FakeLLM("b"))
+        for _ in range(5):
+            self.assertEqual(router.generate("", ""), "b")
+        self.assertTrue(router.routes[0].healthy())
+
+    def test_errors_mark_the_route_down(self):
+        router = self.router(_FakeLLM("a", RuntimeError("caído")), _FakeLLM("b"))
+        router.generate("", "")
+        router.generate("", "")
+        self.assertFalse(router.routes[0].healthy())
+
+    def test_latency_windows_are_per_call_kind(self):
+        router = self.router(_FakeLLM("a"), _FakeLLM("b"))
+        router.generate("", "")
+        stats = router.stats()[0]
+        self.assertEqual((stats["generate"]["samples"], stats["stream"]["samples"]), (1, 0))
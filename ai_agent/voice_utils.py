@@ -1,86 +1,523 @@
 # ai_agent/voice_utils.py
+import asyncio
 import base64
-from typing import Optional
+import re
+import shutil
+import subprocess
+import threading
+import wave
+from typing import AsyncIterator, BinaryIO, List, Optional, Tuple
 import io
 
-import google.generativeai as genai
 from django.conf import settings
 
-from openai import OpenAI  # 👈 nueva librería
+from .aio import run_coroutine
+from .audio_upload import SpooledAudio
+from .providers import get_stt, get_tts
+from .providers.limiter import ProviderBusy
 
 
-# ---------- TRANSCRIPCIÓN (AUDIO -> TEXTO) CON OPENAI (WHISPER / GPT-4O AUDIO) ----------
+# ---------- TRANSCRIPCIÓN (AUDIO -> TEXTO) ----------
+# Proveedor según settings.AI_PROVIDERS["stt"]: OpenAI (Whisper) por defecto.
 
-def transcribe_audio(audio_base64: str) -> Optional[str]:
+def _audio_file_from_base64(audio_base64: str) -> io.BytesIO:
+    # El audio viene como data URL: "data:audio/webm;base64,AAAA..."
+    if "," in audio_base64:
+        audio_base64 = audio_base64.split(",")[1]
+
+    audio_bytes = base64.b64decode(audio_base64)
+
+    # Lo envolvemos en un archivo en memoria
+    audio_file = io.BytesIO(audio_bytes)
+    audio_file.name = "audio.webm"  # nombre simulado para el archivo
+    return audio_file
+
+
+# ---------- PREPROCESAMIENTO (ANTES DE STT) ----------
+# Las grabaciones de MediaRecorder traen silencio al inicio/final y suelen ser
+# estéreo con bitrate alto. Antes de transcribir: mono, 16 kHz y recorte del
+# silencio por energía (VAD simple). Menos segundos y bytes -> Whisper más
+# rápido y barato.
+#
+# WAV se decodifica en Python; otros formatos (webm/opus, ogg, mp3) requieren
+# ffmpeg (settings.AI_FFMPEG_BINARY), que lee el archivo por stdin en bloques.
+# Sin ffmpeg, esos audios pasan sin cambios. Audios de más de
+# AI_AUDIO_SPOOL_BYTES (los que ya fueron a disco) no se preprocesan: el PCM
+# decodificado ocupa varias veces el archivo y la memoria debe quedar acotada.
+
+PREPROCESS_RATE = 16000
+VAD_FRAME_MS = 30
+
+
+def _ffmpeg() -> Optional[str]:
+    return shutil.which(getattr(settings, "AI_FFMPEG_BINARY", "ffmpeg"))
+
+
+def _file_size(audio_file: BinaryIO) -> int:
+    position = audio_file.tell()
+    audio_file.seek(0, io.SEEK_END)
+    size = audio_file.tell() - position
+    audio_file.seek(position)
+    return size
+
+
+def _decode_wav(audio_file: BinaryIO):
+    """PCM mono float32 a 16 kHz desde un WAV de 16 bits, o None si no lo es."""
+    import numpy as np
+
+    position = audio_file.tell()
+    try:
+        with wave.open(audio_file, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                return None
+            channels, rate = wav.getnchannels(), wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    finally:
+        audio_file.seek(position)
+
+    samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    samples = samples[: len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+
+    if rate != PREPROCESS_RATE and len(samples):
+        # Remuestreo lineal: suficiente para voz
+        duration = len(samples) / rate
+        target = np.linspace(0, duration, int(duration * PREPROCESS_RATE), endpoint=False)
+        samples = np.interp(target, np.arange(len(samples)) / rate, samples).astype(np.float32)
+    return samples
+
+
+def _pipe_ffmpeg(args: List[str], source: BinaryIO, timeout: float = 60) -> Optional[bytes]:
+    """Corre ffmpeg pasándole ``source`` por stdin en bloques (sin leerlo entero); None si falla."""
+    process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def feed():
+        try:
+            shutil.copyfileobj(source, process.stdin, 64 * 1024)
+        except (BrokenPipeError, OSError):
+            pass  # ffmpeg terminó antes (archivo inválido): el código de salida lo dice
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    killer = threading.Timer(timeout, process.kill)  # ffmpeg colgado: se corta y cuenta como fallo
+    killer.start()
+    try:
+        with process.stdout:
+            output = process.stdout.read()
+        process.wait()
+    finally:
+        killer.cancel()
+        writer.join()
+    return output if process.returncode == 0 else None
+
+
+def _decode_ffmpeg(audio_file: BinaryIO):
+    import numpy as np
+
+    ffmpeg = _ffmpeg()
+    if not ffmpeg:
+        return None
+    position = audio_file.tell()
+    try:
+        pcm = _pipe_ffmpeg(
+            [ffmpeg, "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+             "-ac", "1", "-ar", str(PREPROCESS_RATE), "-f", "s16le", "pipe:1"],
+            audio_file,
+        )
+    finally:
+        audio_file.seek(position)
+    if pcm is None:
+        return None
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768
+
+
+def _voiced_bounds(samples):
+    """(inicio, fin) en muestras de la zona con voz, o None si todo es silencio."""
+    import numpy as np
+
+    frame = PREPROCESS_RATE * VAD_FRAME_MS // 1000
+    n = len(samples) // frame
+    if n == 0:
+        return None
+
+    frames = samples[: n * frame].reshape(n, frame)
+    db = 20 * np.log10(np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-10)
+
+    # Umbral relativo al ruido de fondo (percentil bajo), con un mínimo absoluto
+    margin = getattr(settings, "AI_VAD_MARGIN_DB", 12)
+    threshold = max(np.percentile(db, 10) + margin, getattr(settings, "AI_VAD_MIN_DB", -50))
+    voiced = np.flatnonzero(db > threshold)
+    if not voiced.size:
+        return None
+
+    pad = getattr(settings, "AI_VAD_PADDING_MS", 200) // VAD_FRAME_MS
+    start = max(0, voiced[0] - pad) * frame
+    end = min(n, voiced[-1] + 1 + pad) * frame
+    if end == n * frame:
+        end = len(samples)
+    return start, end
+
+
+def _encode(samples) -> Tuple[bytes, str]:
+    """Codifica el PCM procesado: Opus/Ogg con ffmpeg (mucho más chico) o WAV 16 kHz mono."""
+    import numpy as np
+
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+
+    ffmpeg = _ffmpeg()
+    if ffmpeg:
+        result = subprocess.run(
+            [ffmpeg, "-nostdin", "-loglevel", "error", "-f", "s16le", "-ar", str(PREPROCESS_RATE), "-ac", "1",
+             "-i", "pipe:0", "-c:a", "libopus", "-b:a", "24k", "-f", "ogg", "pipe:1"],
+            input=pcm, capture_output=True, timeout=60,
+        )
+        if result.returncode == 0 and result.stdout:
+            return result.stdout, "audio.ogg"
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(PREPROCESS_RATE)
+        wav.writeframes(pcm)
+    return buf.getvalue(), "audio.wav"
+
+
+def preprocess_audio(audio_file: BinaryIO) -> Tuple[BinaryIO, dict]:
     """
-    Transcribe audio usando la API de OpenAI (Whisper / GPT-4o audio).
-    Solo se toca esta parte: el resto de la app sigue igual.
+    Recorta el silencio, pasa a mono y remuestrea a 16 kHz.
+
+    Devuelve ``(archivo, informe)``. El informe indica bytes y segundos antes y
+    después y cuánto se quitó; si no se pudo procesar o no mejora el tamaño ni
+    la duración, devuelve el archivo original (``applied=False`` con el motivo).
+    Nunca lanza: ante cualquier error, el audio sigue tal cual hacia el STT.
     """
     try:
-        if not settings.OPENAI_API_KEY:
-            print("❌ No hay OPENAI_API_KEY en settings.")
-            return None
-
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
-        # El audio viene como data URL: "data:audio/webm;base64,AAAA..."
-        if "," in audio_base64:
-            audio_base64 = audio_base64.split(",")[1]
-
-        audio_bytes = base64.b64decode(audio_base64)
-
-        # Lo envolvemos en un archivo en memoria
-        audio_file = io.BytesIO(audio_bytes)
-        audio_file.name = "audio.webm"  # nombre simulado para el archivo
-
-        # Modelo de transcripción:
-        # - "gpt-4o-mini-transcribe" (nuevo audio STT)
-        # - o "whisper-1" (clásico)
-        transcription = client.audio.transcriptions.create(
-            model="whisper-1",
-            file=audio_file,
-            # Si quieres forzar español:
-            # language="es"
+        size = _file_size(audio_file)
+    except (AttributeError, OSError, ValueError) as e:
+        return audio_file, {"applied": False, "reason": f"error: {e}"}
+    report = {"applied": False, "bytes_before": size, "bytes_after": size}
+
+    if size > getattr(settings, "AI_AUDIO_SPOOL_BYTES", 1024 * 1024):
+        report["reason"] = "demasiado grande para preprocesar en memoria"
+        return audio_file, report
+
+    try:
+        samples = _decode_wav(audio_file)
+        if samples is None:
+            samples = _decode_ffmpeg(audio_file)
+        if samples is None:
+            report["reason"] = "formato no soportado sin ffmpeg" if not _ffmpeg() else "no se pudo decodificar"
+            return audio_file, report
+
+        seconds_before = len(samples) / PREPROCESS_RATE
+        bounds = _voiced_bounds(samples)
+        if bounds is None:
+            report.update(reason="no se detectó voz", seconds_before=seconds_before, seconds_after=seconds_before)
+            return audio_file, report
+
+        trimmed = samples[bounds[0]:bounds[1]]
+        encoded, name = _encode(trimmed)
+        seconds_after = len(trimmed) / PREPROCESS_RATE
+    except Exception as e:
+        report["reason"] = f"error: {e}"
+        return audio_file, report
+
+    report.update(
+        seconds_before=round(seconds_before, 2),
+        seconds_after=round(seconds_after, 2),
+        seconds_removed=round(seconds_before - seconds_after, 2),
+    )
+
+    if len(encoded) >= size and report["seconds_removed"] < 0.5:
+        report["reason"] = "sin mejora"
+        return audio_file, report
+
+    processed = SpooledAudio(name, max_size=getattr(settings, "AI_AUDIO_SPOOL_BYTES", 1024 * 1024))
+    processed.write(encoded)
+    processed.seek(0)
+
+    report.update(applied=True, bytes_after=len(encoded), bytes_removed=size - len(encoded))
+    return processed, report
+
+
+def _log_preprocess(report: dict):
+    if report.get("applied"):
+        print(
+            f"[STT] Preprocesado: -{report['seconds_removed']} s "
+            f"({report['seconds_before']} -> {report['seconds_after']} s), "
+            f"-{report['bytes_removed']} bytes ({report['bytes_before']} -> {report['bytes_after']})"
         )
+    else:
+        print(f"[STT] Sin preprocesar: {report.get('reason')}")
 
-        text = (transcription.text or "").strip()
-        print(">> Transcripción OpenAI OK:", text)
-        return text or None
 
+def _preprocess_enabled() -> bool:
+    return getattr(settings, "AI_AUDIO_PREPROCESS", True)
+
+
+def transcribe_file(audio_file: BinaryIO, preprocess: Optional[bool] = None) -> Optional[str]:
+    """
+    Transcribe un archivo de audio (con ``.name``) con el proveedor de STT configurado.
+    Con ``preprocess`` (por defecto ``AI_AUDIO_PREPROCESS``) pasa antes por ``preprocess_audio``.
+    Devuelve ``""`` si no se reconoció voz y None ante errores (así quien guarda
+    segmentos distingue silencio de fallo); solo lanza ``ProviderBusy`` si la
+    cuota está llena.
+    """
+    processed = audio_file
+    try:
+        if preprocess if preprocess is not None else _preprocess_enabled():
+            processed, report = preprocess_audio(audio_file)
+            _log_preprocess(report)
+
+        text = get_stt().transcribe(processed)
+        print(">> Transcripción OK:", text)
+        return text or ""
+
+    except ProviderBusy:
+        raise
     except Exception as e:
-        print("❌ Error en transcripción (OpenAI):", e)
+        print("❌ Error en transcripción:", e)
         return None
+    finally:
+        if processed is not audio_file:
+            processed.close()
 
 
-# ---------- TEXTO -> VOZ (SIGUE IGUAL, CON EDGE-TTS) ----------
+async def atranscribe_file(audio_file: BinaryIO, preprocess: Optional[bool] = None) -> Optional[str]:
+    """Versión async de ``transcribe_file`` (no bloquea el loop; el preprocesado va en un hilo)."""
+    processed = audio_file
+    try:
+        if preprocess if preprocess is not None else _preprocess_enabled():
+            processed, report = await asyncio.to_thread(preprocess_audio, audio_file)
+            _log_preprocess(report)
 
-def text_to_speech_edge_tts(text: str, language: str = "es") -> Optional[bytes]:
+        text = await get_stt().atranscribe(processed)
+        print(">> Transcripción OK:", text)
+        return text or ""
+
+    except ProviderBusy:
+        raise
+    except Exception as e:
+        print("❌ Error en transcripción:", e)
+        return None
+    finally:
+        if processed is not audio_file:
+            processed.close()
+
+
+def transcribe_audio(audio_base64: str) -> Optional[str]:
+    """Transcribe audio en data URL o base64 (ver ``transcribe_file``)."""
+    return transcribe_file(_audio_file_from_base64(audio_base64))
+
+
+async def atranscribe_audio(audio_base64: str) -> Optional[str]:
+    """Versión async de ``transcribe_audio``."""
+    return await atranscribe_file(_audio_file_from_base64(audio_base64))
+
+
+# ---------- TEXTO -> VOZ ----------
+# Proveedor según settings.AI_PROVIDERS["tts"]: edge-tts por defecto.
+
+def _tts_voice(language: str) -> str:
+    return "es-ES-AlvaroNeural" if language == "es" else "en-US-GuyNeural"
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def split_sentences(text: str, min_chars: Optional[int] = None) -> List[str]:
     """
-    Convierte texto a voz usando edge-tts (alternativa gratuita).
+    Parte el texto en oraciones para sintetizarlas por separado. Las muy cortas
+    (< ``min_chars``) se unen a la siguiente para no cortar la entonación.
     """
+    if min_chars is None:
+        min_chars = getattr(settings, "AI_TTS_MIN_SEGMENT_CHARS", 25)
+
+    segments = []
+    pending = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        pending = f"{pending} {sentence}".strip()
+        if len(pending) >= min_chars:
+            segments.append(pending)
+            pending = ""
+
+    if pending:
+        if segments:
+            segments[-1] = f"{segments[-1]} {pending}"
+        else:
+            segments.append(pending)
+    return segments
+
+
+async def astream_speech(text: str, language: str = "es") -> AsyncIterator[bytes]:
+    """
+    Fragmentos MP3 a medida que llegan del proveedor de TTS (sin acumular el audio).
+    A diferencia de las funciones de abajo, propaga los errores.
+
+    Las preguntas de varias oraciones se sintetizan en paralelo (hasta
+    ``AI_TTS_SEGMENT_CONCURRENCY`` a la vez) en el loop actual: la primera se
+    transmite mientras llega y las demás se emiten en orden al terminar. Los
+    MP3 de edge-tts son frames sin cabecera, así que se concatenan sin más.
+    """
+    tts = get_tts()
+    voice = _tts_voice(language)
+    segments = split_sentences(text)
+
+    if len(segments) <= 1:
+        async for chunk in tts.astream(text, voice):
+            yield chunk
+        return
+
+    semaphore = asyncio.Semaphore(max(1, getattr(settings, "AI_TTS_SEGMENT_CONCURRENCY", 4)))
+
+    async def synthesize(segment):
+        async with semaphore:
+            return await tts.asynthesize(segment, voice)
+
+    async def stream_first():
+        async with semaphore:
+            async for chunk in tts.astream(segments[0], voice):
+                yield chunk
+
+    # El resto arranca antes de transmitir la primera oración
+    rest = [asyncio.ensure_future(synthesize(segment)) for segment in segments[1:]]
     try:
-        import asyncio
-        import edge_tts
+        async for chunk in stream_first():
+            yield chunk
+        for task in rest:
+            yield await task
+    finally:
+        # Cliente desconectado o error: no seguir sintetizando
+        for task in rest:
+            if task.done() and not task.cancelled():
+                task.exception()  # marca el error como recuperado
+            else:
+                task.cancel()
 
-        async def _generate():
-            voice = "es-ES-AlvaroNeural" if language == "es" else "en-US-GuyNeural"
-            communicate = edge_tts.Communicate(text, voice)
 
-            audio_data = b""
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    audio_data += chunk["data"]
+class IncrementalSpeech:
+    """
+    Síntesis que arranca mientras el LLM todavía escribe la pregunta: cada
+    oración completa (>= ``AI_TTS_MIN_SEGMENT_CHARS``) va al TTS apenas aparece
+    en el texto, hasta ``AI_TTS_SEGMENT_CONCURRENCY`` a la vez.
 
-            return audio_data
+    ``feed(delta)`` con cada fragmento, ``finish(texto_final)`` al terminar;
+    ``ready()`` entrega el audio ya listo en orden sin esperar y ``remaining()``
+    espera el resto.
 
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+    Si el texto final no coincide con lo recibido (fallback del servicio): si
+    empieza con lo ya enviado a síntesis solo se sintetiza lo que falta; si no,
+    y aún no se entregó audio, se sintetiza el texto final desde el principio.
+    Con audio ya entregado que no corresponde, ``diverged`` queda en True y no
+    se sintetiza nada más (quien reproduce debe reemplazarlo por la pregunta
+    completa).
+    """
+
+    def __init__(self, language: str = "es"):
+        self.tts = get_tts()
+        self.voice = _tts_voice(language)
+        self.min_chars = getattr(settings, "AI_TTS_MIN_SEGMENT_CHARS", 25)
+        self.semaphore = asyncio.Semaphore(max(1, getattr(settings, "AI_TTS_SEGMENT_CONCURRENCY", 4)))
+        self.text = ""
+        self.consumed = 0  # caracteres de ``text`` ya enviados a síntesis
+        self.tasks = []
+        self.delivered = 0  # segmentos ya entregados por ready()/remaining()
+        self.diverged = False
+
+    def _start(self, segment: str):
+        async def synthesize():
+            async with self.semaphore:
+                return await self.tts.asynthesize(segment, self.voice)
+
+        self.tasks.append(asyncio.ensure_future(synthesize()))
+
+    def feed(self, delta: str):
+        self.text += delta
+        pending = self.text[self.consumed:]
+        end = None
+        for match in _SENTENCE_END.finditer(pending):
+            if len(pending[:match.start()].strip()) >= self.min_chars:
+                end = match
+        if end is not None:
+            self._start(pending[:end.start()].strip())
+            self.consumed += end.end()
+
+    def finish(self, final_text: str):
+        final_text = final_text or ""
+        if final_text.strip() != self.text.strip():
+            if final_text.startswith(self.text[:self.consumed]):
+                self.text = final_text  # lo adelantado vale: solo falta el resto
+            elif not self.delivered:
+                self.cancel()
+                self.text, self.consumed = final_text, 0
+            else:
+                # Ya se entregó audio de otro texto y no se puede retirar
+                self.cancel()
+                self.text, self.consumed, self.diverged = final_text, len(final_text), True
+                return
+        rest = self.text[self.consumed:].strip()
+        if rest:
+            self._start(rest)
+        self.consumed = len(self.text)
+
+    def ready(self) -> List[bytes]:
+        """
+        Audio de las primeras oraciones ya sintetizadas (en orden). Un error del
+        TTS se propaga recién cuando ya no queda audio listo antes de él.
+        """
+        chunks = []
+        while self.tasks and self.tasks[0].done():
+            task = self.tasks[0]
+            if chunks and (task.cancelled() or task.exception() is not None):
+                break
+            chunks.append(task.result())
+            self.tasks.pop(0)
+            self.delivered += 1
+        return chunks
 
-        return loop.run_until_complete(_generate())
+    async def remaining(self) -> AsyncIterator[bytes]:
+        while self.tasks:
+            chunk = await self.tasks[0]
+            self.tasks.pop(0)
+            self.delivered += 1
+            yield chunk
 
+    def cancel(self):
+        for task in self.tasks:
+            if task.done() and not task.cancelled():
+                task.exception()  # marca el error como recuperado
+            else:
+                task.cancel()
+        self.tasks = []
+
+
+async def atext_to_speech_edge_tts(text: str, language: str = "es") -> Optional[bytes]:
+    """
+    Convierte texto a voz (MP3) con el proveedor de TTS configurado.
+    Corrutina: desde vistas async se espera directamente en el loop del servidor.
+    """
+    try:
+        return b"".join([chunk async for chunk in astream_speech(text, language)])
+
+    except Exception as e:
+        print("❌ Error en TTS:", e)
+        return None
+
+
+def text_to_speech_edge_tts(text: str, language: str = "es") -> Optional[bytes]:
+    """
+    Versión síncrona: ejecuta la síntesis en el event loop compartido del proceso
+    (ai_agent/aio.py) en lugar de crear y bloquear un loop por petición.
+    """
+    try:
+        return run_coroutine(atext_to_speech_edge_tts(text, language))
     except Exception as e:
-        print("❌ Error en edge-tts:", e)
+        print("❌ Error en TTS:", e)
         return None
@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Las vistas de voz (transcripción, respuesta de IA y streaming) son async, así
+que conviene servir la app con un servidor ASGI para que un solo proceso atienda
+muchos turnos concurrentes:
+
+    uvicorn evalent.asgi:application --workers 2
 """
 
 import os
@@ -106,4 +106,147 @@ REST_FRAMEWORK = {
 }
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
\ No newline at end of file
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Contexto enviado a la IA en cada turno (tokens aproximados)
+AI_CONTEXT_WINDOW_TOKENS = int(os.getenv("AI_CONTEXT_WINDOW_TOKENS", 1200))
+AI_CONTEXT_SUMMARY_TOKENS = int(os.getenv("AI_CONTEXT_SUMMARY_TOKENS", 400))
+
+# Pool de preguntas de apertura pregeneradas (manage.py warm_opening_questions)
+OPENING_POOL_SIZE = int(os.getenv("OPENING_POOL_SIZE", 3))
+OPENING_POOL_MAX_AGE_HOURS = int(os.getenv("OPENING_POOL_MAX_AGE_HOURS", 72))
+OPENING_POOL_USED_RETENTION_HOURS = int(os.getenv("OPENING_POOL_USED_RETENTION_HOURS", 24))
+
+# Cola de trabajos de IA en la BD (manage.py run_ai_workers)
+AI_JOBS_ENABLED = os.getenv("AI_JOBS_ENABLED", "0") == "1"  # el chat encola turnos y hace polling
+AI_JOBS_VISIBILITY_TIMEOUT = int(os.getenv("AI_JOBS_VISIBILITY_TIMEOUT", 120))  # segundos
+AI_JOBS_MAX_ATTEMPTS = int(os.getenv("AI_JOBS_MAX_ATTEMPTS", 3))
+AI_JOBS_RETRY_BASE_SECONDS = 2
+
+# Proveedores de IA (ai_agent/providers). "stub" = backends locales sin red para pruebas de carga
+AI_PROVIDERS = {
+    "llm": os.getenv("AI_LLM_PROVIDER", "gemini"),
+    "stt": os.getenv("AI_STT_PROVIDER", "openai"),
+    "tts": os.getenv("AI_TTS_PROVIDER", "edge"),
+}
+GEMINI_MODEL_ID = os.getenv("GEMINI_MODEL_ID", "models/gemini-2.5-flash")
+
+# STT local en CPU (AI_STT_PROVIDER=local, requiere faster-whisper): pool de procesos con el modelo cargado
+AI_LOCAL_WHISPER = {
+    "model": os.getenv("LOCAL_WHISPER_MODEL", "small"),
+    "compute_type": os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8"),
+    "workers": int(os.getenv("LOCAL_WHISPER_WORKERS", 2)),
+    "cpu_threads": int(os.getenv("LOCAL_WHISPER_CPU_THREADS", 2)),
+    "beam_size": int(os.getenv("LOCAL_WHISPER_BEAM_SIZE", 1)),  # 1 = rápido; 5 = más preciso y más lento
+    "language": os.getenv("LOCAL_WHISPER_LANGUAGE", "es") or None,
+    "max_queue": 8,
+    "timeout": 120,
+}
+
+# Varias rutas de LLM con cobertura por latencia (ai_agent/providers/router.py)
+AI_LLM_ROUTER = {
+    "enabled": os.getenv("AI_LLM_HEDGING", "0") == "1",
+    "routes": [
+        f"gemini:{GEMINI_MODEL_ID}",
+        "gemini:" + os.getenv("GEMINI_SECONDARY_MODEL_ID", "models/gemini-2.0-flash"),
+    ],
+    "percentile": 95,  # se cubre la llamada que no respondió en su p95
+    "max_hedge_ratio": 0.1,  # como máximo ~10% de llamadas duplicadas
+}
+
+# Latencias y tasas de error simuladas de los proveedores "stub"
+AI_STUB = {
+    "seed": None,
+    "llm": {"latency": {"dist": "lognormal", "median_ms": 1200, "sigma": 0.35}, "error_rate": 0.01},
+    "stt": {"latency": {"dist": "lognormal", "median_ms": 800, "sigma": 0.3}, "error_rate": 0.0},
+    "tts": {"latency": {"dist": "uniform", "min_ms": 200, "max_ms": 600}, "error_rate": 0.0},
+}
+
+# Grabación/reproducción del tráfico con los proveedores: "off", "record" o "replay"
+AI_CASSETTE = {
+    "mode": os.getenv("AI_CASSETTE_MODE", "off"),
+    "path": os.getenv("AI_CASSETTE_PATH", os.path.join(BASE_DIR, "cassettes", "provider_traffic.jsonl")),
+    "time_scale": float(os.getenv("AI_CASSETTE_TIME_SCALE", 1.0)),  # 0 = sin esperas, 0.5 = el doble de rápido
+}
+
+# Límites de llamadas salientes por proveedor (ai_agent/providers/limiter.py), compartidos
+# entre workers vía archivos en AI_RATE_LIMIT_DIR. Clave "proveedor" o "proveedor:modelo".
+AI_RATE_LIMITS = {
+    "gemini": {
+        "rps": float(os.getenv("GEMINI_RPS", 5)),
+        "tpm": int(os.getenv("GEMINI_TPM", 250000)),
+        "max_queue": 50,
+        "max_wait": 15,  # segundos; más espera -> 429 "reintenta en N s"
+    },
+    "openai": {"rps": float(os.getenv("OPENAI_RPS", 3)), "max_queue": 20, "max_wait": 20},
+}
+AI_RATE_LIMIT_DIR = os.getenv("AI_RATE_LIMIT_DIR")  # None = directorio temporal del sistema
+AI_RATE_LIMIT_OUTPUT_TOKENS = 300  # tokens de salida estimados por llamada al LLM
+
+# Claves de idempotencia por turno (interviews/idempotency.py)
+AI_IDEMPOTENCY_WAIT_SECONDS = 60  # cuánto espera un reintento al request original
+AI_IDEMPOTENCY_STALE_SECONDS = 120  # turno "en curso" más viejo -> el reintento lo toma
+AI_IDEMPOTENCY_RETENTION_HOURS = 24
+
+# Puntaje en lote al finalizar (entrevistas con scoring_mode="deferred", interviews/scoring.py)
+AI_BATCH_SCORING_SIZE = int(os.getenv("AI_BATCH_SCORING_SIZE", 8))  # respuestas por llamada al LLM
+AI_BATCH_SCORING_LOCK_SECONDS = 120
+AI_BATCH_SCORING_MAX_ATTEMPTS = 3  # intentos sin evaluación antes de dar una respuesta por no puntuable
+
+# Caché en disco del audio TTS por hash(proveedor, códec, voz, texto), con desalojo LRU
+AI_TTS_CACHE = {
+    "enabled": os.getenv("AI_TTS_CACHE", "1") == "1",
+    "dir": os.getenv("AI_TTS_CACHE_DIR", os.path.join(BASE_DIR, "cache", "tts")),
+    "max_mb": int(os.getenv("AI_TTS_CACHE_MAX_MB", 200)),
+}
+
+# Síntesis por oraciones en paralelo para preguntas largas (ai_agent/voice_utils.py)
+AI_TTS_SEGMENT_CONCURRENCY = int(os.getenv("AI_TTS_SEGMENT_CONCURRENCY", 4))
+AI_TTS_MIN_SEGMENT_CHARS = 25
+
+# Subida de audio para transcripción (ai_agent/audio_upload.py)
+AI_AUDIO_MAX_BYTES = int(os.getenv("AI_AUDIO_MAX_BYTES", 10 * 1024 * 1024))
+AI_AUDIO_MAX_SECONDS = int(os.getenv("AI_AUDIO_MAX_SECONDS", 180))
+AI_AUDIO_SPOOL_BYTES = 1024 * 1024  # más grande -> archivo temporal en disco
+
+# Preprocesado antes del STT: recorte de silencio (VAD por energía), mono, 16 kHz
+AI_AUDIO_PREPROCESS = os.getenv("AI_AUDIO_PREPROCESS", "1") == "1"
+AI_FFMPEG_BINARY = os.getenv("AI_FFMPEG_BINARY", "ffmpeg")  # sin ffmpeg solo se procesa WAV
+AI_VAD_MARGIN_DB = 12  # dB sobre el ruido de fondo para considerar voz
+AI_VAD_MIN_DB = -50
+AI_VAD_PADDING_MS = 200  # margen conservado antes y después de la voz
+
+# Transcripción incremental: la grabación se sube por segmentos mientras se habla (interviews/live_transcript.py)
+AI_LIVE_TRANSCRIPTION = os.getenv("AI_LIVE_TRANSCRIPTION", "1") == "1"
+AI_LIVE_SEGMENT_SECONDS = 6  # el navegador corta en la primera pausa pasado este tiempo
+AI_LIVE_TRANSCRIPT_WAIT_SECONDS = 30  # espera máxima por los segmentos pendientes al cerrar
+AI_LIVE_TRANSCRIPT_RETENTION_HOURS = 24
+
+# Turno de voz en una sola petición: audio -> STT -> IA -> TTS por oraciones (interview_voice_turn)
+AI_VOICE_TURN = os.getenv("AI_VOICE_TURN", "1") == "1"
+
+# Clientes de red de los proveedores compartidos por el proceso (ai_agent/providers/clients.py)
+AI_PROVIDER_CLIENTS = {
+    "openai": {"timeout": 30, "connect_timeout": 5, "max_connections": 20, "max_keepalive": 10, "keepalive_expiry": 60},
+    "gemini": {"timeout": 60},
+    "edge": {"connect_timeout": 10, "receive_timeout": 60},
+}
+
+# Comparativa con la cohorte en resultados/PDF (interviews/cohorts.py)
+COHORT_MIN_SIZE = 5  # menos entrevistas en el cargo -> se usa la cohorte de todos los cargos
+
+# Caché en disco de los gráficos PNG del PDF (reports/chart_cache.py)
+REPORT_CHART_CACHE = {
+    "enabled": os.getenv("REPORT_CHART_CACHE", "1") == "1",
+    "dir": os.getenv("REPORT_CHART_CACHE_DIR", os.path.join(BASE_DIR, "cache", "charts")),
+    "max_mb": int(os.getenv("REPORT_CHART_CACHE_MAX_MB", 50)),
+}
+
+# Dibujo en paralelo de los gráficos del PDF en un pool de procesos (reports/charts.py)
+REPORT_CHART_POOL = {
+    "workers": int(os.getenv("REPORT_CHART_WORKERS", 4)),  # 0 = en serie, en el mismo proceso
+    "timeout": 30,
+}
+
+# Gráficos del PDF: "matplotlib" (PNG) o "reportlab" (vectoriales, sin matplotlib; reports/vector_charts.py)
+REPORT_CHART_BACKEND = os.getenv("REPORT_CHART_BACKEND", "matplotlib")
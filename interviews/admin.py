@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Interview, Message, Score
+from .models import Interview, Message, CohortBucket, Score, ScoreSummary, TurnRequest, TranscriptSegment
 
 @admin.register(Interview)
 class InterviewAdmin(admin.ModelAdmin):
@@ -16,3 +16,23 @@ class MessageAdmin(admin.ModelAdmin):
 @admin.register(Score)
 class ScoreAdmin(admin.ModelAdmin):
     list_display = ("message", "claridad", "confianza", "contenido", "creatividad", "lenguaje")
+
+@admin.register(ScoreSummary)
+class ScoreSummaryAdmin(admin.ModelAdmin):
+    list_display = ("interview", "count", "updated_at")
+
+@admin.register(CohortBucket)
+class CohortBucketAdmin(admin.ModelAdmin):
+    list_display = ("interview_type", "level", "language", "position", "bucket", "count")
+    list_filter = ("interview_type", "level", "language")
+
+@admin.register(TurnRequest)
+class TurnRequestAdmin(admin.ModelAdmin):
+    list_display = ("interview", "key", "status", "started_at", "finished_at")
+    list_filter = ("status",)
+    search_fields = ("key",)
+
+@admin.register(TranscriptSegment)
+class TranscriptSegmentAdmin(admin.ModelAdmin):
+    list_display = ("interview", "session", "index", "text", "created_at")
+    search_fields = ("session",)
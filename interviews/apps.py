@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class InterviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'interviews'
+
+    def ready(self):
+        # Registra los tipos de trabajo de IA de la entrevista (ai_agent/jobs.py)
+        from . import jobs  # noqa: F401
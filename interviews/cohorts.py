@@ -0,0 +1,108 @@
+# interviews/cohorts.py
+"""
+Comparativa con la cohorte ("Cohorte" y "Top 25%" en resultados y PDF).
+
+Cada entrevista terminada (y ya puntuada) suma 1 a la fila de su puntaje final
+en el histograma de su cohorte: (tipo, nivel, idioma, cargo normalizado como en
+ai_agent/opening_pool.py) y también en la de todos los cargos
+(``position="*"``). Son 101 cubetas fijas (puntaje 0-100), así los percentiles
+salen de a lo sumo 101 filas, sin recorrer entrevistas.
+
+``Interview.cohort_score`` marca que la entrevista ya se contó (UPDATE
+condicional: cada entrevista entra una sola vez aunque varios requests lleguen
+a la vez). Si la cohorte del cargo tiene menos de ``COHORT_MIN_SIZE``
+entrevistas se usa la de todos los cargos; si tampoco alcanza, los valores por
+defecto de siempre (60 y 75).
+"""
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from ai_agent.opening_pool import normalize_position
+
+from .models import CohortBucket, Interview
+from .scoring import has_pending_scores
+from .summary import score_summary
+
+
+ALL_POSITIONS = "*"
+DEFAULT_COMPARISON = (60, 75)
+
+
+def cohort_key(interview, position: Optional[str] = None) -> dict:
+    return {
+        "interview_type": interview.interview_type,
+        "level": interview.level,
+        "language": interview.language,
+        "position": position if position is not None else normalize_position(interview.position),
+    }
+
+
+def _increment(key: dict, bucket: int):
+    rows = CohortBucket.objects.filter(bucket=bucket, **key)
+    if rows.update(count=F("count") + 1):
+        return
+    try:
+        with transaction.atomic():
+            CohortBucket.objects.create(bucket=bucket, count=1, **key)
+    except IntegrityError:
+        rows.update(count=F("count") + 1)
+
+
+def record_in_cohort(interview) -> bool:
+    """
+    Cuenta la entrevista en su cohorte si ya terminó y tiene todos sus puntajes.
+    Devuelve True si la contó ahora (False si no corresponde o ya estaba).
+    """
+    if interview.cohort_score is not None or not interview.is_finished:
+        return False
+    if has_pending_scores(interview):
+        return False
+
+    summary = score_summary(interview)
+    if not summary.count:
+        return False  # sin respuestas puntuadas no aporta a la comparativa
+    score = max(0, min(100, summary.overall()))
+
+    with transaction.atomic():
+        claimed = Interview.objects.filter(pk=interview.pk, cohort_score__isnull=True).update(cohort_score=score)
+        if claimed:
+            _increment(cohort_key(interview), score)
+            _increment(cohort_key(interview, ALL_POSITIONS), score)
+
+    interview.cohort_score = score
+    return bool(claimed)
+
+
+def histogram(key: dict) -> List[int]:
+    """Cantidad de entrevistas por puntaje (índice 0-100)."""
+    counts = [0] * 101
+    for bucket, count in CohortBucket.objects.filter(**key).values_list("bucket", "count"):
+        counts[bucket] = count
+    return counts
+
+
+def percentile(counts: List[int], q: float) -> int:
+    """Puntaje del percentil ``q`` (0-100) de un histograma."""
+    total = sum(counts)
+    target = total * q / 100
+    running = 0
+    for score, count in enumerate(counts):
+        running += count
+        if count and running >= target:
+            return score
+    return 0
+
+
+def cohort_comparison(interview, puntaje: int) -> List[int]:
+    """``[mediana de la cohorte, umbral del top 25%, puntaje]`` para el gráfico comparativo."""
+    min_size = getattr(settings, "COHORT_MIN_SIZE", 5)
+
+    for position in (None, ALL_POSITIONS):
+        counts = histogram(cohort_key(interview, position))
+        if sum(counts) >= min_size:
+            return [percentile(counts, 50), percentile(counts, 75), puntaje]
+
+    return [*DEFAULT_COMPARISON, puntaje]
@@ -19,6 +19,7 @@ class InterviewForm(forms.ModelForm):
             "mode",
             "max_questions",
             "time_limit",
+            "scoring_mode",
         ]
 
         widgets = {
@@ -33,6 +34,7 @@ class InterviewForm(forms.ModelForm):
             "time_limit": forms.NumberInput(
                 attrs={"class": "form-control", "min": 1, "placeholder": "Ej: 10"}
             ),
+            "scoring_mode": forms.Select(attrs={"class": "form-control"}),
         }
 
     def clean(self):
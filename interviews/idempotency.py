@@ -0,0 +1,146 @@
+# interviews/idempotency.py
+"""
+Claves de idempotencia por turno (doble clic, reintentos de redes móviles).
+
+El cliente manda una clave por turno (cabecera ``Idempotency-Key`` o campo
+``idempotency_key``). La primera petición con esa clave "posee" el turno y lo
+ejecuta; las demás:
+
+- si el turno sigue en curso, esperan a que termine y devuelven su respuesta
+  (sin otro mensaje, otra llamada a la IA ni otro incremento de ``asked_questions``);
+- si ya terminó, reciben la respuesta guardada.
+
+Si el dueño falla (p. ej. ``ProviderBusy``) llama a ``abandon_turn`` y el
+siguiente reintento vuelve a ejecutarlo. Un turno "en curso" más viejo que
+``AI_IDEMPOTENCY_STALE_SECONDS`` (proceso caído) lo toma el siguiente reintento.
+
+La coordinación pasa por la BD (restricción única interview+key), así funciona
+entre workers distintos.
+"""
+import asyncio
+import time
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import TurnRequest
+
+
+POLL_SECONDS = 0.25
+
+
+class TurnInProgress(Exception):
+    """Otro request con la misma clave sigue ejecutando el turno tras la espera máxima."""
+
+
+def _stale_after() -> timedelta:
+    return timedelta(seconds=getattr(settings, "AI_IDEMPOTENCY_STALE_SECONDS", 120))
+
+
+def _wait_seconds() -> float:
+    return getattr(settings, "AI_IDEMPOTENCY_WAIT_SECONDS", 60)
+
+
+def idempotency_key(request, data=None) -> Optional[str]:
+    """Clave del turno: cabecera ``Idempotency-Key`` o campo ``idempotency_key`` (form o JSON)."""
+    key = request.headers.get("Idempotency-Key")
+    if not key:
+        source = data if data is not None else request.POST
+        key = source.get("idempotency_key")
+    key = (key or "").strip()
+    return key[:64] or None
+
+
+def begin_turn(interview, key) -> Tuple[TurnRequest, bool]:
+    """Registra la clave. Devuelve ``(turno, es_dueño)``; solo el dueño ejecuta el turno."""
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            turn = TurnRequest.objects.create(interview=interview, key=key, started_at=now)
+    except IntegrityError:
+        turn = TurnRequest.objects.filter(interview=interview, key=key).first()
+        if turn is None:
+            # El dueño abandonó justo ahora: nuevo intento
+            return begin_turn(interview, key)
+
+        # El dueño se cayó sin terminar: lo toma este request (UPDATE condicional)
+        if turn.status == "running" and turn.started_at < now - _stale_after():
+            taken = TurnRequest.objects.filter(pk=turn.pk, status="running", started_at=turn.started_at).update(
+                started_at=now
+            )
+            if taken:
+                turn.started_at = now
+                return turn, True
+        return turn, False
+
+    # Limpieza barata de las claves viejas de la misma entrevista
+    retention = timedelta(hours=getattr(settings, "AI_IDEMPOTENCY_RETENTION_HOURS", 24))
+    TurnRequest.objects.filter(interview=interview, started_at__lt=now - retention).delete()
+    return turn, True
+
+
+def complete_turn_request(turn, response: dict):
+    """Guarda la respuesta del turno para los reintentos."""
+    TurnRequest.objects.filter(pk=turn.pk).update(status="done", response=response, finished_at=timezone.now())
+
+
+def abandon_turn(turn):
+    """El dueño no completó el turno: el siguiente reintento lo ejecuta de nuevo."""
+    TurnRequest.objects.filter(pk=turn.pk, status="running").delete()
+
+
+def _poll(turn):
+    """``(terminado, respuesta)``; ``respuesta`` es None si el dueño abandonó el turno."""
+    row = TurnRequest.objects.filter(pk=turn.pk).values("status", "response").first()
+    if row is None:
+        return True, None
+    return row["status"] == "done", row["response"]
+
+
+def claim_turn(interview, key) -> Tuple[TurnRequest, Optional[dict]]:
+    """
+    Devuelve ``(turno, None)`` si este request debe ejecutar el turno, o
+    ``(turno, respuesta)`` con la respuesta del request original. Lanza
+    ``TurnInProgress`` si el original no termina dentro de la espera máxima.
+    """
+    deadline = time.monotonic() + _wait_seconds()
+    while True:
+        turn, owner = begin_turn(interview, key)
+        if owner or turn.status == "done":
+            return turn, (None if owner else turn.response)
+
+        while True:
+            finished, response = _poll(turn)
+            if finished:
+                break
+            if time.monotonic() > deadline:
+                raise TurnInProgress(key)
+            time.sleep(POLL_SECONDS)
+
+        if response is not None:
+            return turn, response
+        # Abandonado: volvemos a intentar ser dueños
+
+
+async def aclaim_turn(interview, key) -> Tuple[TurnRequest, Optional[dict]]:
+    """Versión async de ``claim_turn``: espera sin ocupar un hilo."""
+    deadline = time.monotonic() + _wait_seconds()
+    while True:
+        turn, owner = await sync_to_async(begin_turn)(interview, key)
+        if owner or turn.status == "done":
+            return turn, (None if owner else turn.response)
+
+        while True:
+            finished, response = await sync_to_async(_poll)(turn)
+            if finished:
+                break
+            if time.monotonic() > deadline:
+                raise TurnInProgress(key)
+            await asyncio.sleep(POLL_SECONDS)
+
+        if response is not None:
+            return turn, response
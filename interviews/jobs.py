@@ -0,0 +1,98 @@
+# interviews/jobs.py
+"""
+Trabajos de IA de la entrevista que procesan los workers de ``manage.py run_ai_workers``.
+Se registran al cargar la app (InterviewsConfig.ready).
+"""
+from django.db import transaction
+from django.urls import reverse
+
+from ai_agent.jobs import enqueue, job_handler, lock_owned
+from ai_agent.providers.cache import get_tts_cache
+from ai_agent.service import generate_ai_response
+from ai_agent.voice_utils import text_to_speech_edge_tts, transcribe_audio
+
+from .cohorts import record_in_cohort
+from .models import Interview, Message
+from .scoring import has_pending_scores, score_pending_answers
+from .turns import complete_turn
+
+
+def _persist_turn(job, interview, result) -> dict:
+    """
+    Guarda el turno y lo anota en el payload del trabajo en la misma transacción.
+    Si otra entrega ya lo guardó, devuelve lo anotado sin escribir de nuevo.
+    """
+    with transaction.atomic():
+        current = lock_owned(job)
+        turn = current.payload.get("turn")
+        if turn is None:
+            interview.refresh_from_db(fields=["asked_questions", "is_finished"])
+            ai_msg = complete_turn(interview, result)
+            turn = {
+                "question": result.get("question"),
+                "feedback": result.get("feedback"),
+                "scores": result.get("scores"),
+                "message_id": ai_msg.id if ai_msg else None,
+            }
+            current.payload = {**current.payload, "turn": turn}
+            current.save(update_fields=["payload"])
+    return turn
+
+
+@job_handler("turn")
+def run_turn(job):
+    """
+    Genera la siguiente pregunta (el mensaje del candidato ya se guardó al encolar).
+    Idempotente: una nueva entrega del mismo trabajo reusa el turno guardado.
+    """
+    interview = Interview.objects.get(pk=job.interview_id)
+    user_message = job.payload.get("message", "")
+
+    turn = job.payload.get("turn")
+    if turn is None:
+        result = generate_ai_response(interview, user_message)
+        turn = _persist_turn(job, interview, result)
+    interview.refresh_from_db(fields=["asked_questions", "is_finished"])
+
+    ai_msg = Message.objects.filter(pk=turn["message_id"]).first() if turn["message_id"] else None
+
+    # Modo diferido: el puntaje en lote va en su propio trabajo (reintentable)
+    if interview.is_finished and has_pending_scores(interview):
+        enqueue("score", {}, interview=interview)
+    elif interview.is_finished:
+        record_in_cohort(interview)
+
+    question = turn["question"]
+
+    # Se sintetiza aquí para dejar el MP3 en la caché de audio: el cliente lo pide
+    # por URL (interview_message_audio) y lo recibe sin esperar a edge-tts
+    if question and job.payload.get("tts", True) and get_tts_cache() is not None:
+        text_to_speech_edge_tts(question, interview.language)
+
+    return {
+        "question": question,
+        "feedback": turn["feedback"],
+        "scores": turn["scores"],
+        "message_id": ai_msg.id if ai_msg else None,
+        "is_finished": interview.is_finished,
+        "audio_url": reverse("interviews:interview_message_audio", args=[interview.pk, ai_msg.pk]) if ai_msg else None,
+    }
+
+
+@job_handler("transcribe")
+def run_transcribe(job):
+    text = transcribe_audio(job.payload["audio"])
+    if not text:
+        # Se reintenta; si se agotan los intentos queda en dead-letter
+        raise RuntimeError("Error al transcribir")
+    return {"text": text}
+
+
+@job_handler("score")
+def run_score(job):
+    """Puntaje en lote de una entrevista en modo diferido (interviews/scoring.py)."""
+    interview = Interview.objects.get(pk=job.interview_id)
+    if not score_pending_answers(interview):
+        raise RuntimeError("Otro proceso está puntuando esta entrevista")
+    record_in_cohort(interview)
+    return {"pending": has_pending_scores(interview)}
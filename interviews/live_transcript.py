@@ -0,0 +1,72 @@
+# interviews/live_transcript.py
+"""
+Transcripción incremental mientras el candidato habla.
+
+El navegador corta la grabación en segmentos (en las pausas, cada pocos
+segundos) y sube cada uno apenas termina a
+``/transcribe/live/<sesión>/`` con su número en ``X-Segment-Index``. El servidor
+transcribe cada segmento en cuanto llega y lo guarda en ``TranscriptSegment``;
+la transcripción de la sesión es la unión de los segmentos en orden.
+
+El último segmento llega con ``X-Segment-Final: 1``: tras transcribirlo se
+espera a que estén los anteriores (normalmente ya listos) y se devuelve el texto
+completo. Así, al soltar el botón solo falta transcribir unos segundos de audio.
+
+Las sesiones se guardan en la BD para que los segmentos puedan caer en workers
+distintos; las viejas (``AI_LIVE_TRANSCRIPT_RETENTION_HOURS``) se borran al
+abrir una nueva.
+"""
+import asyncio
+import time
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import TranscriptSegment
+
+
+POLL_SECONDS = 0.25
+
+
+def _wait_seconds() -> float:
+    return getattr(settings, "AI_LIVE_TRANSCRIPT_WAIT_SECONDS", 30)
+
+
+def save_segment(interview, session: str, index: int, text: str, seconds: Optional[float] = None):
+    """Guarda (o reemplaza, si el cliente reintentó) la transcripción de un segmento."""
+    if index == 0:
+        retention = timedelta(hours=getattr(settings, "AI_LIVE_TRANSCRIPT_RETENTION_HOURS", 24))
+        TranscriptSegment.objects.filter(interview=interview, created_at__lt=timezone.now() - retention).delete()
+
+    TranscriptSegment.objects.update_or_create(
+        interview=interview, session=session, index=index,
+        defaults={"text": text or "", "seconds": seconds},
+    )
+
+
+def running_transcript(interview, session: str) -> Tuple[str, List[int]]:
+    """``(texto, índices)`` con los segmentos recibidos hasta ahora, en orden."""
+    rows = list(
+        TranscriptSegment.objects.filter(interview=interview, session=session)
+        .order_by("index").values_list("index", "text")
+    )
+    text = " ".join(t.strip() for _, t in rows if t.strip())
+    return text, [i for i, _ in rows]
+
+
+async def afinal_transcript(interview, session: str, count: int) -> Tuple[str, List[int]]:
+    """
+    Espera (hasta ``AI_LIVE_TRANSCRIPT_WAIT_SECONDS``) a que estén los ``count``
+    segmentos y devuelve ``(texto, faltantes)``. Si alguno no llega, el texto
+    se arma con los disponibles.
+    """
+    deadline = time.monotonic() + _wait_seconds()
+    while True:
+        text, indices = await sync_to_async(running_transcript)(interview, session)
+        missing = sorted(set(range(count)) - set(indices))
+        if not missing or time.monotonic() > deadline:
+            return text, missing
+        await asyncio.sleep(POLL_SECONDS)
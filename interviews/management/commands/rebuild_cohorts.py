@@ -0,0 +1,58 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ai_agent.opening_pool import normalize_position
+from interviews.cohorts import ALL_POSITIONS
+from interviews.models import CohortBucket, Interview
+from interviews.scoring import has_pending_scores
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye los histogramas de puntaje por cohorte desde las entrevistas terminadas "
+        "(usa ScoreSummary; correr antes rebuild_score_summaries --missing si hace falta)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000, help="Entrevistas por lote de lectura.")
+
+    def handle(self, *args, **options):
+        counts = Counter()
+        scored = {}
+
+        interviews = (
+            Interview.objects.filter(is_finished=True, score_summary__count__gt=0)
+            .select_related("score_summary")
+            .order_by("pk")
+        )
+        for interview in interviews.iterator(chunk_size=options["batch_size"]):
+            if interview.scoring_mode == "deferred" and has_pending_scores(interview):
+                continue
+            score = max(0, min(100, interview.score_summary.overall()))
+            scored[interview.pk] = score
+            position = normalize_position(interview.position)
+            for key_position in (position, ALL_POSITIONS):
+                counts[(interview.interview_type, interview.level, interview.language, key_position, score)] += 1
+
+        with transaction.atomic():
+            CohortBucket.objects.all().delete()
+            CohortBucket.objects.bulk_create(
+                [
+                    CohortBucket(interview_type=t, level=lv, language=lang, position=pos, bucket=b, count=n)
+                    for (t, lv, lang, pos, b), n in counts.items()
+                ],
+                batch_size=options["batch_size"],
+            )
+            Interview.objects.update(cohort_score=None)
+            by_score = {}
+            for pk, score in scored.items():
+                by_score.setdefault(score, []).append(pk)
+            for score, pks in by_score.items():
+                for start in range(0, len(pks), options["batch_size"]):
+                    Interview.objects.filter(pk__in=pks[start:start + options["batch_size"]]).update(cohort_score=score)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Histogramas reconstruidos: {len(scored)} entrevistas, {len(counts)} cubetas."
+        ))
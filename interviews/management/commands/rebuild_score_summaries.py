@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from interviews.models import Interview
+from interviews.summary import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los resúmenes de puntaje (ScoreSummary) desde los Score: backfill de "
+        "entrevistas anteriores o reparación si quedaron desalineados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interview", type=int, action="append", default=[], help="ID de entrevista (repetible).")
+        parser.add_argument("--missing", action="store_true", help="Solo las entrevistas que aún no tienen resumen.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Entrevistas por consulta agrupada.")
+
+    def handle(self, *args, **options):
+        interviews = Interview.objects.order_by("pk")
+        if options["interview"]:
+            interviews = interviews.filter(pk__in=options["interview"])
+        if options["missing"]:
+            interviews = interviews.filter(score_summary__isnull=True)
+
+        ids = list(interviews.values_list("pk", flat=True))
+        size = max(1, options["batch_size"])
+        total = 0
+        for start in range(0, len(ids), size):
+            total += rebuild_summaries(ids[start:start + size])
+
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes recalculados: {total}"))
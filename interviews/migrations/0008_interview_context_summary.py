@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0007_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='context_summary',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='interview',
+            name='context_summary_upto',
+            field=models.IntegerField(default=0),
+        ),
+    ]
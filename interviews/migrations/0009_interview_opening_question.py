@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_agent', '0001_initial'),
+        ('interviews', '0008_interview_context_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='opening_question',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='ai_agent.openingquestion'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0009_interview_opening_question'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TurnRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('running', 'En curso'), ('done', 'Completado')], default='running', max_length=10)),
+                ('response', models.JSONField(blank=True, null=True)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('interview', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='turn_requests', to='interviews.interview')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('interview', 'key'), name='turn_request_key_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0010_turnrequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='scoring_locked_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='interview',
+            name='scoring_mode',
+            field=models.CharField(choices=[('live', 'Puntaje en cada turno'), ('deferred', 'Puntaje al finalizar')], default='live', max_length=10),
+        ),
+    ]
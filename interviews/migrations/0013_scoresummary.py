@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0012_transcriptsegment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.IntegerField(default=0)),
+                ('sum_claridad', models.IntegerField(default=0)),
+                ('sum_confianza', models.IntegerField(default=0)),
+                ('sum_contenido', models.IntegerField(default=0)),
+                ('sum_creatividad', models.IntegerField(default=0)),
+                ('sum_lenguaje', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('interview', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score_summary', to='interviews.interview')),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0013_scoresummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='cohort_score',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='CohortBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interview_type', models.CharField(max_length=20)),
+                ('level', models.CharField(max_length=20)),
+                ('language', models.CharField(max_length=10)),
+                ('position', models.CharField(max_length=100)),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('interview_type', 'level', 'language', 'position', 'bucket'), name='cohort_bucket_unique')],
+            },
+        ),
+    ]
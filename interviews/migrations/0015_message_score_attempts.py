@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0014_cohortbucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='score_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -26,6 +26,11 @@ class Interview(models.Model):
         ("senior", "Senior"),
     ]
 
+    SCORING_MODES = [
+        ("live", "Puntaje en cada turno"),
+        ("deferred", "Puntaje al finalizar"),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     interview_type = models.CharField(max_length=20, choices=INTERVIEW_TYPES)
     language = models.CharField(max_length=10, choices=LANGUAGES, default="es")
@@ -40,6 +45,22 @@ class Interview(models.Model):
     is_finished = models.BooleanField(default=False)
     asked_questions = models.IntegerField(default=0)
 
+    # "deferred": los turnos solo generan la pregunta y las respuestas se puntúan
+    # en lote al finalizar (ver interviews/scoring.py)
+    scoring_mode = models.CharField(max_length=10, choices=SCORING_MODES, default="live")
+    scoring_locked_until = models.DateTimeField(null=True, blank=True)
+    # Puntaje final con el que la entrevista entró al histograma de su cohorte (interviews/cohorts.py)
+    cohort_score = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    # Contexto acotado para la IA (ver ai_agent/context.py)
+    context_summary = models.TextField(blank=True, default="")
+    context_summary_upto = models.IntegerField(default=0)  # id del último mensaje resumido
+
+    # Pregunta de apertura tomada del pool (ver ai_agent/opening_pool.py)
+    opening_question = models.ForeignKey(
+        "ai_agent.OpeningQuestion", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+
     def __str__(self):
         return f"{self.user.username} - {self.get_interview_type_display()} ({self.position})"
 
@@ -55,6 +76,8 @@ class Message(models.Model):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
+    # Puntaje diferido: intentos en los que el modelo no evaluó esta respuesta (interviews/scoring.py)
+    score_attempts = models.PositiveSmallIntegerField(default=0)
 
     def __str__(self):
         return f"{self.role}: {self.content[:30]}"
@@ -70,3 +93,105 @@ class Score(models.Model):
 
     def average(self):
         return (self.claridad + self.confianza + self.contenido + self.creatividad + self.lenguaje) / 5
+
+
+class ScoreSummary(models.Model):
+    """
+    Sumas y cantidad de puntajes por criterio de una entrevista, actualizadas en
+    cada ``Score`` nuevo (ver interviews/summary.py). Resultados y PDF leen esta
+    fila en vez de recorrer los mensajes.
+    """
+    interview = models.OneToOneField(Interview, on_delete=models.CASCADE, related_name="score_summary")
+    count = models.IntegerField(default=0)
+    sum_claridad = models.IntegerField(default=0)
+    sum_confianza = models.IntegerField(default=0)
+    sum_contenido = models.IntegerField(default=0)
+    sum_creatividad = models.IntegerField(default=0)
+    sum_lenguaje = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    CRITERIA = ("claridad", "confianza", "contenido", "creatividad", "lenguaje")
+
+    def averages(self):
+        """Promedio por criterio (0 si aún no hay puntajes)."""
+        return {c: (getattr(self, f"sum_{c}") / self.count if self.count else 0) for c in self.CRITERIA}
+
+    def overall(self):
+        return int(sum(self.averages().values()) / len(self.CRITERIA))
+
+    def __str__(self):
+        return f"{self.interview_id}: {self.count} puntajes"
+
+
+class CohortBucket(models.Model):
+    """
+    Histograma de puntajes finales por cohorte (tipo, nivel, idioma, cargo
+    normalizado): una fila por puntaje 0-100 con su cantidad de entrevistas.
+    ``position="*"`` acumula todos los cargos. Ver interviews/cohorts.py.
+    """
+    interview_type = models.CharField(max_length=20)
+    level = models.CharField(max_length=20)
+    language = models.CharField(max_length=10)
+    position = models.CharField(max_length=100)
+    bucket = models.PositiveSmallIntegerField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["interview_type", "level", "language", "position", "bucket"], name="cohort_bucket_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.interview_type}/{self.level}/{self.language}/{self.position}[{self.bucket}] = {self.count}"
+
+
+class TurnRequest(models.Model):
+    """
+    Turno enviado con clave de idempotencia (ver interviews/idempotency.py): los
+    reintentos con la misma clave esperan o reciben la respuesta guardada en vez
+    de repetir el turno.
+    """
+    STATUS_CHOICES = [
+        ("running", "En curso"),
+        ("done", "Completado"),
+    ]
+
+    interview = models.ForeignKey(Interview, on_delete=models.CASCADE, related_name="turn_requests")
+    key = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="running")
+    response = models.JSONField(null=True, blank=True)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["interview", "key"], name="turn_request_key_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.interview_id}:{self.key} ({self.status})"
+
+
+class TranscriptSegment(models.Model):
+    """
+    Segmento de una grabación transcrito mientras el candidato sigue hablando
+    (ver interviews/live_transcript.py). La transcripción de la sesión es la
+    unión de sus segmentos en orden.
+    """
+    interview = models.ForeignKey(Interview, on_delete=models.CASCADE, related_name="transcript_segments")
+    session = models.CharField(max_length=64)
+    index = models.PositiveIntegerField()
+    text = models.TextField(blank=True)
+    seconds = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["index"]
+        constraints = [
+            models.UniqueConstraint(fields=["interview", "session", "index"], name="transcript_segment_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.interview_id}:{self.session}#{self.index}"
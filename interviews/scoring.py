@@ -0,0 +1,161 @@
+# interviews/scoring.py
+"""
+Puntaje en lote de las entrevistas en modo diferido (``scoring_mode="deferred"``).
+
+Durante la entrevista los turnos solo generan la pregunta. Al finalizar, todas
+las respuestas sin puntaje se evalúan en una o pocas llamadas al LLM (lotes de
+``AI_BATCH_SCORING_SIZE`` respuestas) y los ``Score`` y el feedback se escriben
+con ``bulk_create``. Aquí el ``Score`` cuelga del mensaje de la respuesta.
+
+Un solo proceso puntúa a la vez cada entrevista: se reclama con un UPDATE
+condicional sobre ``scoring_locked_until`` (mismo esquema que el visibility
+timeout de la cola de trabajos), así la página de resultados y un worker no
+evalúan dos veces las mismas respuestas.
+
+Las vistas (resultados, PDF) no puntúan ni esperan: ``schedule_scoring`` lo
+deja al trabajo ``score`` de la cola o a un hilo de fondo y la página se muestra
+ya, con el aviso de puntajes pendientes. Una respuesta que el modelo no evaluó
+en ``AI_BATCH_SCORING_MAX_ATTEMPTS`` intentos deja de contar como pendiente.
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ai_agent.service import score_answers
+
+from .models import Interview, Message, Score
+from .summary import add_scores
+
+
+def _batch_size() -> int:
+    return max(1, getattr(settings, "AI_BATCH_SCORING_SIZE", 8))
+
+
+def _lock_seconds() -> int:
+    return getattr(settings, "AI_BATCH_SCORING_LOCK_SECONDS", 120)
+
+
+def _max_attempts() -> int:
+    return getattr(settings, "AI_BATCH_SCORING_MAX_ATTEMPTS", 3)
+
+
+def _pending_answers(interview):
+    """Pares ``(pregunta, mensaje de respuesta)`` de las respuestas aún sin puntaje."""
+    pending = []
+    question = None
+    max_attempts = _max_attempts()
+    for msg in interview.messages.select_related("score").order_by("timestamp", "id"):
+        if msg.role == "ai":
+            question = msg.content
+        elif msg.role == "user" and not hasattr(msg, "score") and msg.score_attempts < max_attempts:
+            pending.append((question, msg))
+    return pending
+
+
+def has_pending_scores(interview) -> bool:
+    if interview.scoring_mode != "deferred":
+        return False
+    return interview.messages.filter(
+        role="user", score__isnull=True, score_attempts__lt=_max_attempts()
+    ).exists()
+
+
+def score_pending_answers(interview) -> bool:
+    """
+    Puntúa en lote las respuestas pendientes. Devuelve False si otro proceso ya
+    las está puntuando. Las respuestas que el modelo no evaluó suman un intento
+    y quedan pendientes hasta agotar ``AI_BATCH_SCORING_MAX_ATTEMPTS``.
+    """
+    if not has_pending_scores(interview):
+        return True
+
+    now = timezone.now()
+    claimed = Interview.objects.filter(
+        Q(scoring_locked_until__isnull=True) | Q(scoring_locked_until__lt=now), pk=interview.pk
+    ).update(scoring_locked_until=now + timedelta(seconds=_lock_seconds()))
+    if not claimed:
+        return False
+
+    try:
+        pending = _pending_answers(interview)
+        size = _batch_size()
+
+        for start in range(0, len(pending), size):
+            batch = pending[start:start + size]
+            results = score_answers(interview, [(question, msg.content) for question, msg in batch])
+
+            scores = []
+            feedback = []
+            missed = []
+            for (_, msg), result in zip(batch, results):
+                if result is None:
+                    missed.append(msg.pk)
+                    continue
+                scores.append(Score(message=msg, **result["scores"]))
+                if result["feedback"]:
+                    feedback.append(Message(interview=interview, role="feedback", content=result["feedback"]))
+
+            with transaction.atomic():
+                Score.objects.bulk_create(scores)
+                add_scores(interview, scores)  # bulk_create no dispara señales
+                Message.objects.bulk_create(feedback)
+                Message.objects.filter(pk__in=missed).update(score_attempts=F("score_attempts") + 1)
+    finally:
+        Interview.objects.filter(pk=interview.pk).update(scoring_locked_until=None)
+
+    return True
+
+
+def scoring_in_progress(interview) -> bool:
+    locked_until = Interview.objects.filter(pk=interview.pk).values_list("scoring_locked_until", flat=True).first()
+    return locked_until is not None and locked_until > timezone.now()
+
+
+_scheduled = set()
+_scheduled_lock = threading.Lock()
+
+
+def schedule_scoring(interview) -> bool:
+    """
+    Pide el puntaje de las respuestas pendientes sin esperarlo: trabajo ``score``
+    si hay cola de trabajos, si no un hilo de fondo (uno por entrevista y proceso).
+    Devuelve True si aún hay respuestas pendientes.
+    """
+    if not has_pending_scores(interview):
+        return False
+    if scoring_in_progress(interview):
+        return True
+
+    if getattr(settings, "AI_JOBS_ENABLED", False):
+        from ai_agent.jobs import enqueue
+        from ai_agent.models import AIJob
+
+        active = AIJob.objects.filter(kind="score", interview=interview, status__in=["queued", "running"])
+        if not active.exists():
+            enqueue("score", {}, interview=interview)
+        return True
+
+    with _scheduled_lock:
+        if interview.pk in _scheduled:
+            return True
+        _scheduled.add(interview.pk)
+
+    def _run():
+        from .cohorts import record_in_cohort
+
+        try:
+            if score_pending_answers(interview):
+                record_in_cohort(interview)
+        except Exception as e:
+            print(f"[SCORING] Error puntuando la entrevista {interview.pk}: {e}")
+        finally:
+            with _scheduled_lock:
+                _scheduled.discard(interview.pk)
+            connections.close_all()  # conexiones propias de este hilo
+
+    threading.Thread(target=_run, name=f"scoring-{interview.pk}", daemon=True).start()
+    return True
@@ -0,0 +1,80 @@
+# interviews/summary.py
+"""
+Resumen de puntajes por entrevista (``ScoreSummary``): sumas y cantidad por
+criterio, mantenidas al crear cada ``Score``.
+
+Quien crea puntajes llama a ``add_scores`` en la misma transacción, después de
+guardarlos (los ``bulk_create`` del puntaje diferido no disparan señales, por
+eso no se usan). El incremento es un único ``UPDATE ... SET sum = sum + n`` y
+no pierde puntajes con turnos concurrentes; si la entrevista aún no tiene
+resumen, el primero se calcula desde todos sus ``Score``. ``manage.py rebuild_score_summaries``
+recalcula las filas desde los ``Score`` (backfill o reparación).
+"""
+from typing import Iterable
+
+from django.db.models import Count, F, Sum
+
+from .models import Score, ScoreSummary
+
+
+CRITERIA = ScoreSummary.CRITERIA
+
+
+def add_scores(interview, scores: Iterable[Score]):
+    """Suma ``scores`` (ya guardados) al resumen de ``interview``."""
+    scores = list(scores)
+    if not scores:
+        return
+
+    totals = {f"sum_{c}": sum(int(getattr(s, c) or 0) for s in scores) for c in CRITERIA}
+    updates = {field: F(field) + value for field, value in totals.items()}
+    updates["count"] = F("count") + len(scores)
+
+    if not ScoreSummary.objects.filter(interview=interview).update(**updates):
+        # Sin fila todavía: se arma desde todos los Score de la entrevista (incluye
+        # los recién creados y los anteriores a la migración 0013)
+        rebuild_summaries([interview.pk])
+
+
+def _aggregates(interview_ids):
+    """``{interview_id: {count, sum_*}}`` desde los ``Score`` (una consulta agrupada)."""
+    rows = (
+        Score.objects.filter(message__interview_id__in=interview_ids)
+        .values("message__interview_id")
+        .annotate(count=Count("id"), **{f"sum_{c}": Sum(c) for c in CRITERIA})
+    )
+    return {row.pop("message__interview_id"): row for row in rows}
+
+
+def rebuild_summaries(interview_ids) -> int:
+    """Recalcula (o crea) los resúmenes de esas entrevistas. Devuelve cuántos escribió."""
+    interview_ids = list(interview_ids)
+    aggregates = _aggregates(interview_ids)
+    empty = {"count": 0, **{f"sum_{c}": 0 for c in CRITERIA}}
+
+    summaries = [
+        ScoreSummary(interview_id=pk, **aggregates.get(pk, empty))
+        for pk in interview_ids
+    ]
+    ScoreSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=["interview"],
+        update_fields=["count", *[f"sum_{c}" for c in CRITERIA]],
+    )
+    return len(summaries)
+
+
+def score_summary(interview) -> ScoreSummary:
+    """Resumen de la entrevista; si falta (entrevistas anteriores), se calcula una vez."""
+    summary = ScoreSummary.objects.filter(interview=interview).first()
+    if summary is None:
+        rebuild_summaries([interview.pk])
+        summary = ScoreSummary.objects.get(interview=interview)
+    return summary
+
+
+def summary_scores(interview):
+    """``(promedio, puntaje)`` como los usan resultados y PDF."""
+    summary = score_summary(interview)
+    return summary.averages(), summary.overall()
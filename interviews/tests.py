@@ -0,0 +1,194 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from ai_agent import jobs
+from ai_agent.models import AIJob
+from ai_agent.providers import get_llm, reset_providers
+
+from .cohorts import percentile
+from .idempotency import TurnInProgress, abandon_turn, claim_turn, complete_turn_request
+from .models import Interview, Message, Score, ScoreSummary, TurnRequest
+from .summary import add_scores, rebuild_summaries, score_summary
+from .turns import save_ai_turn
+
+
+# Proveedores locales sin latencia ni errores (ai_agent/providers/stub.py)
+STUB_PROVIDERS = override_settings(
+    AI_PROVIDERS={"llm": "stub", "stt": "stub", "tts": "stub"},
+    AI_STUB={"seed": 1, **{kind: {"latency": {"dist": "fixed", "ms": 0}, "error_rate": 0.0} for kind in ("llm", "stt", "tts")}},
+    AI_LLM_ROUTER={"enabled": False},
+    AI_CASSETTE={"mode": "off"},
+    AI_RATE_LIMITS={},
+    AI_TTS_CACHE={"enabled": False},
+)
+
+
+def make_interview(**kwargs):
+    user, _ = User.objects.get_or_create(username="candidato")
+    return Interview.objects.create(
+        user=user, interview_type="job", position="Backend Developer", max_questions=5, **kwargs
+    )
+
+
+def scores(value):
+    return {criterion: value for criterion in ScoreSummary.CRITERIA}
+
+
+# =========================
+# IDEMPOTENCIA
+# =========================
+@override_settings(AI_IDEMPOTENCY_WAIT_SECONDS=0)
+class ClaimTurnTests(TestCase):
+    def setUp(self):
+        self.interview = make_interview()
+
+    def test_duplicate_key_gets_the_saved_response(self):
+        turn, previous = claim_turn(self.interview, "k1")
+        self.assertIsNone(previous)
+        complete_turn_request(turn, {"question": "¿Por qué?"})
+
+        again, previous = claim_turn(self.interview, "k1")
+        self.assertEqual(again.pk, turn.pk)
+        self.assertEqual(previous, {"question": "¿Por qué?"})
+        self.assertEqual(TurnRequest.objects.filter(interview=self.interview).count(), 1)
+
+    def test_duplicate_key_while_running_does_not_run_the_turn(self):
+        claim_turn(self.interview, "k1")
+        with self.assertRaises(TurnInProgress):
+            claim_turn(self.interview, "k1")
+
+    def test_abandoned_turn_is_claimed_again(self):
+        turn, _ = claim_turn(self.interview, "k1")
+        abandon_turn(turn)
+
+        again, previous = claim_turn(self.interview, "k1")
+        self.assertIsNone(previous)
+        self.assertNotEqual(again.pk, turn.pk)
+
+    def test_stale_running_turn_is_taken_over(self):
+        turn, _ = claim_turn(self.interview, "k1")
+        TurnRequest.objects.filter(pk=turn.pk).update(started_at=timezone.now() - timedelta(hours=1))
+
+        again, previous = claim_turn(self.interview, "k1")
+        self.assertEqual(again.pk, turn.pk)
+        self.assertIsNone(previous)
+
+    def test_keys_are_per_interview(self):
+        claim_turn(self.interview, "k1")
+        _, previous = claim_turn(make_interview(), "k1")
+        self.assertIsNone(previous)
+
+
+# =========================
+# TURNO EN LA COLA DE TRABAJOS
+# =========================
+@STUB_PROVIDERS
+@override_settings(AI_JOBS_VISIBILITY_TIMEOUT=60)
+class TurnJobTests(TestCase):
+    def setUp(self):
+        reset_providers()
+        self.addCleanup(reset_providers)
+        self.assertEqual(get_llm().name, "stub")
+        self.interview = make_interview()
+        Message.objects.create(interview=self.interview, role="user", content="Trabajé con Django tres años.")
+
+    def test_redelivered_turn_is_saved_once(self):
+        job = jobs.enqueue("turn", {"message": "Trabajé con Django tres años.", "tts": False}, interview=self.interview)
+        first = jobs.claim_next("w1")
+        self.assertEqual(jobs.run_job(first, "w1"), "done")
+
+        # El worker se cayó antes de marcarlo terminado: vuelve a entregarse
+        AIJob.objects.filter(pk=job.pk).update(status="running", locked_until=timezone.now() - timedelta(seconds=1))
+        second = jobs.claim_next("w2")
+        self.assertEqual(jobs.run_job(second, "w2"), "done")
+
+        self.interview.refresh_from_db()
+        self.assertEqual(self.interview.asked_questions, 1)
+        self.assertEqual(self.interview.messages.filter(role="ai").count(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.result["message_id"], job.payload["turn"]["message_id"])
+
+    def test_turn_lost_to_another_worker_is_not_saved(self):
+        job = jobs.enqueue("turn", {"message": "", "tts": False}, interview=self.interview)
+        first = jobs.claim_next("w1")
+        AIJob.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        jobs.claim_next("w2")
+
+        self.assertEqual(jobs.run_job(first, "w1"), "lost")
+        self.assertEqual(self.interview.messages.filter(role="ai").count(), 0)
+
+
+# =========================
+# RESUMEN DE PUNTAJES
+# =========================
+class ScoreSummaryTests(TestCase):
+    def setUp(self):
+        self.interview = make_interview()
+
+    def assertMatchesRebuild(self):
+        summary = ScoreSummary.objects.get(interview=self.interview)
+        incremental = (summary.count, summary.averages())
+        rebuild_summaries([self.interview.pk])
+        summary.refresh_from_db()
+        self.assertEqual(incremental, (summary.count, summary.averages()))
+
+    def test_turns_keep_the_summary_in_sync(self):
+        for value in (80, 55, 0, 100):
+            save_ai_turn(self.interview, {"question": "¿Y luego?", "feedback": "Bien", "scores": scores(value)})
+
+        self.assertMatchesRebuild()
+        self.assertEqual(score_summary(self.interview).count, 4)
+
+    def test_batch_scores_keep_the_summary_in_sync(self):
+        save_ai_turn(self.interview, {"question": "¿Primera?", "scores": scores(70)})
+        batch = [
+            Score(message=Message.objects.create(interview=self.interview, role="ai", content=f"¿{i}?"), **scores(40 + i))
+            for i in range(3)
+        ]
+        Score.objects.bulk_create(batch)
+        add_scores(self.interview, batch)
+
+        self.assertMatchesRebuild()
+
+    def test_first_summary_includes_scores_saved_before_it(self):
+        # Puntaje anterior a ScoreSummary (migración 0013): no tiene fila de resumen
+        legacy = Message.objects.create(interview=self.interview, role="ai", content="¿Antigua?")
+        Score.objects.create(message=legacy, **scores(100))
+
+        save_ai_turn(self.interview, {"question": "¿Nueva?", "scores": scores(0)})
+
+        summary = score_summary(self.interview)
+        self.assertEqual(summary.count, 2)
+        self.assertEqual(summary.averages()["claridad"], 50)
+        self.assertMatchesRebuild()
+
+
+# =========================
+# COHORTES
+# =========================
+class PercentileTests(SimpleTestCase):
+    def histogram(self, *values):
+        counts = [0] * 101
+        for value in values:
+            counts[value] += 1
+        return counts
+
+    def test_percentiles_of_a_histogram(self):
+        counts = self.histogram(10, 20, 30, 40, 50, 60, 70, 80)
+        self.assertEqual(percentile(counts, 50), 40)
+        self.assertEqual(percentile(counts, 75), 60)
+        self.assertEqual(percentile(counts, 100), 80)
+        self.assertEqual(percentile(counts, 0), 10)
+
+    def test_repeated_scores(self):
+        counts = self.histogram(30, 90, 90, 90)
+        self.assertEqual(percentile(counts, 25), 30)
+        self.assertEqual(percentile(counts, 50), 90)
+
+    def test_edges(self):
+        self.assertEqual(percentile([0] * 101, 50), 0)
+        self.assertEqual(percentile(self.histogram(0, 100), 50), 0)
+        self.assertEqual(percentile(self.histogram(0, 100), 75), 100)
@@ -0,0 +1,68 @@
+# interviews/turns.py
+"""
+Persistencia de un turno de la entrevista (pregunta, puntajes y feedback de la IA).
+Lo comparten las vistas y los workers de la cola de trabajos de IA.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Message, Score
+from .summary import add_scores
+
+
+def save_ai_turn(interview, result):
+    """Guarda la pregunta, sus puntajes y el feedback de la IA. Devuelve el mensaje de la pregunta."""
+    question = result.get("question")
+    feedback = result.get("feedback")
+    scores = result.get("scores")
+
+    ai_msg = None
+
+    if question:
+        ai_msg = Message.objects.create(interview=interview, role="ai", content=question)
+
+        if scores:
+            with transaction.atomic():
+                score = Score.objects.create(
+                    message=ai_msg,
+                    claridad=scores.get("claridad", 0),
+                    confianza=scores.get("confianza", 0),
+                    contenido=scores.get("contenido", 0),
+                    creatividad=scores.get("creatividad", 0),
+                    lenguaje=scores.get("lenguaje", 0),
+                )
+                add_scores(interview, [score])
+
+    if feedback:
+        Message.objects.create(interview=interview, role="feedback", content=feedback)
+
+    return ai_msg
+
+
+# Campos que cambia un turno. Los guardados de Interview nombran sus campos:
+# un save() completo reescribiría con valores viejos lo que otro proceso
+# actualiza aparte en la misma fila (p.ej. la marca de cohorte del puntaje).
+TURN_FIELDS = ["asked_questions", "is_finished"]
+
+
+def apply_finish_conditions(interview):
+    """Marca la entrevista como finalizada si se alcanzó el límite de preguntas o de tiempo."""
+    if interview.mode == "questions" and interview.max_questions:
+        if interview.asked_questions >= interview.max_questions:
+            interview.is_finished = True
+
+    elif interview.mode == "time" and interview.time_limit:
+        elapsed = (timezone.now() - interview.created_at).total_seconds() / 60
+        if elapsed >= interview.time_limit:
+            interview.is_finished = True
+
+
+def complete_turn(interview, result):
+    """Guarda el turno de la IA, avanza el contador y aplica las condiciones de fin."""
+    ai_msg = save_ai_turn(interview, result)
+
+    interview.asked_questions += 1
+    apply_finish_conditions(interview)
+    interview.save(update_fields=TURN_FIELDS)
+
+    return ai_msg
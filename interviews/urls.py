@@ -13,7 +13,17 @@ urlpatterns = [
 
     # AUDIO
     path("<int:pk>/transcribe/", views.transcribe_audio, name="transcribe_audio"),
+    path("<int:pk>/transcribe/live/<slug:session>/", views.transcribe_segment, name="transcribe_segment"),
     path("<int:pk>/voice/", views.generate_voice_response, name="generate_voice_response"),
+    path("<int:pk>/stream/", views.interview_stream, name="interview_stream"),
+    path("<int:pk>/voice-turn/", views.interview_voice_turn, name="interview_voice_turn"),
+    path("<int:pk>/opening-audio/", views.interview_opening_audio, name="interview_opening_audio"),
+    path("<int:pk>/audio/<int:message_id>/", views.interview_message_audio, name="interview_message_audio"),
+
+    # COLA DE TRABAJOS DE IA
+    path("<int:pk>/jobs/turn/", views.interview_enqueue_turn, name="interview_enqueue_turn"),
+    path("<int:pk>/jobs/transcribe/", views.interview_enqueue_transcription, name="interview_enqueue_transcription"),
+    path("jobs/<int:job_id>/", views.ai_job_status, name="ai_job_status"),
 
     # 📄 Exportar resultados en PDF (ESTA ES LA QUE FALTABA)
     path("<int:pk>/export-pdf/", views.interview_export_pdf, name="interview_export_pdf"),
@@ -1,19 +1,70 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.utils import timezone
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, Http404
+from django.urls import reverse
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_exempt
-from .models import Interview, Message, Score
+from .models import Interview, Message
 from .forms import InterviewForm
-from ai_agent.service import generate_ai_response
-import json
+from .turns import TURN_FIELDS, save_ai_turn, apply_finish_conditions
+from .live_transcript import save_segment, running_transcript, afinal_transcript
+from .summary import summary_scores
+from .cohorts import cohort_comparison, record_in_cohort
+from .scoring import schedule_scoring, score_pending_answers
+from .idempotency import (
+    TurnInProgress, idempotency_key, claim_turn, aclaim_turn, complete_turn_request, abandon_turn,
+)
+from ai_agent.service import generate_ai_response, agenerate_ai_response, astream_ai_response, question_only
+from ai_agent.opening_pool import claim_opening_question
+from ai_agent.jobs import enqueue as enqueue_ai_job, job_status
+from ai_agent.models import AIJob
+from ai_agent.providers.limiter import ProviderBusy
 import base64
+import json
+import uuid
 
-from ai_agent.voice_utils import transcribe_audio as whisper_transcribe
-from ai_agent.voice_utils import text_to_speech_edge_tts
+from ai_agent.voice_utils import atranscribe_audio as whisper_atranscribe
+from ai_agent.voice_utils import atranscribe_file as whisper_atranscribe_file
+from ai_agent.audio_upload import AudioRejected, is_binary_upload, receive_audio
+from ai_agent.voice_utils import astream_speech, IncrementalSpeech
 
-from reports.utils import compute_scores, plot_promedios, plot_comparativa, plot_radar, plot_pie_strengths
+from reports.utils import compute_scores, pdf_charts
+
+
+#############################################
+# UTILIDADES
+#############################################
+
+def _sse(event, data):
+    """Formatea un evento Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _busy_payload(error):
+    return {"error": str(error), "retry_after": error.retry_after}
+
+
+def _busy_response(error):
+    """HTTP 429 cuando el limitador de cuota rechaza la llamada al proveedor."""
+    response = JsonResponse(_busy_payload(error), status=429)
+    response["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def _audio_url(interview, ai_msg):
+    """URL del MP3 (en streaming) de una pregunta de la IA, o None si no hay pregunta."""
+    if not ai_msg:
+        return None
+    return reverse("interviews:interview_message_audio", args=[interview.pk, ai_msg.pk])
+
+
+def _turn_in_progress_response():
+    """HTTP 409 cuando el request original con la misma clave aún no termina."""
+    response = JsonResponse({"error": "El turno sigue en curso", "retry_after": 1}, status=409)
+    response["Retry-After"] = "1"
+    return response
 
 
 #############################################
@@ -39,30 +90,24 @@ def interview_create(request):
             interview.user = request.user
             interview.save()
 
-            # Primera pregunta
-            result = generate_ai_response(interview, "")
-            question = result.get("question")
-            feedback = result.get("feedback")
-            scores = result.get("scores")
-
-            if question:
-                ai_msg = Message.objects.create(interview=interview, role="ai", content=question)
-
-                if scores:
-                    Score.objects.create(
-                        message=ai_msg,
-                        claridad=scores.get("claridad", 0),
-                        confianza=scores.get("confianza", 0),
-                        contenido=scores.get("contenido", 0),
-                        creatividad=scores.get("creatividad", 0),
-                        lenguaje=scores.get("lenguaje", 0),
-                    )
-
-            if feedback:
-                Message.objects.create(interview=interview, role="feedback", content=feedback)
+            # Primera pregunta: del pool pregenerado si hay, si no en vivo
+            opening = claim_opening_question(interview)
+            if opening:
+                interview.opening_question = opening
+                result = opening.payload
+                if interview.scoring_mode == "deferred":
+                    result = question_only(result)
+            else:
+                try:
+                    result = generate_ai_response(interview, "")
+                except ProviderBusy as e:
+                    interview.delete()
+                    form.add_error(None, f"El servicio de IA está ocupado, reintenta en {e.retry_after} s.")
+                    return render(request, "interviews/create.html", {"form": form}, status=429)
+            save_ai_turn(interview, result)
 
             interview.asked_questions += 1
-            interview.save()
+            interview.save(update_fields=["asked_questions", "opening_question"])
 
             return redirect("interviews:interview_detail", pk=interview.pk)
 
@@ -84,94 +129,238 @@ def interview_detail(request, pk):
         return redirect("interviews:interview_results", pk=interview.pk)
 
     messages_list = interview.messages.order_by("timestamp")
+    busy_error = None
 
     # RESPUESTA TEXTO (normal)
     if request.method == "POST":
 
         if "finish" in request.POST:
             interview.is_finished = True
-            interview.save()
+            interview.save(update_fields=["is_finished"])
+            record_in_cohort(interview)
             return redirect("interviews:interview_results", pk=interview.pk)
 
+        # Reintento o doble clic: se adjunta al turno original en vez de repetirlo
+        key = idempotency_key(request)
+        turn = None
+        if key:
+            try:
+                turn, previous = claim_turn(interview, key)
+            except TurnInProgress:
+                return redirect("interviews:interview_detail", pk=interview.pk)
+            if previous is not None:
+                if previous.get("is_finished"):
+                    return redirect("interviews:interview_results", pk=interview.pk)
+                return redirect("interviews:interview_detail", pk=interview.pk)
+
         # Respuesta usuario
         user_answer = request.POST.get("answer")
 
+        user_msg = None
         if user_answer:
-            Message.objects.create(interview=interview, role="user", content=user_answer)
+            user_msg = Message.objects.create(interview=interview, role="user", content=user_answer)
 
         # Generación respuesta IA
-        result = generate_ai_response(interview, user_answer or "")
+        try:
+            result = generate_ai_response(interview, user_answer or "")
+        except ProviderBusy as e:
+            # El turno no cuenta: se vuelve a mostrar el chat con la respuesta en el campo
+            if user_msg:
+                user_msg.delete()
+            if turn:
+                abandon_turn(turn)
+            busy_error = e
+        else:
+            save_ai_turn(interview, result)
 
-        question = result.get("question")
-        feedback = result.get("feedback")
-        scores = result.get("scores")
-
-        if question:
-            ai_msg = Message.objects.create(interview=interview, role="ai", content=question)
+            interview.asked_questions += 1
 
-            if scores:
-                Score.objects.create(
-                    message=ai_msg,
-                    claridad=scores.get("claridad", 0),
-                    confianza=scores.get("confianza", 0),
-                    contenido=scores.get("contenido", 0),
-                    creatividad=scores.get("creatividad", 0),
-                    lenguaje=scores.get("lenguaje", 0),
-                )
+            # Condiciones de finalización
+            apply_finish_conditions(interview)
 
-        if feedback:
-            Message.objects.create(interview=interview, role="feedback", content=feedback)
+            interview.save(update_fields=TURN_FIELDS)
 
-        interview.asked_questions += 1
+            if turn:
+                complete_turn_request(turn, {"is_finished": interview.is_finished})
 
-        # Condiciones de finalización
-        if interview.mode == "questions" and interview.max_questions:
-            if interview.asked_questions >= interview.max_questions:
-                interview.is_finished = True
+            if interview.is_finished:
+                return redirect("interviews:interview_results", pk=interview.pk)
 
-        elif interview.mode == "time" and interview.time_limit:
-            elapsed = (timezone.now() - interview.created_at).total_seconds() / 60
-            if elapsed >= interview.time_limit:
-                interview.is_finished = True
+            return redirect("interviews:interview_detail", pk=interview.pk)
 
-        interview.save()
+    # Audio pregenerado de la pregunta de apertura, mientras el candidato no haya respondido
+    opening_audio_url = None
+    if interview.opening_question_id and interview.asked_questions == 1:
+        opening_audio_url = reverse("interviews:interview_opening_audio", args=[interview.pk])
 
-        if interview.is_finished:
-            return redirect("interviews:interview_results", pk=interview.pk)
-
-        return redirect("interviews:interview_detail", pk=interview.pk)
+    last_question = interview.messages.filter(role="ai").order_by("-timestamp", "-id").first()
 
     return render(request, "interviews/detail.html",
-        {"interview": interview, "messages": messages_list}
+        {
+            "interview": interview,
+            "messages": messages_list,
+            "opening_audio_url": opening_audio_url,
+            "last_audio_url": _audio_url(interview, last_question),
+            "max_audio_seconds": int(getattr(settings, "AI_AUDIO_MAX_SECONDS", 180)),
+            "use_job_queue": getattr(settings, "AI_JOBS_ENABLED", False),
+            "live_transcription": getattr(settings, "AI_LIVE_TRANSCRIPTION", True),
+            "live_segment_seconds": getattr(settings, "AI_LIVE_SEGMENT_SECONDS", 6),
+            "voice_turn": getattr(settings, "AI_VOICE_TURN", True),
+            "busy_error": busy_error,
+            "pending_answer": request.POST.get("answer", "") if busy_error else "",
+            "idempotency_key": uuid.uuid4().hex,
+        },
+        status=429 if busy_error else 200,
     )
 
 
+@login_required
+def interview_opening_audio(request, pk):
+    """MP3 pregenerado de la pregunta de apertura (si vino del pool)."""
+    interview = get_object_or_404(Interview, pk=pk, user=request.user)
+    opening = interview.opening_question
+
+    if not opening or not opening.audio:
+        raise Http404("Sin audio de apertura")
+
+    return HttpResponse(bytes(opening.audio), content_type="audio/mpeg")
+
+
+#############################################
+# AUDIO DE LAS PREGUNTAS (TTS EN STREAMING)
+#############################################
+
+@login_required
+async def interview_message_audio(request, pk, message_id):
+    """
+    MP3 de una pregunta de la IA, transmitido a medida que edge-tts entrega los
+    fragmentos (o desde la caché de audio): la reproducción empieza con el primero.
+    """
+    user = await request.auser()
+    interview = await aget_object_or_404(Interview, pk=pk, user=user)
+    message = await aget_object_or_404(Message, pk=message_id, interview=interview, role="ai")
+
+    chunks = astream_speech(message.content, interview.language)
+
+    # El primer fragmento se espera aquí: los errores aún pueden responder con su código
+    try:
+        first = await anext(chunks)
+    except StopAsyncIteration:
+        return JsonResponse({"error": "TTS devolvió audio vacío."}, status=502)
+    except ProviderBusy as e:
+        return _busy_response(e)
+    except Exception as e:
+        print(f"[TTS] Error generando audio: {e}")
+        return JsonResponse({"error": str(e)}, status=502)
+
+    async def body():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    response = StreamingHttpResponse(body(), content_type="audio/mpeg")
+    response["Cache-Control"] = "private, max-age=86400"  # el texto de un mensaje no cambia
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 #############################################
 # TRANSCRIPCIÓN DE AUDIO — WHISPER
 #############################################
+# Las vistas de voz son async: bajo ASGI (evalent/asgi.py) esperan a los
+# proveedores sin ocupar un hilo por turno. El ORM se usa vía la API async
+# (aget/acreate/asave) o sync_to_async.
 
 @login_required
 @csrf_exempt
-def transcribe_audio(request, pk):
+async def transcribe_audio(request, pk):
     if request.method != "POST":
         return JsonResponse({"error": "Método no permitido"}, status=405)
 
     try:
-        interview = get_object_or_404(Interview, pk=pk, user=request.user)
+        user = await request.auser()
+        interview = await aget_object_or_404(Interview, pk=pk, user=user)
 
-        data = json.loads(request.body)
-        audio_base64 = data.get("audio")
+        if is_binary_upload(request):
+            # Audio en crudo o multipart: se copia por bloques a un temporal (ai_agent/audio_upload.py)
+            try:
+                audio_file = await sync_to_async(receive_audio)(request)
+            except AudioRejected as e:
+                return JsonResponse({"error": str(e)}, status=e.status)
+            try:
+                text = await whisper_atranscribe_file(audio_file)
+            finally:
+                audio_file.close()
+        else:
+            # Compatibilidad: JSON con el audio en data URL base64
+            data = json.loads(request.body)
+            audio_base64 = data.get("audio")
 
-        if not audio_base64:
-            return JsonResponse({"error": "No se recibió audio"}, status=400)
+            if not audio_base64:
+                return JsonResponse({"error": "No se recibió audio"}, status=400)
 
-        text = whisper_transcribe(audio_base64)
+            text = await whisper_atranscribe(audio_base64)
 
         if not text:
             return JsonResponse({"error": "Error al transcribir"}, status=500)
 
         return JsonResponse({"text": text})
 
+    except ProviderBusy as e:
+        return _busy_response(e)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@login_required
+@csrf_exempt
+async def transcribe_segment(request, pk, session):
+    """
+    Segmento de una grabación en curso (ver interviews/live_transcript.py).
+    Cabeceras: ``X-Segment-Index`` y, en el último, ``X-Segment-Final: 1``.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Método no permitido"}, status=405)
+
+    try:
+        index = int(request.headers.get("X-Segment-Index", ""))
+        if index < 0:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({"error": "X-Segment-Index inválido"}, status=400)
+    final = request.headers.get("X-Segment-Final") == "1"
+
+    try:
+        user = await request.auser()
+        interview = await aget_object_or_404(Interview, pk=pk, user=user)
+
+        try:
+            audio_file = await sync_to_async(receive_audio)(request)
+        except AudioRejected as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        try:
+            # Un segmento de solo silencio transcribe a "" y no corta la sesión
+            text = await whisper_atranscribe_file(audio_file)
+        finally:
+            audio_file.close()
+        if text is None:
+            # Fallo del STT: no se guarda, así el segmento cuenta como faltante y el cliente lo reenvía
+            return JsonResponse({"error": "Error al transcribir", "index": index, "retry_after": 1}, status=502)
+
+        seconds = request.headers.get("X-Audio-Duration")
+        await sync_to_async(save_segment)(interview, session, index, text, float(seconds) if seconds else None)
+
+        if not final:
+            transcript, _ = await sync_to_async(running_transcript)(interview, session)
+            return JsonResponse({"index": index, "segment": text, "transcript": transcript})
+
+        transcript, missing = await afinal_transcript(interview, session, index + 1)
+        if not transcript:
+            return JsonResponse({"error": "Error al transcribir", "missing": missing}, status=500)
+        return JsonResponse({"text": transcript, "final": True, "missing": missing})
+
+    except ProviderBusy as e:
+        return _busy_response(e)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -182,81 +371,447 @@ def transcribe_audio(request, pk):
 
 @login_required
 @csrf_exempt
-def generate_voice_response(request, pk):
-    """IA responde con texto + audio MP3 en base64"""
+async def generate_voice_response(request, pk):
+    """IA responde con texto + URL del audio MP3 (transmitido por interview_message_audio)"""
     if request.method != "POST":
         return JsonResponse({"error": "Método no permitido"}, status=405)
 
+    turn = None  # solo si este request es dueño de la clave
+    user_msg = None
+    saved = False
     try:
-        interview = get_object_or_404(Interview, pk=pk, user=request.user)
+        user = await request.auser()
+        interview = await aget_object_or_404(Interview, pk=pk, user=user)
         data = json.loads(request.body)
         user_message = data.get("message", "")
 
+        key = idempotency_key(request, data)
+        if key:
+            try:
+                turn, previous = await aclaim_turn(interview, key)
+            except TurnInProgress:
+                return _turn_in_progress_response()
+            if previous is not None:
+                return JsonResponse(previous)
+
         if user_message:
-            Message.objects.create(interview=interview, role="user", content=user_message)
+            user_msg = await Message.objects.acreate(interview=interview, role="user", content=user_message)
 
         # IA genera respuesta
-        result = generate_ai_response(interview, user_message)
+        try:
+            result = await agenerate_ai_response(interview, user_message)
+        except ProviderBusy as e:
+            if user_msg:
+                await user_msg.adelete()
+            if turn:
+                await sync_to_async(abandon_turn)(turn)
+            return _busy_response(e)
 
         question = result.get("question")
         feedback = result.get("feedback")
         scores = result.get("scores")
 
-        ai_msg_id = None
-
-        if question:
-            ai_msg = Message.objects.create(interview=interview, role="ai", content=question)
-            ai_msg_id = ai_msg.id
-
-            if scores:
-                Score.objects.create(
-                    message=ai_msg,
-                    claridad=scores.get("claridad", 0),
-                    confianza=scores.get("confianza", 0),
-                    contenido=scores.get("contenido", 0),
-                    creatividad=scores.get("creatividad", 0),
-                    lenguaje=scores.get("lenguaje", 0),
-                )
-
-        if feedback:
-            Message.objects.create(interview=interview, role="feedback", content=feedback)
+        ai_msg = await sync_to_async(save_ai_turn)(interview, result)
+        ai_msg_id = ai_msg.id if ai_msg else None
+        saved = True
 
         interview.asked_questions += 1
-        interview.save()
-
-        # Convertir respuesta a voz
-        audio_base64 = None
-        tts_error = None
+        await interview.asave(update_fields=["asked_questions"])
 
-        if question:
-            try:
-                print(f"[TTS] Generando audio para idioma: {interview.language}")
-                audio_bytes = text_to_speech_edge_tts(question, interview.language)
-
-                if audio_bytes:
-                    print(f"[TTS] Audio generado con {len(audio_bytes)} bytes")
-                    audio_base64 = base64.b64encode(audio_bytes).decode()
-                else:
-                    tts_error = "TTS devolvió audio vacío."
-                    print("[TTS] Advertencia: audio vacío")
-            except Exception as e:
-                tts_error = str(e)
-                print(f"[TTS] Error generando audio: {e}")
-
-        return JsonResponse({
+        # La voz se transmite aparte (interview_message_audio): aquí solo va la URL
+        payload = {
             "question": question,
             "feedback": feedback,
             "scores": scores,
-            "audio": audio_base64,
+            "audio_url": _audio_url(interview, ai_msg),
             "message_id": ai_msg_id,
-            "tts_error": tts_error,
-        })
+        }
+        if turn:
+            await sync_to_async(complete_turn_request)(turn, payload)
+
+        return JsonResponse(payload)
 
     except Exception as e:
         print(f"[VOICE] Error general en generate_voice_response: {e}")
+        if not saved and user_msg:
+            await user_msg.adelete()
+        if turn:
+            # Sin esto los reintentos con la misma clave esperarían a un dueño que ya no existe
+            await sync_to_async(abandon_turn)(turn)
         return JsonResponse({"error": str(e)}, status=500)
 
 
+#############################################
+# RESPUESTA DE IA EN STREAMING (SSE)
+#############################################
+
+@login_required
+@csrf_exempt
+async def interview_stream(request, pk):
+    """
+    Igual que generate_voice_response, pero envía la pregunta como Server-Sent Events
+    a medida que Gemini la genera. Eventos:
+
+    - ``question``: ``{"delta": "..."}`` con el texto nuevo de la pregunta.
+    - ``done``: pregunta definitiva, feedback, puntajes y estado de la entrevista
+      (los mensajes ya están guardados).
+    - ``audio``: ``{"audio_url": ...}`` con la URL del MP3 en streaming de la pregunta.
+    - ``busy``: ``{"error": ..., "retry_after": N}`` si el proveedor está al límite
+      de cuota; el turno no se guarda.
+
+    Un reintento con la misma ``Idempotency-Key`` recibe ``done`` y ``audio`` del
+    turno original.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Método no permitido"}, status=405)
+
+    user = await request.auser()
+    interview = await aget_object_or_404(Interview, pk=pk, user=user)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "JSON inválido"}, status=400)
+
+    key = idempotency_key(request, data)
+    turn = None
+    if key:
+        try:
+            turn, previous = await aclaim_turn(interview, key)
+        except TurnInProgress:
+            return _turn_in_progress_response()
+        if previous is not None:
+            return _replay_stream(previous)
+
+    if interview.is_finished:
+        if turn:
+            await sync_to_async(abandon_turn)(turn)
+        return JsonResponse({"error": "La entrevista ya finalizó"}, status=409)
+
+    user_message = data.get("message", "")
+
+    async def event_stream():
+        result = None
+        user_msg = None
+        saved = False
+
+        try:
+            # El mensaje se crea dentro del stream: su finally lo borra si el turno no se guarda
+            if user_message:
+                user_msg = await Message.objects.acreate(interview=interview, role="user", content=user_message)
+            try:
+                async for kind, payload in astream_ai_response(interview, user_message):
+                    if kind == "question":
+                        yield _sse("question", {"delta": payload})
+                    else:
+                        result = payload
+            except ProviderBusy as e:
+                yield _sse("busy", _busy_payload(e))
+                return
+
+            # Persistimos solo cuando el stream terminó
+            done = await _persist_streamed_turn(interview, result)
+            if turn:
+                await sync_to_async(complete_turn_request)(turn, done)
+            saved = True
+        finally:
+            # Busy, error o cliente desconectado antes de guardar: el reintento repite
+            # el turno, sin la respuesta de este intento en el historial
+            if not saved:
+                if user_msg:
+                    await user_msg.adelete()
+                if turn:
+                    await sync_to_async(abandon_turn)(turn)
+
+        yield _sse("done", done)
+        yield _sse("audio", {"audio_url": done["audio_url"]})
+        await _score_if_finished(interview)
+
+    return _event_stream_response(event_stream())
+
+
+async def _persist_streamed_turn(interview, result):
+    """Guarda el turno generado en streaming y devuelve el payload del evento ``done``."""
+    ai_msg = await sync_to_async(save_ai_turn)(interview, result)
+
+    interview.asked_questions += 1
+    apply_finish_conditions(interview)
+    await interview.asave(update_fields=TURN_FIELDS)
+
+    return {
+        "question": result.get("question"),
+        "feedback": result.get("feedback"),
+        "scores": result.get("scores"),
+        "message_id": ai_msg.id if ai_msg else None,
+        "audio_url": _audio_url(interview, ai_msg),
+        "is_finished": interview.is_finished,
+    }
+
+
+async def _score_if_finished(interview):
+    """Modo diferido: se puntúa ya, mientras el cliente espera para ir a resultados."""
+    if interview.is_finished:
+        try:
+            await sync_to_async(score_pending_answers)(interview)
+        except ProviderBusy:
+            return  # lo reintenta la página de resultados
+        await sync_to_async(record_in_cohort)(interview)
+
+
+@login_required
+@csrf_exempt
+async def interview_voice_turn(request, pk):
+    """
+    Turno de voz completo en una sola petición: el cuerpo es el audio de la
+    respuesta y el servidor encadena STT -> IA -> TTS. La voz de la pregunta se
+    sintetiza por oraciones mientras el LLM todavía escribe, así el audio sale
+    casi a la par del texto. Eventos SSE:
+
+    - ``transcript``: ``{"text": ...}`` con la respuesta transcrita.
+    - ``question`` y ``done``: como en interview_stream.
+    - ``speech``: ``{"index": n, "audio": base64}`` con el MP3 de cada oración, en orden.
+    - ``audio``: ``{"audio_url": ..., "replace_speech": bool}`` para volver a
+      reproducir la pregunta; ``replace_speech`` indica que la voz ya enviada no es
+      la pregunta final completa y hay que reproducir esta en su lugar.
+    - ``busy`` / ``error``: el turno no se guarda.
+
+    Con ``X-Live-Session`` el audio es el último segmento de una transcripción
+    incremental (interviews/live_transcript.py) y la respuesta es la sesión completa.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Método no permitido"}, status=405)
+
+    user = await request.auser()
+    interview = await aget_object_or_404(Interview, pk=pk, user=user)
+
+    session = (request.headers.get("X-Live-Session") or "")[:64]
+    try:
+        index = int(request.headers.get("X-Segment-Index", 0))
+    except ValueError:
+        return JsonResponse({"error": "X-Segment-Index inválido"}, status=400)
+
+    key = idempotency_key(request, {})
+    turn = None
+    if key:
+        try:
+            turn, previous = await aclaim_turn(interview, key)
+        except TurnInProgress:
+            return _turn_in_progress_response()
+        if previous is not None:
+            return _replay_stream(previous)
+
+    if interview.is_finished:
+        if turn:
+            await sync_to_async(abandon_turn)(turn)
+        return JsonResponse({"error": "La entrevista ya finalizó"}, status=409)
+
+    try:
+        audio_file = await sync_to_async(receive_audio)(request)
+    except AudioRejected as e:
+        if turn:
+            await sync_to_async(abandon_turn)(turn)
+        return JsonResponse({"error": str(e)}, status=e.status)
+
+    speech = None
+    speech_failed = False
+    sent = 0
+
+    async def speech_events(wait=False):
+        """Eventos ``speech`` con el audio ya listo (o todo el restante con ``wait``)."""
+        nonlocal speech_failed
+        if speech_failed:
+            return
+
+        def event(chunk):
+            nonlocal sent
+            sent += 1
+            return _sse("speech", {"index": sent - 1, "audio": base64.b64encode(chunk).decode()})
+
+        try:
+            for chunk in speech.ready():
+                yield event(chunk)
+            if wait:
+                async for chunk in speech.remaining():
+                    yield event(chunk)
+        except Exception as e:
+            # Sin más voz en línea para esta pregunta: el cliente la reproduce desde audio_url
+            if not isinstance(e, ProviderBusy):
+                print("❌ Error en TTS:", e)
+            speech_failed = True
+            speech.cancel()
+
+    async def event_stream():
+        nonlocal speech
+        user_msg = None
+        saved = False
+
+        try:
+            # 1) STT
+            try:
+                try:
+                    text = await whisper_atranscribe_file(audio_file)
+                finally:
+                    audio_file.close()
+                if text is None:
+                    yield _sse("error", {"error": "Error al transcribir"})
+                    return
+                if session:
+                    await sync_to_async(save_segment)(interview, session, index, text)
+                    text, _ = await afinal_transcript(interview, session, index + 1)
+            except ProviderBusy as e:
+                yield _sse("busy", _busy_payload(e))
+                return
+
+            if not text:
+                yield _sse("error", {"error": "Error al transcribir"})
+                return
+            yield _sse("transcript", {"text": text})
+
+            # 2) IA en streaming, 3) TTS de cada oración apenas se completa
+            user_msg = await Message.objects.acreate(interview=interview, role="user", content=text)
+            speech = IncrementalSpeech(interview.language)
+            result = None
+            try:
+                async for kind, payload in astream_ai_response(interview, text):
+                    if kind == "question":
+                        yield _sse("question", {"delta": payload})
+                        if not speech_failed:
+                            speech.feed(payload)
+                            async for event in speech_events():
+                                yield event
+                    else:
+                        result = payload
+            except ProviderBusy as e:
+                yield _sse("busy", _busy_payload(e))
+                return
+
+            done = await _persist_streamed_turn(interview, result)
+            done["transcript"] = text
+            if turn:
+                await sync_to_async(complete_turn_request)(turn, done)
+            saved = True
+            yield _sse("done", done)
+
+            if not speech_failed:
+                speech.finish(result.get("question") or "")
+                async for event in speech_events(wait=True):
+                    yield event
+        finally:
+            if speech:
+                speech.cancel()
+            # Busy, error o cliente desconectado antes de guardar: el reintento repite
+            # el turno, sin la respuesta de este intento en el historial
+            if not saved:
+                if user_msg:
+                    await user_msg.adelete()
+                if turn:
+                    await sync_to_async(abandon_turn)(turn)
+
+        # replace_speech: la voz enviada no es la pregunta final completa (fallback del
+        # servicio o TTS caído a mitad); el cliente la corta y reproduce audio_url
+        replace = bool(speech and speech.diverged) or (speech_failed and sent > 0)
+        yield _sse("audio", {"audio_url": done["audio_url"], "replace_speech": replace})
+        await _score_if_finished(interview)
+
+    return _event_stream_response(event_stream())
+
+
+def _event_stream_response(events):
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # que nginx no acumule el stream
+    return response
+
+
+def _replay_stream(previous):
+    """Reenvía como SSE la respuesta guardada de un turno ya ejecutado."""
+    async def event_stream():
+        yield _sse("done", previous)
+        yield _sse("audio", {"audio_url": previous.get("audio_url")})
+
+    return _event_stream_response(event_stream())
+
+
+#############################################
+# COLA DE TRABAJOS DE IA (RESPUESTA INMEDIATA)
+#############################################
+# Con AI_JOBS_ENABLED el cliente encola el turno y consulta el resultado por
+# polling; los workers de `manage.py run_ai_workers` hacen las llamadas lentas.
+
+def _job_accepted(job):
+    return JsonResponse({
+        "job_id": job.pk,
+        "status": job.status,
+        "status_url": reverse("interviews:ai_job_status", args=[job.pk]),
+    }, status=202)
+
+
+@login_required
+@csrf_exempt
+def interview_enqueue_turn(request, pk):
+    if request.method != "POST":
+        return JsonResponse({"error": "Método no permitido"}, status=405)
+
+    interview = get_object_or_404(Interview, pk=pk, user=request.user)
+
+    if interview.is_finished:
+        return JsonResponse({"error": "La entrevista ya finalizó"}, status=409)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "JSON inválido"}, status=400)
+
+    key = idempotency_key(request, data)
+    turn = None
+    if key:
+        try:
+            turn, previous = claim_turn(interview, key)
+        except TurnInProgress:
+            return _turn_in_progress_response()
+        if previous is not None:
+            return _job_accepted(get_object_or_404(AIJob, pk=previous["job_id"]))
+
+    user_message = data.get("message", "")
+
+    if user_message:
+        Message.objects.create(interview=interview, role="user", content=user_message)
+
+    job = enqueue_ai_job("turn", {"message": user_message}, interview=interview)
+    if turn:
+        complete_turn_request(turn, {"job_id": job.pk})
+    return _job_accepted(job)
+
+
+@login_required
+@csrf_exempt
+def interview_enqueue_transcription(request, pk):
+    if request.method != "POST":
+        return JsonResponse({"error": "Método no permitido"}, status=405)
+
+    interview = get_object_or_404(Interview, pk=pk, user=request.user)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "JSON inválido"}, status=400)
+
+    audio_base64 = data.get("audio")
+
+    if not audio_base64:
+        return JsonResponse({"error": "No se recibió audio"}, status=400)
+
+    job = enqueue_ai_job("transcribe", {"audio": audio_base64}, interview=interview)
+    return _job_accepted(job)
+
+
+@login_required
+def ai_job_status(request, job_id):
+    """Estado de un trabajo: 202 mientras está pendiente, 200 cuando terminó (done/dead)."""
+    job = get_object_or_404(AIJob, pk=job_id, interview__user=request.user)
+    pending = job.status in ("queued", "running")
+    return JsonResponse(job_status(job), status=202 if pending else 200)
+
 
 #############################################
 # MARCAR ENTREVISTA COMO FINALIZADA
@@ -266,7 +821,8 @@ def generate_voice_response(request, pk):
 def interview_finish(request, pk):
     interview = get_object_or_404(Interview, pk=pk, user=request.user)
     interview.is_finished = True
-    interview.save()
+    interview.save(update_fields=["is_finished"])
+    record_in_cohort(interview)
     return JsonResponse({"status": "ok"})
 
 
@@ -290,27 +846,20 @@ def interview_delete(request, pk):
 def interview_results(request, pk):
     interview = get_object_or_404(Interview, pk=pk, user=request.user)
 
-    scores = [msg.score for msg in interview.messages.all() if hasattr(msg, "score")]
-
-    if scores:
-        promedio = {
-            "claridad": sum(s.claridad for s in scores) / len(scores),
-            "confianza": sum(s.confianza for s in scores) / len(scores),
-            "contenido": sum(s.contenido for s in scores) / len(scores),
-            "creatividad": sum(s.creatividad for s in scores) / len(scores),
-            "lenguaje": sum(s.lenguaje for s in scores) / len(scores),
-        }
-    else:
-        promedio = {"claridad": 0, "confianza": 0, "contenido": 0, "creatividad": 0, "lenguaje": 0}
+    # Modo diferido: el puntaje en lote corre aparte; la página avisa si falta
+    scores_pending = schedule_scoring(interview)
 
-    puntaje = int(sum(promedio.values()) / 5)
+    # Sumas por criterio mantenidas en cada turno (interviews/summary.py)
+    promedio, puntaje = summary_scores(interview)
+    record_in_cohort(interview)
 
     context = {
         "interview": interview,
         "puntaje": puntaje,
         "total_preguntas": interview.asked_questions,
-        "comparativa": [60, 75, puntaje],
+        "comparativa": cohort_comparison(interview, puntaje),
         "promedio": promedio,
+        "scores_pending": scores_pending,
     }
 
     return render(request, "interviews/results.html", context)
@@ -323,17 +872,19 @@ def interview_results(request, pk):
 @login_required
 def interview_export_pdf(request, pk):
     from io import BytesIO
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.pagesizes import A4
     from reportlab.lib import colors
     from datetime import datetime
 
     interview = get_object_or_404(Interview, pk=pk, user=request.user)
+    scores_pending = schedule_scoring(interview)
+    record_in_cohort(interview)
     promedio, puntaje, comparativa = compute_scores(interview)
 
-    png_promedios = plot_promedios(promedio)
-    png_comp = plot_comparativa(comparativa)
+    # Vectores de reportlab o PNG de matplotlib (caché y pool de procesos) según REPORT_CHART_BACKEND
+    charts = pdf_charts(promedio, comparativa)
 
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=50, rightMargin=50, topMargin=70, bottomMargin=60)
@@ -361,6 +912,9 @@ def interview_export_pdf(request, pk):
     <b>Fecha:</b> {interview.created_at.strftime("%d/%m/%Y %H:%M")}
     """
     Story.append(Paragraph(meta, styles["Normal"]))
+    if scores_pending:
+        Story.append(Spacer(1, 8))
+        Story.append(Paragraph("<i>Algunas respuestas aún se están evaluando: el puntaje puede cambiar.</i>", styles["Normal"]))
     Story.append(Spacer(1, 20))
 
     # TABLA DE PROMEDIOS
@@ -380,19 +934,19 @@ def interview_export_pdf(request, pk):
 
     # GRAFICOS
     Story.append(Paragraph("<b>Gráfico 1:</b> Promedio por criterio", styles["Heading3"]))
-    Story.append(Image(png_promedios, width=400, height=250))
+    Story.append(charts["promedios"])
     Story.append(Spacer(1, 16))
 
     Story.append(Paragraph("<b>Gráfico 2:</b> Comparativa de desempeño", styles["Heading3"]))
-    Story.append(Image(png_comp, width=400, height=250))
+    Story.append(charts["comparativa"])
     Story.append(Spacer(1, 20))
 
     Story.append(Paragraph("<b>Gráfico 3:</b> Radar de Desempeño", styles["Heading3"]))
-    Story.append(Image(plot_radar(promedio), width=400, height=350))
+    Story.append(charts["radar"])
     Story.append(Spacer(1, 20))
 
     Story.append(Paragraph("<b>Gráfico 4:</b> Fortalezas vs Debilidades", styles["Heading3"]))
-    Story.append(Image(plot_pie_strengths(promedio), width=400, height=300))
+    Story.append(charts["pie_strengths"])
     Story.append(Spacer(1, 20))
 
     Story.append(PageBreak())
@@ -401,7 +955,7 @@ def interview_export_pdf(request, pk):
     Story.append(Paragraph("<b>Consejos destacados de la IA</b>", styles["Heading2"]))
     Story.append(Spacer(1, 12))
 
-    feedback_msgs = [m.content for m in interview.messages.all() if m.role == "feedback"]
+    feedback_msgs = list(interview.messages.filter(role="feedback").values_list("content", flat=True))
 
     if feedback_msgs:
         for i, msg in enumerate(feedback_msgs, 1):
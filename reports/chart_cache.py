@@ -0,0 +1,79 @@
+# reports/chart_cache.py
+"""
+Caché en disco de los gráficos PNG del PDF (ai_agent/disk_cache.py).
+
+La clave es ``hash(CHART_VERSION, gráfico, datos)``: los datos son lo único
+que se dibuja (promedios por criterio, comparativa con la cohorte), así que
+exportar de nuevo una entrevista terminada devuelve los PNG guardados sin
+importar ni ejecutar matplotlib. Un ``Score`` nuevo cambia los promedios del
+``ScoreSummary`` y con ellos la clave: el gráfico viejo ya no se pide y sale
+por LRU. Al cambiar el aspecto de un gráfico se sube ``CHART_VERSION``.
+
+Configuración en ``settings.REPORT_CHART_CACHE``::
+
+    REPORT_CHART_CACHE = {"enabled": True, "dir": "/var/cache/evalent/charts", "max_mb": 50}
+"""
+import threading
+from io import BytesIO
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+
+from ai_agent.disk_cache import DiskCache
+
+
+# Subir al cambiar estilos, tamaños o textos de los gráficos de reports/charts.py
+CHART_VERSION = 1
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_chart_cache() -> Optional[DiskCache]:
+    """Caché de gráficos del proceso, o None si está desactivada."""
+    global _cache
+    config = getattr(settings, "REPORT_CHART_CACHE", {}) or {}
+    if not config.get("enabled"):
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(config["dir"], int(config.get("max_mb", 50)) * 1024 * 1024, suffix=".png")
+    return _cache
+
+
+def chart_key(chart: str, data) -> str:
+    return DiskCache.make_key(CHART_VERSION, chart, data)
+
+
+def cached_chart(chart: str, data, render: Callable[[], bytes]) -> BytesIO:
+    """PNG de ``chart`` para ``data``: el guardado, o ``render()`` y se guarda."""
+    cache = get_chart_cache()
+    if cache is None:
+        return BytesIO(render())
+
+    key = chart_key(chart, data)
+    png = cache.get(key)
+    if png is None:
+        png = render()
+        cache.set(key, png)
+    return BytesIO(png)
+
+
+def cached_charts(jobs: Dict[str, object], render: Callable[[Dict[str, object]], Dict[str, bytes]]) -> Dict[str, BytesIO]:
+    """
+    Varios gráficos ``{gráfico: datos}`` a la vez: los que faltan se piden
+    juntos a ``render(faltantes)`` (que puede dibujarlos en paralelo).
+    """
+    cache = get_chart_cache()
+    if cache is None:
+        return {chart: BytesIO(png) for chart, png in render(jobs).items()}
+
+    keys = {chart: chart_key(chart, data) for chart, data in jobs.items()}
+    pngs = {chart: cache.get(key) for chart, key in keys.items()}
+    missing = {chart: jobs[chart] for chart, png in pngs.items() if png is None}
+    if missing:
+        for chart, png in render(missing).items():
+            cache.set(keys[chart], png)
+            pngs[chart] = png
+    return {chart: BytesIO(pngs[chart]) for chart in jobs}
@@ -0,0 +1,203 @@
+# reports/charts.py
+"""
+Gráficos del PDF dibujados con la API orientada a objetos de matplotlib.
+
+Cada gráfico crea su propio ``Figure`` con un lienzo Agg y no toca el estado
+global de ``pyplot`` (figura "actual", ``plt.close()``), así que se pueden
+dibujar a la vez desde varios hilos o procesos sin pisarse.
+
+Los cuatro gráficos de un reporte se dibujan en paralelo en un pool de procesos
+de larga vida (ai_agent/process_pool.py) que importa matplotlib al arrancar
+cada proceso: la etapa de gráficos tarda lo que el más lento. Cada proceso
+corre el mismo código con la misma configuración, por eso los PNG son idénticos
+byte a byte a los del dibujo en serie. El pool arranca en segundo plano con el
+primer reporte del proceso web; hasta que esté listo, o si falla, se dibuja en
+serie en el mismo proceso.
+
+Configuración (``settings.REPORT_CHART_POOL``)::
+
+    REPORT_CHART_POOL = {"workers": 4, "timeout": 30}   # workers=0 -> siempre en serie
+"""
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Dict
+
+from django.conf import settings
+
+from ai_agent.process_pool import WarmProcessPool
+
+
+DEFAULTS = {
+    "workers": 4,
+    "timeout": 30,
+}
+
+
+def chart_pool_config() -> dict:
+    return {**DEFAULTS, **getattr(settings, "REPORT_CHART_POOL", {})}
+
+
+# ---------- DIBUJO ----------
+# Sin Django: estas funciones también corren en los procesos del pool.
+
+def _figure(**kwargs):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _png(fig) -> bytes:
+    buf = BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    return buf.getvalue()
+
+
+def render_promedios(promedio_dict) -> bytes:
+    labels = list(promedio_dict.keys())
+    values = [promedio_dict[k] for k in labels]
+
+    fig = _figure()
+    ax = fig.add_subplot()
+    ax.set_title("Promedio por criterio")
+    ax.bar(labels, values)
+    ax.set_ylim(0, 100)
+    ax.set_xlabel("Criterios")
+    ax.set_ylabel("Puntaje")
+    return _png(fig)
+
+
+def render_comparativa(comparativa) -> bytes:
+    labels = ["Cohorte", "Top 25%", "Tú"]
+
+    fig = _figure()
+    ax = fig.add_subplot()
+    ax.set_title("Comparativa")
+    ax.bar(labels, comparativa)
+    ax.set_ylim(0, 100)
+    ax.set_ylabel("Puntaje")
+    return _png(fig)
+
+
+def render_radar(promedio_dict) -> bytes:
+    import numpy as np
+
+    labels = np.array(list(promedio_dict.keys()))
+    values = np.array([promedio_dict[k] for k in labels])
+    num_vars = len(labels)
+
+    # Crear radar chart
+    angles = np.linspace(0, 2 * np.pi, num_vars, endpoint=False).tolist()
+    values = np.concatenate((values, [values[0]]))
+    angles += angles[:1]
+
+    fig = _figure(figsize=(5, 5))
+    ax = fig.add_subplot(polar=True)
+    ax.fill(angles, values, color="#0d6efd", alpha=0.25)
+    ax.plot(angles, values, color="#0d6efd", linewidth=2)
+    ax.set_yticklabels([])
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(labels)
+    ax.set_title("Radar de Desempeño", size=14, color="#0d6efd", pad=20)
+    return _png(fig)
+
+
+def render_pie_strengths(promedio_dict) -> bytes:
+    labels = ["Fortalezas", "Debilidades"]
+    strengths = sum(1 for v in promedio_dict.values() if v >= 60)
+    weaknesses = sum(1 for v in promedio_dict.values() if v < 60)
+    data = [strengths, weaknesses]
+
+    fig = _figure()
+    ax = fig.add_subplot()
+    ax.pie(
+        data,
+        labels=labels,
+        autopct="%1.0f%%",
+        startangle=90,
+        colors=["#198754", "#dc3545"],
+        textprops={"color": "black"},
+    )
+    ax.set_title("Distribución de Fortalezas vs Debilidades")
+    return _png(fig)
+
+
+RENDERERS = {
+    "promedios": render_promedios,
+    "comparativa": render_comparativa,
+    "radar": render_radar,
+    "pie_strengths": render_pie_strengths,
+}
+
+
+def render_chart(chart: str, data) -> bytes:
+    return RENDERERS[chart](data)
+
+
+def render_serial(jobs: Dict[str, object]) -> Dict[str, bytes]:
+    """``{gráfico: datos}`` -> ``{gráfico: PNG}``, uno tras otro en este proceso."""
+    return {chart: render_chart(chart, data) for chart, data in jobs.items()}
+
+
+def _warm():
+    """Inicializador de los procesos: importa matplotlib y carga las fuentes una vez."""
+    _png(_figure(figsize=(1, 1)))
+
+
+# ---------- POOL DEL PROCESO WEB ----------
+
+class ChartPool(WarmProcessPool):
+    """Procesos con matplotlib ya cargado que dibujan los gráficos de un reporte a la vez."""
+
+    name = "report-charts"
+    warm_error = "[PDF] No se pudo precalentar el pool de gráficos"
+
+    def __init__(self, config: dict):
+        super().__init__(max(0, int(config["workers"])), _warm)
+        self.config = config
+
+    def render(self, jobs: Dict[str, object]) -> Dict[str, bytes]:
+        """Dibuja ``jobs`` en paralelo; lo que el pool no pudo dibujar sale en serie."""
+        if self.workers < 1 or len(jobs) < 2:
+            return render_serial(jobs)
+        if not self.ready:
+            # Los procesos todavía arrancan (segundos): no se espera por ellos
+            self.warm_in_background()
+            return render_serial(jobs)
+
+        try:
+            executor = self._get_executor()
+            futures = {chart: executor.submit(render_chart, chart, data) for chart, data in jobs.items()}
+        except (BrokenProcessPool, RuntimeError):
+            self.reset()
+            return render_serial(jobs)
+
+        results = {}
+        for chart, future in futures.items():
+            try:
+                results[chart] = future.result(self.config["timeout"])
+            except BrokenProcessPool:
+                self.reset()
+                results[chart] = render_chart(chart, jobs[chart])
+            except Exception:
+                future.cancel()
+                results[chart] = render_chart(chart, jobs[chart])
+        return results
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_chart_pool() -> ChartPool:
+    """Pool de gráficos del proceso; al crearlo empieza a arrancar sus procesos en segundo plano."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ChartPool(chart_pool_config())
+                _pool.warm_in_background()
+    return _pool
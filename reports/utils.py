@@ -1,107 +1,67 @@
 # reports/utils.py
-from io import BytesIO
-import matplotlib
-matplotlib.use("Agg")  # backend sin GUI
-import matplotlib.pyplot as plt
+from django.conf import settings
+
+from . import charts
+from .chart_cache import cached_chart, cached_charts
+
 
 def compute_scores(interview):
-    scores = [getattr(m, "score", None) for m in interview.messages.all()]
-    scores = [s for s in scores if s is not None]
-    if scores:
-        promedio = {
-            "claridad": sum(s.claridad for s in scores) / len(scores),
-            "confianza": sum(s.confianza for s in scores) / len(scores),
-            "contenido": sum(s.contenido for s in scores) / len(scores),
-            "creatividad": sum(s.creatividad for s in scores) / len(scores),
-            "lenguaje": sum(s.lenguaje for s in scores) / len(scores),
-        }
-    else:
-        promedio = {"claridad": 0, "confianza": 0, "contenido": 0, "creatividad": 0, "lenguaje": 0}
-    puntaje = int(sum(promedio.values()) / 5)
-    comparativa = [60, 75, puntaje]  # como en tu results
-    return promedio, puntaje, comparativa
+    from interviews.cohorts import cohort_comparison
+    from interviews.summary import summary_scores
 
-def matplotlib_to_png_bytes(plt_figure):
-    buf = BytesIO()
-    plt_figure.savefig(buf, format="png", bbox_inches="tight")
-    plt.close(plt_figure)
-    buf.seek(0)
-    return buf
+    # Una sola fila (ScoreSummary) sin importar cuántos turnos tuvo la entrevista
+    promedio, puntaje = summary_scores(interview)
+    # Mediana y top 25% de la cohorte, desde su histograma (interviews/cohorts.py)
+    comparativa = cohort_comparison(interview, puntaje)
+    return promedio, puntaje, comparativa
 
 def plot_promedios(promedio_dict):
-    labels = list(promedio_dict.keys())
-    values = [promedio_dict[k] for k in labels]
-    fig = plt.figure()
-    plt.title("Promedio por criterio")
-    plt.bar(labels, values)
-    plt.ylim(0, 100)
-    plt.xlabel("Criterios")
-    plt.ylabel("Puntaje")
-    return matplotlib_to_png_bytes(fig)
+    return cached_chart("promedios", promedio_dict, lambda: charts.render_promedios(promedio_dict))
 
 def plot_comparativa(comparativa):
-    labels = ["Cohorte", "Top 25%", "Tú"]
-    fig = plt.figure()
-    plt.title("Comparativa")
-    plt.bar(labels, comparativa)
-    plt.ylim(0, 100)
-    plt.ylabel("Puntaje")
-    return matplotlib_to_png_bytes(fig)
+    return cached_chart("comparativa", list(comparativa), lambda: charts.render_comparativa(comparativa))
 
 def plot_radar(promedio_dict):
-    import matplotlib.pyplot as plt
-    import numpy as np
-    from io import BytesIO
-
-    labels = np.array(list(promedio_dict.keys()))
-    values = np.array([promedio_dict[k] for k in labels])
-    num_vars = len(labels)
+    return cached_chart("radar", promedio_dict, lambda: charts.render_radar(promedio_dict))
 
-    # Cerrar el gráfico anterior
-    plt.close()
-
-    # Crear radar chart
-    angles = np.linspace(0, 2 * np.pi, num_vars, endpoint=False).tolist()
-    values = np.concatenate((values, [values[0]]))
-    angles += angles[:1]
+def plot_pie_strengths(promedio_dict):
+    return cached_chart("pie_strengths", promedio_dict, lambda: charts.render_pie_strengths(promedio_dict))
 
-    fig, ax = plt.subplots(figsize=(5, 5), subplot_kw=dict(polar=True))
-    ax.fill(angles, values, color="#0d6efd", alpha=0.25)
-    ax.plot(angles, values, color="#0d6efd", linewidth=2)
-    ax.set_yticklabels([])
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(labels)
-    plt.title("Radar de Desempeño", size=14, color="#0d6efd", pad=20)
+def report_charts(promedio_dict, comparativa):
+    """Los cuatro gráficos del PDF (``{nombre: PNG}``); los que no están en caché se dibujan en paralelo."""
+    jobs = {
+        "promedios": promedio_dict,
+        "comparativa": list(comparativa),
+        "radar": promedio_dict,
+        "pie_strengths": promedio_dict,
+    }
+    return cached_charts(jobs, charts.get_chart_pool().render)
 
-    buf = BytesIO()
-    plt.savefig(buf, format="png", bbox_inches="tight")
-    buf.seek(0)
-    plt.close()
-    return buf
+# Tamaño de cada gráfico en el PDF (puntos)
+PDF_CHART_SIZES = {
+    "promedios": (400, 250),
+    "comparativa": (400, 250),
+    "radar": (400, 350),
+    "pie_strengths": (400, 300),
+}
 
+def pdf_charts(promedio_dict, comparativa):
+    """
+    Los cuatro gráficos como flowables de reportlab (``{nombre: flowable}``).
+    ``REPORT_CHART_BACKEND = "reportlab"`` los dibuja como vectores
+    (reports/vector_charts.py); si no, PNG de matplotlib.
+    """
+    if getattr(settings, "REPORT_CHART_BACKEND", "matplotlib") == "reportlab":
+        from . import vector_charts
 
-def plot_pie_strengths(promedio_dict):
-    import matplotlib.pyplot as plt
-    from io import BytesIO
-
-    labels = ["Fortalezas", "Debilidades"]
-    strengths = sum(1 for v in promedio_dict.values() if v >= 60)
-    weaknesses = sum(1 for v in promedio_dict.values() if v < 60)
-    data = [strengths, weaknesses]
+        return {
+            "promedios": vector_charts.draw_promedios(promedio_dict, *PDF_CHART_SIZES["promedios"]),
+            "comparativa": vector_charts.draw_comparativa(comparativa, *PDF_CHART_SIZES["comparativa"]),
+            "radar": vector_charts.draw_radar(promedio_dict, *PDF_CHART_SIZES["radar"]),
+            "pie_strengths": vector_charts.draw_pie_strengths(promedio_dict, *PDF_CHART_SIZES["pie_strengths"]),
+        }
 
-    fig, ax = plt.subplots()
-    ax.pie(
-        data,
-        labels=labels,
-        autopct="%1.0f%%",
-        startangle=90,
-        colors=["#198754", "#dc3545"],
-        textprops={"color": "black"},
-    )
-    ax.set_title("Distribución de Fortalezas vs Debilidades")
+    from reportlab.platypus import Image
 
-    buf = BytesIO()
-    plt.savefig(buf, format="png", bbox_inches="tight")
-    buf.seek(0)
-    plt.close()
-    return buf
+    pngs = report_charts(promedio_dict, comparativa)
+    return {chart: Image(png, *PDF_CHART_SIZES[chart]) for chart, png in pngs.items()}
@@ -0,0 +1,137 @@
+# reports/vector_charts.py
+"""
+Gráficos del PDF como dibujos vectoriales de reportlab (``reportlab.graphics``).
+
+Son los mismos cuatro gráficos de reports/charts.py (barras por criterio,
+comparativa con la cohorte, radar y torta de fortalezas), pero como
+``Drawing``: van directo a la historia del PDF como flowables, sin matplotlib,
+sin rasterizar ni codificar PNG. Se ven nítidos a cualquier zoom, el PDF pesa
+mucho menos y armarlos cuesta milisegundos, por eso no pasan por la caché ni
+por el pool de procesos.
+
+Se eligen con ``settings.REPORT_CHART_BACKEND = "reportlab"``.
+"""
+import math
+
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing, Group, Line, PolyLine, Polygon, String
+from reportlab.lib import colors
+
+
+BAR_COLOR = colors.HexColor("#1f77b4")  # el azul por defecto de matplotlib
+BRAND = colors.HexColor("#0d6efd")
+STRENGTH = colors.HexColor("#198754")
+WEAKNESS = colors.HexColor("#dc3545")
+GRID = colors.HexColor("#cccccc")
+FONT = "Helvetica"
+
+
+def _drawing(width, height, title, size=12, color=colors.black) -> Drawing:
+    drawing = Drawing(width, height)
+    drawing.hAlign = "CENTER"  # como las imágenes de matplotlib
+    drawing.add(String(width / 2, height - size - 2, title, fontName=FONT, fontSize=size,
+                       fillColor=color, textAnchor="middle"))
+    return drawing
+
+
+def _bars(width, height, title, labels, values, xlabel=None) -> Drawing:
+    drawing = _drawing(width, height, title)
+
+    chart = VerticalBarChart()
+    chart.x, chart.y = 50, 45 if xlabel else 30
+    chart.width, chart.height = width - 70, height - chart.y - 30
+    chart.data = [list(values)]
+    chart.bars[0].fillColor = BAR_COLOR
+    chart.bars[0].strokeColor = None
+    chart.barSpacing = 2
+    chart.groupSpacing = 10
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.valueMax = 100
+    chart.valueAxis.valueStep = 20
+    chart.valueAxis.labels.fontName = FONT
+    chart.valueAxis.labels.fontSize = 8
+    chart.categoryAxis.categoryNames = list(labels)
+    chart.categoryAxis.labels.fontName = FONT
+    chart.categoryAxis.labels.fontSize = 8
+    chart.categoryAxis.labels.dy = -2
+    drawing.add(chart)
+
+    # Etiqueta del eje Y girada 90°
+    drawing.add(Group(String(0, 0, "Puntaje", fontName=FONT, fontSize=9, textAnchor="middle"),
+                      transform=(0, 1, -1, 0, 14, chart.y + chart.height / 2)))
+    if xlabel:
+        drawing.add(String(chart.x + chart.width / 2, 8, xlabel, fontName=FONT, fontSize=9, textAnchor="middle"))
+    return drawing
+
+
+def draw_promedios(promedio_dict, width=400, height=250) -> Drawing:
+    labels = list(promedio_dict.keys())
+    return _bars(width, height, "Promedio por criterio", labels, [promedio_dict[k] for k in labels], "Criterios")
+
+
+def draw_comparativa(comparativa, width=400, height=250) -> Drawing:
+    return _bars(width, height, "Comparativa", ["Cohorte", "Top 25%", "Tú"], comparativa)
+
+
+def draw_radar(promedio_dict, width=400, height=350) -> Drawing:
+    drawing = _drawing(width, height, "Radar de Desempeño", size=14, color=BRAND)
+
+    labels = list(promedio_dict.keys())
+    values = [max(0, min(100, promedio_dict[k])) for k in labels]
+    cx, cy = width / 2, (height - 30) / 2
+    radius = min(width, height - 30) / 2 - 35
+
+    def point(i, value):
+        # Primer eje a la derecha y en sentido antihorario, como el radar polar de matplotlib
+        angle = 2 * math.pi * i / len(labels)
+        r = radius * value / 100
+        return cx + r * math.cos(angle), cy + r * math.sin(angle)
+
+    def ring(value):
+        return [coord for i in range(len(labels)) for coord in point(i, value)]
+
+    for level in (20, 40, 60, 80, 100):
+        drawing.add(PolyLine(ring(level) + list(point(0, level)), strokeColor=GRID, strokeWidth=0.5))
+    for i, label in enumerate(labels):
+        drawing.add(Line(cx, cy, *point(i, 100), strokeColor=GRID, strokeWidth=0.5))
+        x, y = point(i, 112)
+        anchor = "middle" if abs(x - cx) < 1 else ("start" if x > cx else "end")
+        drawing.add(String(x, y - 3, label, fontName=FONT, fontSize=9, textAnchor=anchor))
+
+    drawing.add(Polygon(
+        [coord for i, value in enumerate(values) for coord in point(i, value)],
+        fillColor=colors.Color(BRAND.red, BRAND.green, BRAND.blue, alpha=0.25),
+        strokeColor=BRAND,
+        strokeWidth=2,
+    ))
+    return drawing
+
+
+def draw_pie_strengths(promedio_dict, width=400, height=300) -> Drawing:
+    drawing = _drawing(width, height, "Distribución de Fortalezas vs Debilidades")
+
+    strengths = sum(1 for v in promedio_dict.values() if v >= 60)
+    weaknesses = sum(1 for v in promedio_dict.values() if v < 60)
+    total = strengths + weaknesses
+    # Una porción en 0 no se dibuja (reportlab dejaría una cuña vacía)
+    slices = [(label, count, color) for label, count, color in
+              (("Fortalezas", strengths, STRENGTH), ("Debilidades", weaknesses, WEAKNESS)) if count]
+    if not slices:
+        return drawing
+
+    pie = Pie()
+    size = min(width, height - 40) - 60
+    pie.x, pie.y = (width - size) / 2, (height - 30 - size) / 2
+    pie.width = pie.height = size
+    pie.startAngle = 90
+    pie.direction = "anticlockwise"
+    pie.data = [count for _label, count, _color in slices]
+    pie.labels = [f"{label} ({count / total:.0%})" for label, count, _color in slices]
+    pie.slices.strokeColor = colors.white
+    pie.slices.fontName = FONT
+    pie.slices.fontSize = 9
+    for i, (_label, _count, color) in enumerate(slices):
+        pie.slices[i].fillColor = color
+    drawing.add(pie)
+    return drawing